@@ -11,13 +11,22 @@ import logging
 import os
 import sys
 import signal
-from datetime import datetime, timezone
+from typing import List, Optional
 from dotenv import load_dotenv
 
 from config import config
 from bybit_fetcher import BybitDataFetcher
+from bybit_ws import BybitTickerStream
 from funding_monitor import FundingRateMonitor
+from funding_store import FundingHistoryStore
+from instrument_cache import InstrumentCache
+from models import Ticker
+from rate_limiter import get_shared_limiter
+from settlement_scheduler import SettlementScheduler
+from ticker_snapshot import TickerSnapshotService
 from telegram_client import TelegramClient
+from telegram_outbox import TelegramOutbox
+from venue_orchestrator import VenueOrchestrator, build_adapters
 
 load_dotenv()
 
@@ -37,7 +46,12 @@ logger = logging.getLogger(__name__)
 class AlertMonitor:
     """Monitors funding rates and sends alerts - NO command handling"""
     
-    def __init__(self):
+    def __init__(self, snapshot: TickerSnapshotService = None, telegram: TelegramClient = None):
+        """
+        Args:
+            snapshot: Shared ticker snapshot (start_bot.py passes the one the command handler uses)
+            telegram: Shared Telegram client (reuses its pooled keep-alive session)
+        """
         logger.info("Initializing Alert Monitor...")
         
         # Load credentials
@@ -50,13 +64,27 @@ class AlertMonitor:
             sys.exit(1)
         
         # Initialize components
-        self.fetcher = BybitDataFetcher(config.BYBIT_BASE_URL)
-        self.monitor = FundingRateMonitor(config)
-        self.telegram = TelegramClient(
+        if snapshot is None:
+            fetcher = BybitDataFetcher(
+                config.BYBIT_BASE_URL,
+                config.SETTLEMENT_FETCH_CONCURRENCY,
+                rate_limiter=get_shared_limiter("bybit", config.BYBIT_MAX_REQUESTS_PER_SECOND),
+                history_store=FundingHistoryStore(config.FUNDING_HISTORY_DB)
+            )
+            snapshot = TickerSnapshotService(fetcher, config.TICKER_SNAPSHOT_TTL)
+        self.snapshot = snapshot
+        self.fetcher = snapshot.fetcher
+        self.monitor = FundingRateMonitor(config, defer_saves=True)
+        self.telegram = telegram or TelegramClient(
             self.telegram_token,
             self.telegram_chat_id,
             topic_id=int(self.telegram_topic_id) if self.telegram_topic_id else None
         )
+        self.outbox = TelegramOutbox(
+            self.telegram,
+            global_per_second=config.TELEGRAM_GLOBAL_MESSAGES_PER_SECOND,
+            group_per_minute=config.TELEGRAM_GROUP_MESSAGES_PER_MINUTE
+        )
         
         # Get symbols
         logger.info("Fetching ALL perpetual symbols from Bybit...")
@@ -68,9 +96,30 @@ class AlertMonitor:
         self.symbols = list(self.symbols_data.keys())
         logger.info(f"Monitoring {len(self.symbols)} symbols")
         
+        # Instrument metadata, diffed every INSTRUMENT_REFRESH_INTERVAL for
+        # listings, delistings and funding interval changes
+        self.instruments = InstrumentCache(
+            self.fetcher, config.INSTRUMENT_CACHE_FILE,
+            max_removed_fraction=config.INSTRUMENT_MAX_REMOVED_FRACTION
+        )
+        
+        # Wake at funding boundaries instead of a fixed interval
+        self.scheduler = SettlementScheduler(config.SETTLEMENT_WAKE_DELAY, config.SETTLEMENT_RETRY_DELAY)
+        self.scheduler.update(self.symbols_data)
+        
+        # Optional live ticker stream (predicted-rate checks run per update)
+        self.stream = None
+        if config.ENABLE_WS_TICKER_STREAM:
+            self.stream = BybitTickerStream(self.symbols, config.BYBIT_WS_URL, on_update=self._on_ticker_update)
+        
+        # Optional multi-venue snapshot for cross-venue spread alerts
+        self.venues = None
+        if len(config.ENABLED_VENUES) > 1:
+            self.venues = VenueOrchestrator(build_adapters(config, bybit=self.fetcher))
+        
         # State
         self.running = True
-        self.last_symbol_refresh = datetime.now(timezone.utc)
+        self._settlements_checked = False
         
         # Signal handlers
         signal.signal(signal.SIGINT, self._shutdown)
@@ -82,76 +131,222 @@ class AlertMonitor:
     
     async def run(self):
         """Main monitoring loop"""
-        logger.info(f"Starting monitoring loop (interval: {config.CHECK_INTERVAL}s)")
+        logger.info(f"Starting monitoring loop (settlement-aware, max interval: {config.CHECK_INTERVAL}s)")
+        
+        self.outbox.start()
+        
+        stream_task = None
+        if self.stream:
+            logger.info(f"Live ticker stream enabled: {config.BYBIT_WS_URL}")
+            stream_task = asyncio.create_task(self.stream.run())
+        
+        venue_task = None
+        if self.venues:
+            logger.info(f"Cross-venue spreads enabled: {', '.join(self.venues.venues)}")
+            venue_task = asyncio.create_task(self._venue_loop())
+        
+        instrument_task = asyncio.create_task(self._instrument_loop())
+        state_task = asyncio.create_task(self._state_flush_loop())
         
         while self.running:
             try:
-                # Refresh symbols every 24 hours
-                time_since_refresh = (datetime.now(timezone.utc) - self.last_symbol_refresh).total_seconds()
-                if time_since_refresh >= 86400:
-                    self._refresh_symbols()
+                due = self.scheduler.pop_due()
+                if due:
+                    logger.info(f"Settlement boundary reached for {len(due)} symbols")
                 
-                # Check for funding events
-                await self._check_funding()
+                # Check for funding events (settlements only for the symbols due)
+                await self._check_funding(due)
+                await self.monitor.flush_state()
                 
             except Exception as e:
                 logger.error(f"Error in monitoring loop: {e}", exc_info=True)
             
-            # Wait for next check
-            await asyncio.sleep(config.CHECK_INTERVAL)
+            # Wait for the next settlement group (or CHECK_INTERVAL at most)
+            await asyncio.sleep(self._next_sleep_seconds())
+        
+        if stream_task:
+            await self.stream.stop()
+            stream_task.cancel()
+        if venue_task:
+            venue_task.cancel()
+            await self.venues.close()
+        instrument_task.cancel()
+        state_task.cancel()
+        await self.monitor.flush_state()
+        await self.outbox.stop()
+        await self.fetcher.close()
+        await self.telegram.close()
     
-    def _refresh_symbols(self):
-        """Refresh symbol list"""
-        logger.info("Refreshing symbols...")
-        new_data = self.fetcher.get_all_perpetual_symbols_with_intervals()
-        if new_data:
-            self.symbols_data = new_data
-            self.symbols = list(new_data.keys())
-            self.last_symbol_refresh = datetime.now(timezone.utc)
-            logger.info(f"Now monitoring {len(self.symbols)} symbols")
+    def _next_sleep_seconds(self) -> float:
+        """Seconds until the next settlement group is due, capped at CHECK_INTERVAL"""
+        until_next = self.scheduler.seconds_until_next_wake()
+        if until_next is None:
+            return config.CHECK_INTERVAL
+        return max(1.0, min(until_next, config.CHECK_INTERVAL))
     
-    async def _check_funding(self):
-        """Check for funding alerts"""
-        # Fetch ticker data
-        ticker_data = self.fetcher.get_tickers(self.symbols)
-        if not ticker_data:
+    async def _state_flush_loop(self):
+        """Write state changed by streamed updates and venue checks every STATE_FLUSH_INTERVAL"""
+        while self.running:
+            await asyncio.sleep(config.STATE_FLUSH_INTERVAL)
+            try:
+                await self.monitor.flush_state()
+            except Exception as e:
+                logger.error(f"Error saving monitor state: {e}", exc_info=True)
+    
+    async def _instrument_loop(self):
+        """Refresh instrument metadata every INSTRUMENT_REFRESH_INTERVAL"""
+        while self.running:
+            try:
+                await self._refresh_instruments()
+            except Exception as e:
+                logger.error(f"Error refreshing instruments: {e}", exc_info=True)
+            
+            await asyncio.sleep(config.INSTRUMENT_REFRESH_INTERVAL)
+    
+    async def _refresh_instruments(self):
+        """Apply listings, delistings and interval changes, touching only the changed symbols"""
+        diff = await self.instruments.refresh()
+        if diff is None or diff.empty:
             return
         
-        # Add interval info
-        for symbol, data in ticker_data.items():
+        if diff.removed:
+            self.scheduler.remove(diff.removed)
+            for symbol in diff.removed:
+                self.symbols_data.pop(symbol, None)
+        for symbol, instrument in diff.added.items():
+            # Scheduled once its first ticker (with nextFundingTime) arrives
+            self.symbols_data.setdefault(
+                symbol, Ticker(symbol, funding_interval_hours=instrument.funding_interval_hours)
+            )
+        for symbol, (_, new_interval) in diff.interval_changes.items():
             if symbol in self.symbols_data:
-                data["fundingIntervalHours"] = self.symbols_data[symbol].get("fundingIntervalHours", 8)
+                self.symbols_data[symbol].funding_interval_hours = new_interval
+        
+        if diff.added or diff.removed:
+            self.symbols = list(self.symbols_data.keys())
+            if self.stream:
+                await self.stream.set_symbols(self.symbols)
+            logger.info(f"Now monitoring {len(self.symbols)} symbols")
         
-        # Fetch settlements
-        settlements = self.fetcher.get_latest_settlements_batch(self.symbols)
-        if not settlements:
+        if diff.interval_changes:
+            if self.stream and self.stream.is_live():
+                tickers = self.stream.snapshot
+            else:
+                tickers = await self.snapshot.get()
+            self._send_alerts(self.monitor.check_interval_changes(diff.interval_changes, tickers))
+    
+    def _on_ticker_update(self, symbol: str, ticker: Ticker):
+        """Evaluate the live rate rule for a single streamed ticker update"""
+        if symbol in self.symbols_data:
+            ticker.funding_interval_hours = self.symbols_data[symbol].funding_interval_hours
+        
+        alerts = [self.monitor.check_predicted_rate(symbol, ticker), self.monitor.check_anomaly(symbol, ticker)]
+        if self.venues:
+            alerts.append(self.monitor.update_venue_quote("bybit", ticker))
+        alerts = [alert for alert in alerts if alert]
+        if alerts:
+            self._send_alerts(alerts)
+    
+    async def _venue_loop(self):
+        """Fetch all venues every SPREAD_CHECK_INTERVAL and alert on wide funding spreads"""
+        while self.running:
+            try:
+                snapshot = await self.venues.fetch_all()
+                alerts = self.monitor.check_spreads(snapshot)
+                
+                # Limit to top 5 widest
+                if len(alerts) > 5:
+                    alerts = sorted(alerts, key=lambda x: x.spread_apr, reverse=True)[:5]
+                self._send_alerts(alerts)
+                logger.debug(f"Venues: {self.venues.get_stats()}")
+            except Exception as e:
+                logger.error(f"Error checking venue spreads: {e}", exc_info=True)
+            
+            await asyncio.sleep(config.SPREAD_CHECK_INTERVAL)
+    
+    async def _check_funding(self, due: Optional[List[str]] = None):
+        """
+        Check for funding alerts
+        
+        Args:
+            due: Symbols whose settlement boundary (or retry) the scheduler just reached
+        """
+        settlement_due = bool(due)
+        # Use the streamed snapshot when live, otherwise the shared REST snapshot
+        # (forced fresh right after a settlement boundary so nextFundingTime has rolled)
+        columns = None
+        if self.stream and self.stream.is_live():
+            ticker_data = dict(self.stream.snapshot)
+            
+            # Stream tickers carry no interval; take it from the REST symbol list
+            for symbol, data in ticker_data.items():
+                if symbol in self.symbols_data:
+                    data.funding_interval_hours = self.symbols_data[symbol].funding_interval_hours
+        else:
+            max_age = config.SETTLEMENT_WAKE_DELAY if settlement_due else None
+            tickers = await self.snapshot.get(max_age=max_age)
+            ticker_data = {
+                symbol: data
+                for symbol, data in tickers.items()
+                if symbol in self.symbols_data
+            }
+            # Normalized rate columns were built once with the snapshot
+            columns = self.snapshot.columns
+        if not ticker_data:
             return
         
+        # Reschedule from the latest nextFundingTime values
+        self.scheduler.update(ticker_data)
+        
+        # Only the symbols the scheduler woke for (everything once at startup to catch up),
+        # and of those only the ones whose nextFundingTime rolled over
+        candidates = self.monitor.get_settlement_candidates(
+            ticker_data, (due or []) if self._settlements_checked else None
+        )
+        due_symbols = self.monitor.get_symbols_due_for_settlement(candidates)
+        settlements = {}
+        if due_symbols:
+            settlements = await self.fetcher.get_latest_settlements_batch_async(due_symbols)
+        self._settlements_checked = True
+        
         # Check for settlement alerts
         alerts = self.monitor.check_settlements(settlements, ticker_data)
         
+        # History can lag the ticker rollover; re-check those symbols after SETTLEMENT_RETRY_DELAY
+        lagging = self.monitor.get_lagging_settlements(ticker_data, due_symbols)
+        if lagging:
+            logger.info(f"Settlement not in history yet for {len(lagging)} symbols, retrying")
+            self.scheduler.retry(lagging)
+        
         # Clear predicted tracking for settled symbols
         for alert in alerts:
-            self.monitor.clear_predicted_alerts_after_settlement(alert['symbol'])
+            self.monitor.clear_predicted_alerts_after_settlement(alert.symbol)
         
-        # Check predicted rates
-        predicted_alerts = self.monitor.check_predicted_rates(ticker_data)
+        # Check predicted rates and live anomalies (already evaluated per update when streaming)
+        predicted_alerts = []
+        anomaly_alerts = []
+        if not (self.stream and self.stream.is_live()):
+            predicted_alerts = self.monitor.check_predicted_rates(ticker_data, columns)
+            anomaly_alerts = self.monitor.check_anomalies(ticker_data)
         
-        # Limit to top 5 extreme
+        # Limit to top 5 extreme (per-8h equivalent)
         if len(predicted_alerts) > 5:
             predicted_alerts = sorted(
                 predicted_alerts,
-                key=lambda x: abs(x.get('fundingRate', 0)),
+                key=lambda x: abs(ticker_data[x.symbol].rate_8h),
                 reverse=True
             )[:5]
         
-        # Send alerts
-        all_alerts = alerts + predicted_alerts
-        for alert in all_alerts:
-            success = await self.telegram.send_funding_alert(alert)
-            if success:
-                logger.info(f"Alert sent: {alert['symbol']} ({alert['alertType']})")
-            await asyncio.sleep(0.3)
+        # Limit to top 5 furthest from their own history
+        if len(anomaly_alerts) > 5:
+            anomaly_alerts = sorted(anomaly_alerts, key=lambda x: abs(x.zscore), reverse=True)[:5]
+        
+        self._send_alerts(alerts + predicted_alerts + anomaly_alerts)
+        logger.debug(f"Outbox: {self.outbox.get_stats()}")
+    
+    def _send_alerts(self, all_alerts: list):
+        """Queue alerts for delivery (the outbox paces and prioritizes them)"""
+        self.outbox.enqueue_alerts(all_alerts, digest=config.ALERT_DIGEST_MODE)
 
 
 async def main():
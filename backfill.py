@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Backfill funding history for the full universe into the local history store
+
+Walks each symbol's history backwards in endTime windows of up to 200 records
+(Bybit's page size), with symbols fetched concurrently under the shared rate
+limiter. Progress is checkpointed per page, so an interrupted run resumes
+where it stopped, and a later run only fetches what was settled since the
+previous one:
+
+    python backfill.py --days 365
+    python backfill.py --symbols BTCUSDT,ETHUSDT --days 30
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+from config import config
+from bybit_fetcher import BybitDataFetcher
+from funding_store import DAY_MS, FundingHistoryStore
+from rate_limiter import get_shared_limiter
+
+logger = logging.getLogger(__name__)
+
+# Bybit's max records per funding history request
+PAGE_SIZE = 200
+
+
+class FundingBackfill:
+    """Concurrent, resumable funding history backfill"""
+
+    def __init__(self, fetcher: BybitDataFetcher, store: FundingHistoryStore, concurrency: int = 10):
+        """
+        Args:
+            fetcher: Fetcher whose history responses are recorded into the store
+            store: Local history store (also holds the checkpoints)
+            concurrency: Symbols walked at once
+        """
+        self.fetcher = fetcher
+        self.store = store
+        self.concurrency = concurrency
+
+        self.records = 0
+        self.requests = 0
+        self.completed = 0
+        self.failed: List[str] = []
+
+    async def run(self, symbols: List[str], since_ms: int) -> Dict:
+        """
+        Backfill every symbol back to since_ms
+
+        Returns:
+            Run statistics (records, requests, symbols, elapsed seconds, records/sec)
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        until_ms = int(time.time() * 1000)
+        started = time.monotonic()
+
+        async def worker(symbol: str):
+            async with semaphore:
+                await self.backfill_symbol(symbol, since_ms, until_ms)
+
+        reporter = asyncio.create_task(self._report_progress(started, len(symbols)))
+        try:
+            await asyncio.gather(*(worker(symbol) for symbol in symbols))
+        finally:
+            reporter.cancel()
+
+        elapsed = time.monotonic() - started
+        return {
+            "records": self.records,
+            "requests": self.requests,
+            "symbols": self.completed,
+            "failed": len(self.failed),
+            "elapsed": round(elapsed, 2),
+            "records_per_sec": round(self.records / elapsed, 1) if elapsed else 0.0,
+        }
+
+    async def backfill_symbol(self, symbol: str, since_ms: int, until_ms: int):
+        """Walk one symbol's history backwards from its checkpoint (or until_ms) to since_ms"""
+        checkpoint = self.store.get_backfill_checkpoint(symbol)
+        if checkpoint and checkpoint["done"] and checkpoint["since"] <= since_ms:
+            if checkpoint["until"] < until_ms:
+                # Only fill what settled since the previous run; an interrupted gap
+                # fill keeps the old checkpoint and is redone next time
+                logger.info(f"{symbol}: filling {until_ms - checkpoint['until']} ms since the last run")
+                if not await self._walk(symbol, checkpoint["until"], until_ms):
+                    return
+                self.store.mark_days_synced(symbol, checkpoint["until"], until_ms)
+                self.store.save_backfill_checkpoint(
+                    symbol, checkpoint["since"], until_ms, checkpoint["since"], done=True
+                )
+            self.completed += 1
+            return
+        if checkpoint and not checkpoint["done"] and checkpoint["since"] == since_ms:
+            until_ms, cursor = checkpoint["until"], checkpoint["cursor"]
+            logger.info(f"{symbol}: resuming below {cursor}")
+        else:
+            cursor = until_ms
+
+        if not await self._walk(symbol, since_ms, cursor, checkpoint_until=until_ms):
+            return
+
+        # Every closed day in the walked range is now complete locally
+        self.store.mark_days_synced(symbol, since_ms, until_ms)
+        self.store.save_backfill_checkpoint(symbol, since_ms, until_ms, since_ms, done=True)
+        self.completed += 1
+
+    async def _walk(self, symbol: str, since_ms: int, cursor: int, checkpoint_until: Optional[int] = None) -> bool:
+        """
+        Fetch pages from cursor down to since_ms
+
+        Args:
+            symbol: Symbol name
+            since_ms: Oldest timestamp to fetch
+            cursor: Newest timestamp to fetch
+            checkpoint_until: Range end saved with a checkpoint after each page (None = no checkpoints)
+
+        Returns:
+            True if the range was fetched, False if a request failed
+        """
+        while cursor >= since_ms:
+            records, error_msg = await self.fetcher.get_funding_rate_history_range_async(
+                symbol, since_ms, cursor, limit=PAGE_SIZE
+            )
+            self.requests += 1
+            if error_msg:
+                logger.error(f"{symbol}: backfill stopped at {cursor}: {error_msg}")
+                self.failed.append(symbol)
+                return False
+
+            self.records += len(records)
+            if len(records) < PAGE_SIZE:
+                break
+
+            # Records are oldest first; continue just below the oldest one
+            cursor = records[0].timestamp - 1
+            if checkpoint_until is not None:
+                self.store.save_backfill_checkpoint(symbol, since_ms, checkpoint_until, cursor)
+        return True
+
+    async def _report_progress(self, started: float, total: int, interval: float = 5):
+        """Log throughput every few seconds"""
+        while True:
+            await asyncio.sleep(interval)
+            elapsed = time.monotonic() - started
+            logger.info(
+                f"Backfill: {self.completed}/{total} symbols, {self.records} records, "
+                f"{self.records / elapsed:.1f} records/sec"
+            )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backfill Bybit funding history into the local store")
+    parser.add_argument("--symbols", help="Comma-separated symbols (default: all USDT perpetuals)")
+    parser.add_argument("--days", type=int, default=365, help="How far back to fetch")
+    parser.add_argument("--concurrency", type=int, default=config.SETTLEMENT_FETCH_CONCURRENCY)
+    parser.add_argument("--db", default=config.FUNDING_HISTORY_DB)
+    parser.add_argument("--base-url", default=config.BYBIT_BASE_URL)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    store = FundingHistoryStore(args.db)
+    fetcher = BybitDataFetcher(
+        args.base_url,
+        args.concurrency,
+        rate_limiter=get_shared_limiter("bybit", config.BYBIT_MAX_REQUESTS_PER_SECOND),
+        history_store=store
+    )
+
+    try:
+        if args.symbols:
+            symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+        else:
+            symbols = sorted(await fetcher.get_tickers_async())
+        if not symbols:
+            logger.error("No symbols to backfill")
+            return
+
+        since_ms = FundingHistoryStore.day_start(int(time.time() * 1000)) - args.days * DAY_MS
+        logger.info(f"Backfilling {len(symbols)} symbols over {args.days} days")
+
+        stats = await FundingBackfill(fetcher, store, args.concurrency).run(symbols, since_ms)
+        logger.info(
+            f"Backfill done: {stats['records']} records from {stats['requests']} requests "
+            f"in {stats['elapsed']}s ({stats['records_per_sec']} records/sec), "
+            f"{stats['failed']} symbols failed"
+        )
+        logger.info(f"Store: {store.get_stats()}")
+    finally:
+        await fetcher.close()
+        store.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
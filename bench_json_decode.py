@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark decoding of a full /v5/market/tickers snapshot
+
+Compares the decoder backends in json_codec on a synthetic payload shaped like
+Bybit's linear tickers response (every field Bybit sends, as strings). Like the
+real response it mixes in dated futures and pre-listing rows, whose funding
+fields are empty strings:
+
+    python bench_json_decode.py --symbols 550 --futures 60 --prelisting 10 --rounds 50
+
+Reports parse time per snapshot plus allocated blocks and peak memory
+(tracemalloc) for one decode.
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+import json_codec
+
+
+def build_payload(n_symbols: int, n_futures: int = 0, n_prelisting: int = 0) -> bytes:
+    """
+    Build a tickers response body
+
+    Args:
+        n_symbols: USDT perpetual rows
+        n_futures: Dated futures rows (empty fundingRate / nextFundingTime)
+        n_prelisting: Pre-listing perpetual rows (empty prices and funding fields)
+    """
+    now_ms = int(time.time() * 1000)
+    tickers = []
+    for i in range(n_symbols + n_futures + n_prelisting):
+        price = random.uniform(0.001, 50000)
+        if i < n_symbols:
+            symbol = f"SYM{i}USDT"
+        elif i < n_symbols + n_futures:
+            symbol = f"SYM{i}-26DEC25"
+        else:
+            symbol = f"NEW{i}USDT"
+        tickers.append({
+            "symbol": symbol,
+            "lastPrice": f"{price:.4f}",
+            "indexPrice": f"{price:.4f}",
+            "markPrice": f"{price:.4f}",
+            "prevPrice24h": f"{price * 0.98:.4f}",
+            "price24hPcnt": f"{random.uniform(-0.2, 0.2):.6f}",
+            "highPrice24h": f"{price * 1.05:.4f}",
+            "lowPrice24h": f"{price * 0.95:.4f}",
+            "prevPrice1h": f"{price:.4f}",
+            "openInterest": f"{random.uniform(1e3, 1e8):.2f}",
+            "openInterestValue": f"{random.uniform(1e5, 1e9):.2f}",
+            "turnover24h": f"{random.uniform(1e5, 1e9):.4f}",
+            "volume24h": f"{random.uniform(1e3, 1e8):.4f}",
+            "fundingRate": f"{random.uniform(-0.01, 0.01):.8f}",
+            "nextFundingTime": str(now_ms + 3_600_000),
+            "predictedDeliveryPrice": "",
+            "basisRate": "",
+            "deliveryFeeRate": "",
+            "deliveryTime": "0",
+            "ask1Size": f"{random.uniform(1, 1000):.3f}",
+            "bid1Price": f"{price:.4f}",
+            "ask1Price": f"{price:.4f}",
+            "bid1Size": f"{random.uniform(1, 1000):.3f}",
+            "basis": "",
+            "fundingIntervalHour": random.choice(["1", "2", "4", "8"]),
+            "fundingCap": "0.02",
+            "preOpenPrice": "",
+            "preQty": "",
+            "curPreListingPhase": "",
+        })
+        if i >= n_symbols:
+            row = tickers[-1]
+            row.update(fundingRate="", nextFundingTime="", fundingIntervalHour="", fundingCap="")
+            if i < n_symbols + n_futures:
+                row.update(deliveryTime=str(now_ms + 90 * 86_400_000), basis="12.5", basisRate="0.0003")
+            else:
+                row.update(lastPrice="", price24hPcnt="", volume24h="", openInterest="",
+                           preOpenPrice=f"{price:.4f}", preQty="1000", curPreListingPhase="CallAuction")
+    return json.dumps({
+        "retCode": 0,
+        "retMsg": "OK",
+        "result": {"category": "linear", "list": tickers},
+        "retExtInfo": {},
+        "time": now_ms,
+    }).encode()
+
+
+def measure(decode, body: bytes, rounds: int) -> dict:
+    """Time a decoder over several rounds and trace one decode's allocations"""
+    decode(body)  # warm up
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        decode(body)
+    per_snapshot = (time.perf_counter() - started) / rounds
+
+    tracemalloc.start()
+    result = decode(body)
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = snapshot.statistics("filename")
+    return {
+        "ms": per_snapshot * 1000,
+        "blocks": sum(s.count for s in stats),
+        "retained_kb": sum(s.size for s in stats) / 1024,
+        "peak_kb": peak / 1024,
+        "tickers": len(result["result"]["list"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tickers snapshot decoding")
+    parser.add_argument("--symbols", type=int, default=550)
+    parser.add_argument("--futures", type=int, default=60, help="Dated futures rows")
+    parser.add_argument("--prelisting", type=int, default=10, help="Pre-listing rows")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    body = build_payload(args.symbols, args.futures, args.prelisting)
+    decoders = {"json (stdlib) + parse": lambda b: json_codec.decode_tickers_generic(b, json_codec._stdlib_loads)}
+    if json_codec.orjson is not None:
+        decoders["orjson + parse"] = lambda b: json_codec.decode_tickers_generic(b, json_codec.orjson.loads)
+    if json_codec.decode_tickers_msgspec is not None:
+        decoders["msgspec typed structs"] = json_codec.decode_tickers_msgspec
+    # What the fetcher calls: the active backend plus any fallback it needs
+    decoders["decode_tickers"] = json_codec.decode_tickers
+
+    print(f"Payload: {args.symbols} perpetuals + {args.futures} futures + {args.prelisting} pre-listing, "
+          f"{len(body) / 1024:.0f} KB, {args.rounds} rounds")
+    print(f"Active backend: {json_codec.TICKERS_BACKEND}\n")
+    print(f"{'decoder':<24}{'ms/snapshot':>12}{'alloc blocks':>14}{'retained KB':>13}{'peak KB':>10}")
+
+    for name, decode in decoders.items():
+        r = measure(decode, body, args.rounds)
+        print(f"{name:<24}{r['ms']:>12.2f}{r['blocks']:>14}{r['retained_kb']:>13.0f}{r['peak_kb']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from exchange_adapter import ExchangeAdapter
+from models import Settlement, Ticker
+from rate_limiter import RateLimiter, get_shared_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class BinanceFetcher(ExchangeAdapter):
+    """Fetch funding rate data from Binance USDⓈ-M futures"""
+
+    VENUE = "binance"
+
+    # Request weights (Binance limits by weight: 2400 per minute per IP)
+    PREMIUM_INDEX_WEIGHT = 10
+    TICKER_24HR_WEIGHT = 40
+    FUNDING_INFO_WEIGHT = 1
+    FUNDING_HISTORY_WEIGHT = 1
+
+    # fundingInfo only lists symbols with adjusted intervals/caps and rarely changes
+    FUNDING_INFO_TTL = 3600
+
+    def __init__(self, base_url: str = "https://fapi.binance.com", max_concurrency: int = 10,
+                 rate_limiter: Optional[RateLimiter] = None, weight_per_second: float = 20):
+        """
+        Args:
+            base_url: REST API root
+            max_concurrency: Max pooled connections
+            rate_limiter: Limiter to use (defaults to the shared "binance" limiter)
+            weight_per_second: Request weight budget for the shared limiter
+        """
+        # Binance counts weight per minute, so allow a burst of a few seconds of budget
+        # (one ticker round costs 51)
+        super().__init__(
+            base_url, max_concurrency,
+            rate_limiter or get_shared_limiter(self.VENUE, weight_per_second, burst=weight_per_second * 5)
+        )
+        self._intervals: Dict[str, int] = {}
+        self._intervals_fetched = 0.0
+
+    async def _get_funding_intervals(self) -> Dict[str, int]:
+        """Get symbols whose funding interval differs from 8h (cached for FUNDING_INFO_TTL)"""
+        if self._intervals_fetched and time.monotonic() - self._intervals_fetched < self.FUNDING_INFO_TTL:
+            return self._intervals
+
+        try:
+            data = await self._get_async("/fapi/v1/fundingInfo", {}, weight=self.FUNDING_INFO_WEIGHT)
+            self._intervals = {
+                item["symbol"]: int(item.get("fundingIntervalHours") or 8)
+                for item in data or []
+            }
+            self._intervals_fetched = time.monotonic()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Error fetching Binance funding info, keeping cached intervals: {e}")
+        return self._intervals
+
+    async def get_tickers_async(self, symbols: List[str] = None) -> Dict[str, Ticker]:
+        """
+        Get live funding tickers for all USDT perpetuals
+
+        Combines premiumIndex (funding rate, next funding time, mark price) with
+        the 24h ticker (last price, change, volume) and fundingInfo (intervals).
+
+        Args:
+            symbols: Optional list of specific symbols to filter
+
+        Returns:
+            Dict mapping symbol to Ticker
+        """
+        try:
+            premium, stats, intervals = await asyncio.gather(
+                self._get_async("/fapi/v1/premiumIndex", {}, weight=self.PREMIUM_INDEX_WEIGHT),
+                self._get_async("/fapi/v1/ticker/24hr", {}, weight=self.TICKER_24HR_WEIGHT),
+                self._get_funding_intervals(),
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error fetching Binance tickers: {e}")
+            return {}
+        except Exception as e:
+            logger.error(f"Unexpected error fetching Binance tickers: {e}")
+            return {}
+
+        wanted = set(symbols) if symbols else None
+        stats_by_symbol = {item["symbol"]: item for item in stats or []}
+        result = {}
+
+        for item in premium or []:
+            symbol = item.get("symbol", "")
+            next_funding_time = int(item.get("nextFundingTime") or 0)
+
+            # Quarterly contracts share the endpoint but never fund
+            if not symbol.endswith("USDT") or not next_funding_time:
+                continue
+            if wanted and symbol not in wanted:
+                continue
+
+            day = stats_by_symbol.get(symbol, {})
+            result[symbol] = Ticker(
+                symbol=symbol,
+                funding_rate=float(item.get("lastFundingRate") or 0),
+                next_funding_time=next_funding_time,
+                last_price=float(day.get("lastPrice") or item.get("markPrice") or 0),
+                price_24h_pcnt=float(day.get("priceChangePercent") or 0) / 100,
+                volume_24h=float(day.get("volume") or 0),
+                funding_interval_hours=intervals.get(symbol, 8),
+            )
+
+        logger.debug(f"Fetched {len(result)} tickers from Binance")
+        return result
+
+    async def get_funding_rate_history_async(self, symbol: str, limit: int = 10) -> List[Settlement]:
+        """
+        Get the most recent settlements for a symbol
+
+        Args:
+            symbol: Symbol name (e.g., "BTCUSDT")
+            limit: Number of records to fetch (1-1000)
+
+        Returns:
+            Settlements, newest first
+        """
+        try:
+            data = await self._get_async(
+                "/fapi/v1/fundingRate",
+                {"symbol": symbol, "limit": min(limit, 1000)},
+                weight=self.FUNDING_HISTORY_WEIGHT
+            )
+            # Binance returns oldest first
+            return [
+                Settlement(item["symbol"], float(item.get("fundingRate") or 0), int(item.get("fundingTime") or 0))
+                for item in reversed(data or [])
+            ]
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error fetching Binance funding history for {symbol}: {e}")
+            return []
+        except Exception as e:
+            logger.error(f"Unexpected error fetching Binance funding history: {e}")
+            return []
@@ -1,17 +1,35 @@
+import asyncio
 import logging
+import aiohttp
 import requests
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timezone, timedelta
 import time
 
+import json_codec
+from exchange_adapter import ExchangeAdapter
+from funding_store import DAY_MS, FundingHistoryStore
+from models import Instrument, Settlement, Ticker
+from rate_limiter import RateLimiter, get_shared_limiter
+
 logger = logging.getLogger(__name__)
 
 
-class BybitDataFetcher:
+class BybitDataFetcher(ExchangeAdapter):
     """Fetch funding rate data from Bybit API"""
     
-    def __init__(self, base_url: str = "https://api.bybit.com"):
-        self.base_url = base_url
+    VENUE = "bybit"
+    
+    def __init__(self, base_url: str = "https://api.bybit.com", max_concurrency: int = 10,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 history_store: Optional[FundingHistoryStore] = None):
+        # Every request (sync or async) is paced by the process-wide Bybit limiter
+        super().__init__(base_url, max_concurrency, rate_limiter or get_shared_limiter("bybit"))
+        
+        # Optional local settlement store: every history response is recorded,
+        # and closed days are served from it instead of Bybit
+        self.history_store = history_store
+        
         self.session = requests.Session()
         self.session.headers.update({
             "Content-Type": "application/json"
@@ -19,39 +37,116 @@ class BybitDataFetcher:
         self._all_symbols_cache = None
         self._cache_timestamp = None
     
-    def get_all_perpetual_symbols_with_intervals(self) -> Dict[str, Dict]:
+    def _is_rate_limited(self, status: int, data: Optional[Dict]) -> bool:
+        """Check whether a response is a Bybit rate limit rejection"""
+        if status in (403, 429):
+            return True
+        return bool(data) and data.get("retCode") in RateLimiter.RATE_LIMIT_RET_CODES
+    
+    def _get(self, path: str, params: Dict, timeout: float = 10,
+             decode: Callable[[bytes], Dict] = json_codec.loads) -> Dict:
         """
-        Get all available USDT perpetual symbols with their funding intervals
+        GET a Bybit endpoint through the shared rate limiter
+        
+        Args:
+            path: Endpoint path (e.g. "/v5/market/tickers")
+            params: Query parameters
+            timeout: Request timeout in seconds
+            decode: Body decoder (e.g. json_codec.decode_tickers for typed tickers)
         
         Returns:
-            Dict mapping symbol to info including funding interval
+            Decoded JSON response (raises requests exceptions on HTTP errors)
         """
-        try:
-            url = f"{self.base_url}/v5/market/tickers"
-            params = {"category": "linear"}
+        url = f"{self.base_url}{path}"
+        
+        for attempt in range(self.MAX_RATE_LIMIT_RETRIES + 1):
+            self.rate_limiter.acquire()
+            response = self.session.get(url, params=params, timeout=timeout)
+            data = decode(response.content) if response.status_code == 200 else None
+            
+            if self._is_rate_limited(response.status_code, data) and attempt < self.MAX_RATE_LIMIT_RETRIES:
+                self.rate_limiter.on_rate_limited(response.headers)
+                continue
             
-            response = self.session.get(url, params=params, timeout=15)
             response.raise_for_status()
-            data = response.json()
+            self.rate_limiter.update_from_headers(response.headers)
+            self.rate_limiter.on_success()
+            return data
+    
+    @staticmethod
+    def _parse_ticker(ticker: Dict) -> Ticker:
+        """Parse a raw Bybit ticker (REST or WebSocket) into typed fields"""
+        return json_codec.parse_ticker(ticker)
+    
+    @staticmethod
+    def _parse_tickers_response(data: Dict, symbols: List[str] = None) -> Dict[str, Ticker]:
+        """Collect USDT perpetual tickers from a response decoded with json_codec.decode_tickers"""
+        wanted = set(symbols) if symbols else None
+        result = {}
+        
+        for ticker in data.get("result", {}).get("list", []):
+            symbol = ticker.symbol
+            
+            # Filter by symbols if specified
+            if wanted and symbol not in wanted:
+                continue
+            
+            # Only include perpetuals (not futures with expiry)
+            if not symbol.endswith("USDT"):
+                continue
+            
+            result[symbol] = ticker
+        
+        return result
+    
+    def _record_history(self, records: List[Settlement]) -> List[Settlement]:
+        """Add fetched settlements to the local store (if configured) and pass them through"""
+        if self.history_store and records:
+            try:
+                self.history_store.add_settlements(records)
+            except Exception as e:
+                logger.warning(f"Could not record funding history: {e}")
+        return records
+    
+    async def _run_store(self, method, *args):
+        """Run a history store call in the default thread pool so SQLite I/O stays off the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+    
+    async def _record_history_async(self, records: List[Settlement]) -> List[Settlement]:
+        """Async variant of _record_history (the insert and commit run off the event loop)"""
+        if self.history_store and records:
+            await self._run_store(self._record_history, records)
+        return records
+    
+    @staticmethod
+    def _parse_funding_records(data: Dict) -> List[Settlement]:
+        """Parse the list of records from a funding history response"""
+        return [
+            Settlement(
+                item.get("symbol"),
+                float(item.get("fundingRate", 0)),
+                int(item.get("fundingRateTimestamp", 0))
+            )
+            for item in data.get("result", {}).get("list", [])
+        ]
+    
+    def get_all_perpetual_symbols_with_intervals(self) -> Dict[str, Ticker]:
+        """
+        Get all available USDT perpetual symbols with their funding intervals
+        
+        Returns:
+            Dict mapping symbol to its ticker (funding_interval_hours, next_funding_time, ...)
+        """
+        try:
+            data = self._get(
+                "/v5/market/tickers", {"category": "linear"}, timeout=15, decode=json_codec.decode_tickers
+            )
             
             if data.get("retCode") != 0:
                 logger.error(f"Bybit API error: {data.get('retMsg')}")
                 return {}
             
-            result = {}
-            for ticker in data.get("result", {}).get("list", []):
-                symbol = ticker.get("symbol", "")
-                if not symbol.endswith("USDT"):
-                    continue
-                
-                interval_hours = int(ticker.get("fundingIntervalHour", 8))
-                
-                result[symbol] = {
-                    "symbol": symbol,
-                    "fundingIntervalHours": interval_hours,
-                    "nextFundingTime": int(ticker.get("nextFundingTime", 0)),
-                    "currentRate": float(ticker.get("fundingRate", 0)),
-                }
+            result = self._parse_tickers_response(data)
             
             logger.info(f"Found {len(result)} USDT perpetual symbols on Bybit")
             return result
@@ -68,12 +163,9 @@ class BybitDataFetcher:
             List of all perpetual symbol names
         """
         try:
-            url = f"{self.base_url}/v5/market/tickers"
-            params = {"category": "linear"}
-            
-            response = self.session.get(url, params=params, timeout=15)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get(
+                "/v5/market/tickers", {"category": "linear"}, timeout=15, decode=json_codec.decode_tickers
+            )
             
             if data.get("retCode") != 0:
                 logger.error(f"Bybit API error: {data.get('retMsg')}")
@@ -81,7 +173,7 @@ class BybitDataFetcher:
             
             symbols = []
             for ticker in data.get("result", {}).get("list", []):
-                symbol = ticker.get("symbol", "")
+                symbol = ticker.symbol
                 # Only include USDT perpetuals (exclude futures with expiry dates)
                 if symbol.endswith("USDT") and not any(char.isdigit() for char in symbol.replace("USDT", "").replace("1000", "").replace("10000", "")):
                     symbols.append(symbol)
@@ -93,7 +185,7 @@ class BybitDataFetcher:
             logger.error(f"Error fetching perpetual symbols: {e}")
             return []
     
-    def get_tickers(self, symbols: List[str] = None) -> Dict[str, Dict]:
+    def get_tickers(self, symbols: List[str] = None) -> Dict[str, Ticker]:
         """
         Get current ticker data including funding rates for all linear perpetuals
         
@@ -104,44 +196,13 @@ class BybitDataFetcher:
             Dict mapping symbol to ticker data including funding rate
         """
         try:
-            url = f"{self.base_url}/v5/market/tickers"
-            params = {"category": "linear"}
-            
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get("/v5/market/tickers", {"category": "linear"}, decode=json_codec.decode_tickers)
             
             if data.get("retCode") != 0:
                 logger.error(f"Bybit API error: {data.get('retMsg')}")
                 return {}
             
-            result = {}
-            ticker_list = data.get("result", {}).get("list", [])
-            
-            for ticker in ticker_list:
-                symbol = ticker.get("symbol", "")
-                
-                # Filter by symbols if specified
-                if symbols and symbol not in symbols:
-                    continue
-                
-                # Only include perpetuals (not futures with expiry)
-                if not symbol.endswith("USDT"):
-                    continue
-                
-                funding_rate = ticker.get("fundingRate", "0")
-                next_funding_time = ticker.get("nextFundingTime", "0")
-                
-                result[symbol] = {
-                    "symbol": symbol,
-                    "lastPrice": float(ticker.get("lastPrice", 0)),
-                    "fundingRate": float(funding_rate) if funding_rate else 0,
-                    "nextFundingTime": int(next_funding_time) if next_funding_time else 0,
-                    "price24hPcnt": float(ticker.get("price24hPcnt", 0)),
-                    "volume24h": float(ticker.get("volume24h", 0)),
-                    "openInterest": float(ticker.get("openInterest", 0)),
-                    "timestamp": datetime.utcnow().isoformat()
-                }
+            result = self._parse_tickers_response(data, symbols)
             
             logger.debug(f"Fetched {len(result)} tickers from Bybit")
             return result
@@ -153,7 +214,7 @@ class BybitDataFetcher:
             logger.error(f"Unexpected error fetching tickers: {e}")
             return {}
     
-    def get_funding_rate_history(self, symbol: str, limit: int = 10) -> List[Dict]:
+    def get_funding_rate_history(self, symbol: str, limit: int = 10) -> List[Settlement]:
         """
         Get historical funding rates for a symbol
         
@@ -165,30 +226,19 @@ class BybitDataFetcher:
             List of funding rate records
         """
         try:
-            url = f"{self.base_url}/v5/market/funding/history"
             params = {
                 "category": "linear",
                 "symbol": symbol,
                 "limit": min(limit, 200)
             }
             
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get("/v5/market/funding/history", params)
             
             if data.get("retCode") != 0:
                 logger.error(f"Bybit API error for {symbol}: {data.get('retMsg')}")
                 return []
             
-            records = []
-            for item in data.get("result", {}).get("list", []):
-                records.append({
-                    "symbol": item.get("symbol"),
-                    "fundingRate": float(item.get("fundingRate", 0)),
-                    "fundingRateTimestamp": int(item.get("fundingRateTimestamp", 0))
-                })
-            
-            return records
+            return self._record_history(self._parse_funding_records(data))
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching funding history for {symbol}: {e}")
@@ -197,7 +247,7 @@ class BybitDataFetcher:
             logger.error(f"Unexpected error fetching funding history: {e}")
             return []
     
-    def get_funding_rate_history_by_date(self, symbol: str, date_str: str) -> Tuple[List[Dict], str]:
+    def get_funding_rate_history_by_date(self, symbol: str, date_str: str) -> Tuple[List[Settlement], str]:
         """
         Get historical funding rates for a symbol on a specific date
         
@@ -221,7 +271,12 @@ class BybitDataFetcher:
             start_time = int(start_dt.timestamp() * 1000)
             end_time = int(end_dt.timestamp() * 1000)
             
-            url = f"{self.base_url}/v5/market/funding/history"
+            # Closed days that were fetched before never change
+            if self.history_store:
+                records = self.history_store.get_day(symbol, start_time)
+                if records is not None:
+                    return records, ""
+            
             params = {
                 "category": "linear",
                 "symbol": symbol,
@@ -230,25 +285,21 @@ class BybitDataFetcher:
                 "limit": 200
             }
             
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get("/v5/market/funding/history", params)
             
             if data.get("retCode") != 0:
                 error_msg = data.get('retMsg', 'Unknown error')
                 logger.error(f"Bybit API error for {symbol}: {error_msg}")
                 return [], error_msg
             
-            records = []
-            for item in data.get("result", {}).get("list", []):
-                records.append({
-                    "symbol": item.get("symbol"),
-                    "fundingRate": float(item.get("fundingRate", 0)),
-                    "fundingRateTimestamp": int(item.get("fundingRateTimestamp", 0))
-                })
+            records = self._parse_funding_records(data)
             
             # Sort by timestamp ascending (oldest first)
-            records.sort(key=lambda x: x["fundingRateTimestamp"])
+            records.sort(key=lambda x: x.timestamp)
+            
+            if self.history_store:
+                self._record_history(records)
+                self.history_store.mark_day_fetched(symbol, start_time)
             
             return records, ""
             
@@ -274,11 +325,11 @@ class BybitDataFetcher:
         """
         tickers = self.get_tickers(symbols)
         return {
-            symbol: data["fundingRate"]
-            for symbol, data in tickers.items()
+            symbol: ticker.funding_rate
+            for symbol, ticker in tickers.items()
         }
     
-    def get_latest_settlement(self, symbol: str) -> Optional[Dict]:
+    def get_latest_settlement(self, symbol: str) -> Optional[Settlement]:
         """
         Get the most recent funding settlement for a symbol
         
@@ -293,26 +344,241 @@ class BybitDataFetcher:
             return history[0]
         return None
     
-    def get_latest_settlements_batch(self, symbols: List[str], batch_size: int = 50) -> Dict[str, Dict]:
+    def get_latest_settlements_batch(self, symbols: List[str]) -> Dict[str, Settlement]:
         """
-        Get latest settlements for multiple symbols with rate limiting
+        Get latest settlements for multiple symbols (paced by the shared rate limiter)
         
         Args:
             symbols: List of symbol names
-            batch_size: Number of API calls before a small delay
         
         Returns:
             Dict mapping symbol to latest settlement info
         """
         results = {}
         
-        for i, symbol in enumerate(symbols):
+        for symbol in symbols:
             settlement = self.get_latest_settlement(symbol)
             if settlement:
                 results[symbol] = settlement
+        
+        return results
+    
+    async def get_tickers_async(self, symbols: List[str] = None) -> Dict[str, Ticker]:
+        """
+        Async variant of get_tickers using the pooled aiohttp session
+        
+        Args:
+            symbols: Optional list of specific symbols to filter
+        
+        Returns:
+            Dict mapping symbol to ticker data including funding rate
+        """
+        try:
+            data = await self._get_async(
+                "/v5/market/tickers", {"category": "linear"}, decode=json_codec.decode_tickers
+            )
+            
+            if data.get("retCode") != 0:
+                logger.error(f"Bybit API error: {data.get('retMsg')}")
+                return {}
             
-            # Rate limiting: pause briefly every batch_size requests
-            if (i + 1) % batch_size == 0:
-                time.sleep(0.5)
+            result = self._parse_tickers_response(data, symbols)
+            logger.debug(f"Fetched {len(result)} tickers from Bybit")
+            return result
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error fetching Bybit tickers: {e}")
+            return {}
+        except Exception as e:
+            logger.error(f"Unexpected error fetching tickers: {e}")
+            return {}
+    
+    async def get_funding_rate_history_async(self, symbol: str, limit: int = 10,
+                                             record: bool = True) -> List[Settlement]:
+        """
+        Async variant of get_funding_rate_history using the pooled aiohttp session
         
+        Args:
+            symbol: Symbol name (e.g., "BTCUSDT")
+            limit: Number of records to fetch (1-200)
+            record: Add the records to the history store (batch callers record them together)
+        
+        Returns:
+            List of funding rate records
+        """
+        try:
+            params = {
+                "category": "linear",
+                "symbol": symbol,
+                "limit": min(limit, 200)
+            }
+            
+            data = await self._get_async("/v5/market/funding/history", params)
+            
+            if data.get("retCode") != 0:
+                logger.error(f"Bybit API error for {symbol}: {data.get('retMsg')}")
+                return []
+            
+            records = self._parse_funding_records(data)
+            return await self._record_history_async(records) if record else records
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error fetching funding history for {symbol}: {e}")
+            return []
+        except Exception as e:
+            logger.error(f"Unexpected error fetching funding history: {e}")
+            return []
+    
+    async def get_instruments_async(self) -> Dict[str, Instrument]:
+        """
+        Get contract metadata for all trading USDT perpetuals
+        
+        One request covers the whole linear category (limit=1000); the cursor
+        is only followed if Bybit pages the response.
+        
+        Returns:
+            Dict mapping symbol to Instrument (empty on error)
+        """
+        try:
+            result = {}
+            cursor = ""
+            while True:
+                params = {"category": "linear", "limit": 1000}
+                if cursor:
+                    params["cursor"] = cursor
+                
+                data = await self._get_async("/v5/market/instruments-info", params, timeout=15)
+                
+                if data.get("retCode") != 0:
+                    logger.error(f"Bybit API error: {data.get('retMsg')}")
+                    return {}
+                
+                page = data.get("result", {})
+                for item in page.get("list", []):
+                    symbol = item.get("symbol", "")
+                    if item.get("contractType") != "LinearPerpetual" or item.get("quoteCoin") != "USDT":
+                        continue
+                    if item.get("status") != "Trading":
+                        continue
+                    # fundingInterval is in minutes
+                    minutes = int(item.get("fundingInterval") or 480)
+                    result[symbol] = Instrument(symbol, max(1, minutes // 60), item["status"])
+                
+                cursor = page.get("nextPageCursor") or ""
+                if not cursor or not page.get("list"):
+                    break
+            
+            logger.debug(f"Fetched {len(result)} instruments from Bybit")
+            return result
+        
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error fetching Bybit instruments: {e}")
+            return {}
+        except Exception as e:
+            logger.error(f"Unexpected error fetching instruments: {e}")
+            return {}
+    
+    async def get_funding_rate_history_range_async(
+        self, symbol: str, start_time: int, end_time: int, limit: int = 200
+    ) -> Tuple[List[Settlement], str]:
+        """
+        Get funding rates for a symbol between two timestamps (async)
+        
+        Args:
+            symbol: Symbol name (e.g., "BTCUSDT")
+            start_time: Range start in milliseconds
+            end_time: Range end in milliseconds
+            limit: Max records (1-200)
+        
+        Returns:
+            Tuple of (records sorted oldest first, error message if any)
+        """
+        try:
+            params = {
+                "category": "linear",
+                "symbol": symbol,
+                "startTime": start_time,
+                "endTime": end_time,
+                "limit": min(limit, 200)
+            }
+            
+            data = await self._get_async("/v5/market/funding/history", params)
+            
+            if data.get("retCode") != 0:
+                error_msg = data.get('retMsg', 'Unknown error')
+                logger.error(f"Bybit API error for {symbol}: {error_msg}")
+                return [], error_msg
+            
+            records = self._parse_funding_records(data)
+            records.sort(key=lambda x: x.timestamp)
+            return await self._record_history_async(records), ""
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error fetching funding history for {symbol}: {e}")
+            return [], str(e) or "Request failed"
+        except Exception as e:
+            logger.error(f"Unexpected error fetching funding history: {e}")
+            return [], str(e)
+    
+    async def get_funding_rate_history_day_async(self, symbol: str, day_start_ms: int) -> Tuple[List[Settlement], str]:
+        """
+        Get a symbol's settlements for one UTC day, served locally when possible
+        
+        Closed days already in the history store are answered without a request;
+        otherwise the day is fetched and stored (and marked synced once closed).
+        
+        Args:
+            symbol: Symbol name (e.g., "BTCUSDT")
+            day_start_ms: Start of the UTC day in milliseconds
+        
+        Returns:
+            Tuple of (records sorted oldest first, error message if any)
+        """
+        if self.history_store:
+            records = await self._run_store(self.history_store.get_day, symbol, day_start_ms)
+            if records is not None:
+                return records, ""
+        
+        records, error_msg = await self.get_funding_rate_history_range_async(
+            symbol, day_start_ms, day_start_ms + DAY_MS - 1
+        )
+        if not error_msg and self.history_store:
+            await self._run_store(self.history_store.mark_day_fetched, symbol, day_start_ms)
+        return records, error_msg
+    
+    async def get_latest_settlements_batch_async(self, symbols: List[str], concurrency: int = None) -> Dict[str, Settlement]:
+        """
+        Get latest settlements for multiple symbols concurrently
+        
+        Requests run through a bounded pool so a full-universe sweep finishes
+        in seconds while staying under Bybit's per-IP limit. The sweep's
+        settlements are recorded in one store transaction, off the event loop.
+        
+        Args:
+            symbols: List of symbol names
+            concurrency: Max requests in flight (defaults to max_concurrency)
+        
+        Returns:
+            Dict mapping symbol to latest settlement info
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.max_concurrency)
+        
+        async def fetch(symbol: str) -> Optional[Settlement]:
+            async with semaphore:
+                history = await self.get_funding_rate_history_async(symbol, limit=1, record=False)
+            return history[0] if history else None
+        
+        started = time.monotonic()
+        settlements = await asyncio.gather(*(fetch(symbol) for symbol in symbols))
+        
+        results = {
+            symbol: settlement
+            for symbol, settlement in zip(symbols, settlements)
+            if settlement
+        }
+        await self._record_history_async(list(results.values()))
+        logger.debug(
+            f"Fetched {len(results)}/{len(symbols)} settlements in {time.monotonic() - started:.2f}s "
+            f"(rate limiter: {self.rate_limiter.get_stats()})"
+        )
         return results
@@ -0,0 +1,262 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import aiohttp
+
+import json_codec
+from bybit_fetcher import BybitDataFetcher
+from models import Ticker
+
+logger = logging.getLogger(__name__)
+
+
+class BybitTickerStream:
+    """Keep a live ticker snapshot from Bybit's public WebSocket (tickers.{symbol})"""
+
+    def __init__(
+        self,
+        symbols: Iterable[str],
+        url: str = "wss://stream.bybit.com/v5/public/linear",
+        on_update: Optional[Callable[[str, Ticker], None]] = None,
+        ping_interval: float = 20,
+        stale_timeout: float = 60,
+        args_per_request: int = 10
+    ):
+        """
+        Initialize the ticker stream
+
+        Args:
+            symbols: Symbols to subscribe to
+            url: Public linear WebSocket endpoint
+            on_update: Called with (symbol, ticker) after every snapshot/delta is applied
+            ping_interval: Seconds between heartbeat pings (Bybit drops idle sockets after ~30s)
+            stale_timeout: Reconnect if no message arrives within this many seconds
+            args_per_request: Max topics per subscribe request
+        """
+        self.url = url
+        self.symbols = set(symbols)
+        self.on_update = on_update
+        self.ping_interval = ping_interval
+        self.stale_timeout = stale_timeout
+        self.args_per_request = args_per_request
+
+        # Parsed tickers (same shape as BybitDataFetcher.get_tickers) and raw merged fields
+        self.snapshot: Dict[str, Ticker] = {}
+        self._raw: Dict[str, Dict] = {}
+
+        # Last cross sequence and message timestamp seen per symbol, to catch out-of-order messages
+        self._sequences: Dict[str, int] = {}
+        self._timestamps: Dict[str, int] = {}
+
+        # Symbols subscribed (or resubscribed) whose fresh snapshot has not arrived yet,
+        # with the monotonic time they started waiting; their deltas are ignored meanwhile
+        self._awaiting: Dict[str, float] = {}
+
+        self.running = False
+        self.connected = False
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._last_message_time = 0.0
+
+        # Counters
+        self.reconnects = 0
+        self.gaps_detected = 0
+        self.messages_received = 0
+
+    async def run(self):
+        """Connect and stream until stop() is called, reconnecting with backoff"""
+        self.running = True
+        backoff = 1
+
+        async with aiohttp.ClientSession() as session:
+            while self.running:
+                try:
+                    await self._stream(session)
+                    backoff = 1
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Ticker stream error: {e}")
+                finally:
+                    # Nothing keeps the tickers current until the next connection's snapshots
+                    self.connected = False
+                    self._ws = None
+                    self.snapshot.clear()
+
+                if not self.running:
+                    break
+
+                self.reconnects += 1
+                logger.info(f"Reconnecting ticker stream in {backoff}s...")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+    async def stop(self):
+        """Stop streaming and close the socket"""
+        self.running = False
+        if self._ws is not None and not self._ws.closed:
+            await self._ws.close()
+
+    async def set_symbols(self, symbols: Iterable[str]):
+        """Update the subscribed universe (new listings / delistings)"""
+        new_symbols = set(symbols)
+        added = new_symbols - self.symbols
+        removed = self.symbols - new_symbols
+        self.symbols = new_symbols
+
+        for symbol in removed:
+            self.snapshot.pop(symbol, None)
+            self._raw.pop(symbol, None)
+            self._sequences.pop(symbol, None)
+            self._timestamps.pop(symbol, None)
+            self._awaiting.pop(symbol, None)
+
+        if self.connected and self._ws is not None:
+            if removed:
+                await self._send_topics(self._ws, "unsubscribe", sorted(removed))
+            if added:
+                now = time.monotonic()
+                self._awaiting.update((symbol, now) for symbol in added)
+                await self._send_topics(self._ws, "subscribe", sorted(added))
+
+    async def _stream(self, session: aiohttp.ClientSession):
+        """Run a single connection until it drops or goes stale"""
+        async with session.ws_connect(self.url, heartbeat=None) as ws:
+            self._ws = ws
+            self.connected = True
+            self._last_message_time = time.monotonic()
+            logger.info(f"Ticker stream connected, subscribing to {len(self.symbols)} symbols")
+
+            # Anything held from the previous connection may have missed deltas:
+            # drop it and wait for the fresh snapshot every topic gets after subscribing
+            self._raw.clear()
+            self._sequences.clear()
+            self._timestamps.clear()
+            self.snapshot.clear()
+            self._awaiting = dict.fromkeys(self.symbols, self._last_message_time)
+            await self._send_topics(ws, "subscribe", sorted(self.symbols))
+
+            ping_task = asyncio.create_task(self._ping_loop(ws))
+            try:
+                while self.running:
+                    try:
+                        msg = await ws.receive(timeout=self.stale_timeout)
+                    except asyncio.TimeoutError:
+                        logger.warning(f"No ticker messages for {self.stale_timeout}s, reconnecting")
+                        return
+
+                    if msg.type == aiohttp.WSMsgType.TEXT:
+                        self._last_message_time = time.monotonic()
+                        await self._handle_message(ws, json_codec.loads(msg.data))
+                    elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.ERROR):
+                        logger.warning("Ticker stream closed by server")
+                        return
+            finally:
+                ping_task.cancel()
+
+    async def _ping_loop(self, ws: aiohttp.ClientWebSocketResponse):
+        """Send application-level pings to keep the connection alive"""
+        while not ws.closed:
+            await asyncio.sleep(self.ping_interval)
+            try:
+                await ws.send_json({"op": "ping"})
+            except Exception:
+                return
+
+    async def _send_topics(self, ws: aiohttp.ClientWebSocketResponse, op: str, symbols: List[str]):
+        """Send subscribe/unsubscribe requests in chunks"""
+        for i in range(0, len(symbols), self.args_per_request):
+            chunk = symbols[i:i + self.args_per_request]
+            await ws.send_json({"op": op, "args": [f"tickers.{symbol}" for symbol in chunk]})
+
+    async def _handle_message(self, ws: aiohttp.ClientWebSocketResponse, message: Dict):
+        """Apply a snapshot/delta message or handle an op response"""
+        if "op" in message:
+            if message.get("op") == "subscribe" and not message.get("success", True):
+                logger.error(f"Ticker subscribe failed: {message.get('ret_msg')}")
+            return
+
+        topic = message.get("topic", "")
+        if not topic.startswith("tickers."):
+            return
+
+        self.messages_received += 1
+        symbol = topic.split(".", 1)[1]
+        if symbol not in self.symbols:
+            return
+
+        msg_type = message.get("type")
+        data = message.get("data", {})
+        sequence = int(message.get("cs", 0) or 0)
+        timestamp = int(message.get("ts", 0) or 0)
+
+        prev_sequence = self._sequences.get(symbol)
+        prev_timestamp = self._timestamps.get(symbol)
+        regressed = (
+            (prev_sequence is not None and sequence and sequence < prev_sequence)
+            or (prev_timestamp is not None and timestamp and timestamp < prev_timestamp)
+        )
+
+        if msg_type == "snapshot":
+            if regressed:
+                # Older snapshot overtaken by newer data
+                return
+            self._raw[symbol] = dict(data)
+            self._awaiting.pop(symbol, None)
+        elif msg_type == "delta":
+            if symbol in self._awaiting:
+                # Resubscribed; its fresh snapshot is on the way
+                return
+            raw = self._raw.get(symbol)
+            if raw is None or regressed:
+                # No base to apply to, or order went backwards: resync from a fresh snapshot
+                self.gaps_detected += 1
+                logger.warning(
+                    f"{symbol}: Ticker delta {'out of order' if regressed else 'without snapshot'}, resubscribing"
+                )
+                await self._resync(ws, symbol)
+                return
+            raw.update(data)
+        else:
+            return
+
+        if sequence:
+            self._sequences[symbol] = sequence
+        if timestamp:
+            self._timestamps[symbol] = timestamp
+
+        try:
+            ticker = BybitDataFetcher._parse_ticker(self._raw[symbol])
+        except (TypeError, ValueError) as e:
+            logger.debug(f"{symbol}: Could not parse ticker update: {e}")
+            return
+
+        self.snapshot[symbol] = ticker
+        if self.on_update:
+            try:
+                self.on_update(symbol, ticker)
+            except Exception as e:
+                logger.error(f"Error in ticker update handler for {symbol}: {e}")
+
+    async def _resync(self, ws: aiohttp.ClientWebSocketResponse, symbol: str):
+        """Mark a symbol stale and resubscribe it for a fresh snapshot"""
+        self.snapshot.pop(symbol, None)
+        self._raw.pop(symbol, None)
+        self._sequences.pop(symbol, None)
+        self._timestamps.pop(symbol, None)
+        self._awaiting[symbol] = time.monotonic()
+        await self._send_topics(ws, "unsubscribe", [symbol])
+        await self._send_topics(ws, "subscribe", [symbol])
+
+    def is_live(self) -> bool:
+        """
+        True if connected, receiving data and not waiting on fresh snapshots
+
+        Symbols still waiting after stale_timeout (e.g. no ticker published)
+        no longer hold the stream back.
+        """
+        now = time.monotonic()
+        if not (self.connected and self.snapshot and now - self._last_message_time < self.stale_timeout):
+            return False
+        return all(now - since >= self.stale_timeout for since in self._awaiting.values())
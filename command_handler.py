@@ -10,18 +10,31 @@ Commands:
 - /funding <SYMBOL> - Show current funding rate for a symbol
 - /funding <SYMBOL> <DDMMYY> - Show historical funding rates for a symbol on a specific date
 - /funding <SYMBOL> <DDMMYY> <HH:MM:SS> - Show funding rate for specific time (or next settlement)
+- /funding <SYMBOL>[,<SYMBOL>...] <DDMMYY>-<DDMMYY> - Cumulative funding over a date range, paged
 """
 
 import asyncio
-import aiohttp
 import logging
 import os
 import sys
 import signal
 import html
 from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
+from config import config
+from bybit_fetcher import BybitDataFetcher
+from funding_store import FundingHistoryStore
+from history_cache import HistoryDayCache
+from history_range import HistoryPager, HistoryQuery, load_series, parse_ddmmyy
+from models import Ticker
+from reply_cache import ReplyCache
+from ticker_snapshot import TickerSnapshotService
+from telegram_client import TelegramClient
+from update_dispatcher import UpdateDispatcher, update_chat_id
+from webhook_server import receive_updates
+
 load_dotenv()
 
 # Setup logging
@@ -46,11 +59,45 @@ BYBIT_BASE_URL = "https://api.bybit.com"
 
 
 class CommandHandler:
-    def __init__(self):
+    def __init__(self, snapshot: TickerSnapshotService = None, telegram: TelegramClient = None):
+        """
+        Args:
+            snapshot: Shared ticker snapshot (start_bot.py passes the one the alert monitor uses)
+            telegram: Shared Telegram client (reuses its pooled keep-alive session)
+        """
         self.running = True
-        self.session = None
-        self.symbols_cache = {}
-        self.symbols_cache_time = None
+        self.telegram = telegram or TelegramClient(
+            BOT_TOKEN,
+            CHAT_ID,
+            topic_id=int(TOPIC_ID) if TOPIC_ID else None
+        )
+        self.snapshot = snapshot or TickerSnapshotService(
+            BybitDataFetcher(BYBIT_BASE_URL, history_store=FundingHistoryStore(config.FUNDING_HISTORY_DB)),
+            config.TICKER_SNAPSHOT_TTL
+        )
+        
+        # Past days never change; repeat lookups skip the store and Bybit
+        self.history_cache = HistoryDayCache(
+            self.snapshot.fetcher,
+            max_entries=config.HISTORY_CACHE_SIZE,
+            today_ttl=config.HISTORY_CACHE_TODAY_TTL,
+            cache_file=config.HISTORY_CACHE_FILE or None
+        )
+        
+        # Snapshot replies are rendered once per snapshot version
+        self.reply_cache = ReplyCache(config.REPLY_CACHE_SIZE)
+        
+        # Range / comparison results, paged with inline keyboard buttons
+        self.history_pager = HistoryPager(config.HISTORY_PAGER_SIZE)
+        
+        # One slow command (e.g. a history lookup) must not hold up other chats
+        self.dispatcher = UpdateDispatcher(
+            self.handle_update,
+            max_concurrency=config.COMMAND_MAX_CONCURRENCY,
+            max_pending=config.COMMAND_MAX_PENDING,
+            deadline=config.COMMAND_DEADLINE,
+            on_timeout=self._reply_timed_out
+        )
         
         # Signal handlers
         signal.signal(signal.SIGINT, self._shutdown)
@@ -64,37 +111,41 @@ class CommandHandler:
         """Start the command handler"""
         logger.info("Starting Command Handler...")
         
-        async with aiohttp.ClientSession() as session:
-            self.session = session
-            
-            # Pre-cache symbols
-            await self.refresh_symbols_cache()
-            
-            logger.info("Command Handler ready - listening for commands")
-            
-            last_update_id = 0
-            while self.running:
-                try:
-                    # Poll for updates with short timeout
-                    url = f"https://api.telegram.org/bot{BOT_TOKEN}/getUpdates"
-                    params = {"offset": last_update_id + 1, "timeout": 2}
-                    
-                    async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=5)) as resp:
-                        if resp.status == 200:
-                            data = await resp.json()
-                            if data.get("ok"):
-                                for update in data.get("result", []):
-                                    last_update_id = update.get("update_id", last_update_id)
-                                    await self.handle_update(update)
-                
-                except asyncio.TimeoutError:
-                    continue
-                except Exception as e:
-                    logger.error(f"Error: {e}")
-                    await asyncio.sleep(1)
+        # Pre-cache symbols
+        await self.refresh_symbols_cache()
+        
+        logger.info("Command Handler ready - listening for commands")
+        
+        # Webhook when TELEGRAM_WEBHOOK_URL is set, long polling otherwise
+        await receive_updates(
+            self.telegram,
+            self.dispatcher.submit,
+            lambda: self.running,
+            webhook_url=config.TELEGRAM_WEBHOOK_URL,
+            secret_token=config.TELEGRAM_WEBHOOK_SECRET,
+            host=config.TELEGRAM_WEBHOOK_HOST,
+            port=config.TELEGRAM_WEBHOOK_PORT,
+            poll_timeout=config.TELEGRAM_LONG_POLL_TIMEOUT
+        )
+        
+        await self.dispatcher.stop()
+        logger.info(f"Dispatcher: {self.dispatcher.get_stats()}")
+        logger.info(f"History cache: {self.history_cache.get_stats()}")
+        self.history_cache.save()
+        await self.telegram.close()
+    
+    async def _reply_timed_out(self, update: dict):
+        """Tell the user their command ran past COMMAND_DEADLINE"""
+        chat_id = update_chat_id(update)
+        if chat_id is not None:
+            await self.send_message(chat_id, "⏱ That took too long. Please try again in a moment.")
     
     async def handle_update(self, update: dict):
         """Handle a Telegram update"""
+        if "callback_query" in update:
+            await self.handle_callback(update["callback_query"])
+            return
+        
         message = update.get("message", {})
         text = message.get("text", "")
         chat = message.get("chat", {})
@@ -139,14 +190,21 @@ For support, contact @DecentralizedJM"""
         # Handle /funding command
         if command == "/funding":
             if len(parts) > 1:
-                symbol = parts[1].upper()
-                if not symbol.endswith("USDT"):
-                    symbol += "USDT"
+                # One symbol, or several separated by commas (BTC,ETH)
+                symbols = []
+                for name in parts[1].upper().split(","):
+                    if name and not name.endswith("USDT"):
+                        name += "USDT"
+                    if name and name not in symbols:
+                        symbols.append(name)
+                symbol = symbols[0] if symbols else parts[1].upper()
                 
                 # Check if date is provided (DDMMYY format)
                 if len(parts) > 2:
                     date_str = parts[2]
-                    if len(date_str) == 6 and date_str.isdigit():
+                    if len(symbols) > 1 or "-" in date_str:
+                        await self.send_history_range(chat_id, symbols, date_str)
+                    elif len(date_str) == 6 and date_str.isdigit():
                         # Check if time is also provided (HH:MM:SS format)
                         time_str = None
                         if len(parts) > 3:
@@ -154,6 +212,8 @@ For support, contact @DecentralizedJM"""
                         await self.send_historical_funding(chat_id, symbol, date_str, time_str)
                     else:
                         await self.send_message(chat_id, "❌ Invalid date format. Use DDMMYY (e.g., 010126 for 01 Jan 2026)")
+                elif len(symbols) > 1:
+                    await self.send_message(chat_id, "❌ Comparing symbols needs a date or range, e.g. /funding BTC,ETH 010126-070126")
                 else:
                     await self.send_symbol_funding(chat_id, symbol)
             else:
@@ -164,71 +224,69 @@ For support, contact @DecentralizedJM"""
             logger.info(f"Processing /status command")
             await self.send_status(chat_id)
     
-    async def send_message(self, chat_id: int, text: str):
-        """Send a message to Telegram"""
-        try:
-            url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
-            payload = {"chat_id": chat_id, "text": text, "parse_mode": "HTML"}
-            
-            # Add topic ID if configured
-            if TOPIC_ID:
-                payload["message_thread_id"] = int(TOPIC_ID)
-            
-            async with self.session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-                if resp.status != 200:
-                    error = await resp.text()
-                    logger.error(f"Send message failed: {error}")
-                return resp.status == 200
-        except Exception as e:
-            logger.error(f"Send message error: {e}")
-            return False
+    async def send_message(self, chat_id: int, text: str, reply_markup: Optional[Dict] = None):
+        """Send a message to Telegram (topic ID is added by the client if configured)"""
+        return await self.telegram.send_message(text, chat_id=chat_id, reply_markup=reply_markup)
+    
+    async def handle_callback(self, callback_query: dict):
+        """Handle an inline keyboard press (history paging)"""
+        parsed = HistoryPager.parse_callback(callback_query.get("data", ""))
+        if not parsed:
+            await self.telegram.answer_callback_query(callback_query.get("id"))
+            return
+        
+        token, page = parsed
+        query = self.history_pager.get(token)
+        if query is None:
+            await self.telegram.answer_callback_query(
+                callback_query.get("id"), "This result has expired, please run the command again."
+            )
+            return
+        
+        page = min(page, query.page_count - 1)
+        message = callback_query.get("message", {})
+        await self.telegram.edit_message_text(
+            message.get("chat", {}).get("id"),
+            message.get("message_id"),
+            query.render_page(page),
+            reply_markup=HistoryPager.keyboard(token, page, query.page_count)
+        )
+        await self.telegram.answer_callback_query(callback_query.get("id"))
     
     async def refresh_symbols_cache(self):
-        """Refresh the symbols cache from Bybit"""
-        try:
-            url = f"{BYBIT_BASE_URL}/v5/market/tickers?category=linear"
-            async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    if data.get("retCode") == 0:
-                        symbols = {}
-                        for item in data.get("result", {}).get("list", []):
-                            symbol = item.get("symbol", "")
-                            if symbol.endswith("USDT"):
-                                symbols[symbol] = {
-                                    "fundingRate": float(item.get("fundingRate", 0)),
-                                    "nextFundingTime": int(item.get("nextFundingTime", 0)),
-                                    "lastPrice": item.get("lastPrice", "0"),
-                                }
-                        self.symbols_cache = symbols
-                        self.symbols_cache_time = datetime.now(timezone.utc)
-                        logger.info(f"Cached {len(symbols)} symbols")
-        except Exception as e:
-            logger.error(f"Cache refresh error: {e}")
+        """Warm the shared ticker snapshot"""
+        tickers = await self.snapshot.get()
+        logger.info(f"Cached {len(tickers)} symbols")
     
-    async def get_symbol_data(self, symbol: str) -> dict:
-        """Get data for a specific symbol"""
-        # Refresh cache if older than 30 seconds
-        if not self.symbols_cache_time or \
-           (datetime.now(timezone.utc) - self.symbols_cache_time).total_seconds() > 30:
-            await self.refresh_symbols_cache()
-        
-        return self.symbols_cache.get(symbol)
+    async def get_symbol_data(self, symbol: str) -> Optional[Ticker]:
+        """Get data for a specific symbol (refreshed at most once per snapshot TTL)"""
+        tickers = await self.snapshot.get()
+        return tickers.get(symbol)
     
     async def send_symbol_funding(self, chat_id: int, symbol: str):
-        """Send funding rate for a specific symbol"""
-        data = await self.get_symbol_data(symbol)
+        """Send funding rate for a specific symbol (rendered once per snapshot version)"""
+        tickers = await self.snapshot.get()
+        version = self.snapshot.version
+        key = ("symbol", symbol)
+        
+        message = self.reply_cache.get(version, key)
+        if message is None:
+            message = self._render_symbol_funding(symbol, tickers.get(symbol))
+            self.reply_cache.put(version, key, message)
         
+        await self.send_message(chat_id, message)
+    
+    def _render_symbol_funding(self, symbol: str, data: Optional[Ticker]) -> str:
+        """Format the live funding reply for a symbol"""
         # Escape symbol for HTML safety
         safe_symbol = html.escape(symbol)
         
         if not data:
-            await self.send_message(chat_id, f"❌ Symbol <b>{safe_symbol}</b> not found on Mudrex.")
-            return
+            return f"❌ Symbol <b>{safe_symbol}</b> not found on Mudrex."
         
-        rate = data["fundingRate"]
+        rate = data.funding_rate
         rate_pct = rate * 100
-        next_funding = data["nextFundingTime"]
+        next_funding = data.next_funding_time
         
         # Format rate
         rate_str = f"+{rate_pct:.4f}%" if rate >= 0 else f"{rate_pct:.4f}%"
@@ -243,15 +301,13 @@ For support, contact @DecentralizedJM"""
         else:
             next_time_str = "Unknown"
         
-        message = f"""{color} <b>{safe_symbol}</b>
+        return f"""{color} <b>{safe_symbol}</b>
 
 • Bias: {bias}
 • Live Rate: <b>{rate_str}</b>
 • Next Settlement: {next_time_str}
 
 <i>💡 Tip: Use /funding {safe_symbol.replace('USDT', '')} DDMMYY for historical rates</i>"""
-        
-        await self.send_message(chat_id, message)
     
     async def send_historical_funding(self, chat_id: int, symbol: str, date_str: str, time_str: str = None):
         """Send historical funding rates for a specific symbol and date (optionally filtered by time)"""
@@ -301,84 +357,60 @@ For support, contact @DecentralizedJM"""
                 return
         
         try:
-            # Calculate start and end timestamps for the date (UTC)
+            # Start of the date (UTC)
             start_dt = datetime(year, month, day, 0, 0, 0, tzinfo=timezone.utc)
-            end_dt = start_dt + timedelta(days=1) - timedelta(milliseconds=1)
-            
             start_time = int(start_dt.timestamp() * 1000)
-            end_time = int(end_dt.timestamp() * 1000)
-            
-            # Fetch historical funding rates from Bybit API
-            url = f"{BYBIT_BASE_URL}/v5/market/funding/history"
-            params = {
-                "category": "linear",
-                "symbol": symbol,
-                "startTime": start_time,
-                "endTime": end_time,
-                "limit": 200
-            }
             
             logger.info(f"Fetching historical funding for {symbol} on {date_display}" + (f" at {time_str}" if time_str else ""))
             
-            async with self.session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-                if resp.status != 200:
-                    await self.send_message(chat_id, f"❌ Failed to fetch historical data for <b>{safe_symbol}</b>")
-                    return
+            # Cached per (symbol, day); misses go to the local history store, then the Bybit API
+            records, error_msg = await self.history_cache.get_day(symbol, start_time)
+            
+            if error_msg:
+                await self.send_message(chat_id, f"❌ API Error: {html.escape(error_msg)}")
+                return
+            
+            if not records:
+                await self.send_message(chat_id, f"❌ No funding rate data found for <b>{safe_symbol}</b> on {date_display}")
+                return
+            
+            # If time is provided, find the closest settlement at or after the given time
+            if target_time_ist and target_timestamp:
+                matching_record = None
+                
+                for record in records:
+                    record_timestamp = record.timestamp
+                    if record_timestamp >= target_timestamp:
+                        matching_record = record
+                        break
                 
-                data = await resp.json()
+                # If no record found at or after the time, get the last one before it
+                if not matching_record:
+                    for record in reversed(records):
+                        record_timestamp = record.timestamp
+                        if record_timestamp <= target_timestamp:
+                            matching_record = record
+                            break
                 
-                if data.get("retCode") != 0:
-                    error_msg = data.get('retMsg', 'Unknown error')
-                    logger.error(f"Bybit API error: {error_msg}")
-                    await self.send_message(chat_id, f"❌ API Error: {error_msg}")
+                if not matching_record:
+                    await self.send_message(chat_id, f"❌ No funding rate found for <b>{safe_symbol}</b> at {time_str} on {date_display}")
                     return
                 
-                records = data.get("result", {}).get("list", [])
+                # Format single record response
+                rate = matching_record.funding_rate
+                rate_pct = rate * 100
+                timestamp = matching_record.timestamp
                 
-                if not records:
-                    await self.send_message(chat_id, f"❌ No funding rate data found for <b>{safe_symbol}</b> on {date_display}")
-                    return
+                # Format time in IST
+                dt = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
+                dt_ist = dt + timedelta(hours=5, minutes=30)
+                settlement_time_str = dt_ist.strftime('%d/%m/%y %H:%M:%S')
                 
-                # Sort by timestamp ascending (oldest first)
-                records.sort(key=lambda x: int(x.get("fundingRateTimestamp", 0)))
+                emoji = "🟢" if rate >= 0 else "🔴"
+                rate_str = f"+{rate_pct:.4f}%" if rate >= 0 else f"{rate_pct:.4f}%"
+                bias = "Positive (Longs Pay Shorts)" if rate >= 0 else "Negative (Shorts Pay Longs)"
                 
-                # If time is provided, find the closest settlement at or after the given time
-                if target_time_ist and target_timestamp:
-                    matching_record = None
-                    
-                    for record in records:
-                        record_timestamp = int(record.get("fundingRateTimestamp", 0))
-                        if record_timestamp >= target_timestamp:
-                            matching_record = record
-                            break
-                    
-                    # If no record found at or after the time, get the last one before it
-                    if not matching_record:
-                        for record in reversed(records):
-                            record_timestamp = int(record.get("fundingRateTimestamp", 0))
-                            if record_timestamp <= target_timestamp:
-                                matching_record = record
-                                break
-                    
-                    if not matching_record:
-                        await self.send_message(chat_id, f"❌ No funding rate found for <b>{safe_symbol}</b> at {time_str} on {date_display}")
-                        return
-                    
-                    # Format single record response
-                    rate = float(matching_record.get("fundingRate", 0))
-                    rate_pct = rate * 100
-                    timestamp = int(matching_record.get("fundingRateTimestamp", 0))
-                    
-                    # Format time in IST
-                    dt = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
-                    dt_ist = dt + timedelta(hours=5, minutes=30)
-                    settlement_time_str = dt_ist.strftime('%d/%m/%y %H:%M:%S')
-                    
-                    emoji = "🟢" if rate >= 0 else "🔴"
-                    rate_str = f"+{rate_pct:.4f}%" if rate >= 0 else f"{rate_pct:.4f}%"
-                    bias = "Positive (Longs Pay Shorts)" if rate >= 0 else "Negative (Shorts Pay Longs)"
-                    
-                    message = f"""📊 <b>{safe_symbol}</b> Funding Rate
+                message = f"""📊 <b>{safe_symbol}</b> Funding Rate
 
 🕐 Requested: {date_display} {time_str}
 ⏰ Settlement: {settlement_time_str}
@@ -387,104 +419,181 @@ For support, contact @DecentralizedJM"""
 • Bias: {bias}
 
 <i>A Mudrex service</i>"""
+                
+                await self.send_message(chat_id, message)
+                logger.info(f"Sent single funding rate for {symbol} at {settlement_time_str}")
+                
+            else:
+                # Build full day message
+                lines = [f"📊 <b>{safe_symbol}</b> Historical Funding Rates", f"📅 Date: {date_display}\n"]
+                
+                total_rate = 0
+                for record in records:
+                    rate = record.funding_rate
+                    rate_pct = rate * 100
+                    total_rate += rate
+                    timestamp = record.timestamp
                     
-                    await self.send_message(chat_id, message)
-                    logger.info(f"Sent single funding rate for {symbol} at {settlement_time_str}")
-                    
-                else:
-                    # Build full day message
-                    lines = [f"📊 <b>{safe_symbol}</b> Historical Funding Rates", f"📅 Date: {date_display}\n"]
-                    
-                    total_rate = 0
-                    for record in records:
-                        rate = float(record.get("fundingRate", 0))
-                        rate_pct = rate * 100
-                        total_rate += rate
-                        timestamp = int(record.get("fundingRateTimestamp", 0))
-                        
-                        # Format time in IST (DD/MM/YY H:M:S format)
-                        dt = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
-                        dt_ist = dt + timedelta(hours=5, minutes=30)
-                        time_display = dt_ist.strftime('%d/%m/%y %H:%M:%S')
-                        
-                        # Emoji based on rate
-                        emoji = "🟢" if rate >= 0 else "🔴"
-                        rate_str = f"+{rate_pct:.4f}%" if rate >= 0 else f"{rate_pct:.4f}%"
-                        
-                        lines.append(f"{emoji} {time_display}: <b>{rate_str}</b>")
+                    # Format time in IST (DD/MM/YY H:M:S format)
+                    dt = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
+                    dt_ist = dt + timedelta(hours=5, minutes=30)
+                    time_display = dt_ist.strftime('%d/%m/%y %H:%M:%S')
                     
-                    # Add daily total
-                    total_pct = total_rate * 100
-                    total_emoji = "🟢" if total_rate >= 0 else "🔴"
-                    total_str = f"+{total_pct:.4f}%" if total_rate >= 0 else f"{total_pct:.4f}%"
-                    lines.append(f"\n{total_emoji} <b>Daily Total: {total_str}</b>")
-                    lines.append(f"📈 Settlements: {len(records)}")
+                    # Emoji based on rate
+                    emoji = "🟢" if rate >= 0 else "🔴"
+                    rate_str = f"+{rate_pct:.4f}%" if rate >= 0 else f"{rate_pct:.4f}%"
                     
-                    await self.send_message(chat_id, "\n".join(lines))
-                    logger.info(f"Sent historical funding for {symbol} on {date_display}: {len(records)} records")
+                    lines.append(f"{emoji} {time_display}: <b>{rate_str}</b>")
                 
+                # Add daily total
+                total_pct = total_rate * 100
+                total_emoji = "🟢" if total_rate >= 0 else "🔴"
+                total_str = f"+{total_pct:.4f}%" if total_rate >= 0 else f"{total_pct:.4f}%"
+                lines.append(f"\n{total_emoji} <b>Daily Total: {total_str}</b>")
+                lines.append(f"📈 Settlements: {len(records)}")
+                
+                await self.send_message(chat_id, "\n".join(lines))
+                logger.info(f"Sent historical funding for {symbol} on {date_display}: {len(records)} records")
+            
         except Exception as e:
             logger.error(f"Error fetching historical funding for {symbol}: {e}")
             await self.send_message(chat_id, f"❌ Error fetching historical data for {symbol}")
     
+    async def send_history_range(self, chat_id: int, symbols: List[str], range_str: str):
+        """Send cumulative funding for one or more symbols over a DDMMYY-DDMMYY range (first page)"""
+        if len(symbols) > config.HISTORY_COMPARE_MAX_SYMBOLS:
+            await self.send_message(chat_id, f"❌ Compare at most {config.HISTORY_COMPARE_MAX_SYMBOLS} symbols at a time")
+            return
+        
+        try:
+            start_str, _, end_str = range_str.partition("-")
+            start_dt = parse_ddmmyy(start_str)
+            end_dt = parse_ddmmyy(end_str or start_str)
+        except ValueError:
+            await self.send_message(chat_id, "❌ Invalid date range. Use DDMMYY-DDMMYY (e.g., 010126-070126)")
+            return
+        
+        if end_dt.date() > datetime.now(timezone.utc).date():
+            await self.send_message(chat_id, f"❌ Cannot fetch historical data for future date: {end_dt.strftime('%d/%m/%y')}")
+            return
+        if start_dt > end_dt:
+            await self.send_message(chat_id, "❌ Range start is after its end")
+            return
+        days = (end_dt - start_dt).days + 1
+        if days > config.HISTORY_RANGE_MAX_DAYS:
+            await self.send_message(chat_id, f"❌ Ranges are limited to {config.HISTORY_RANGE_MAX_DAYS} days")
+            return
+        
+        try:
+            logger.info(f"Fetching funding history for {', '.join(symbols)} over {days} days from {start_str}")
+            
+            # Each day goes through the per-day cache: local history store first, then Bybit
+            series, error_msg = await load_series(
+                self.history_cache, symbols,
+                int(start_dt.timestamp() * 1000), int(end_dt.timestamp() * 1000)
+            )
+            
+            if error_msg:
+                await self.send_message(chat_id, f"❌ API Error: {html.escape(error_msg)}")
+                return
+            
+            if not any(len(s) for s in series):
+                await self.send_message(chat_id, f"❌ No funding rate data found for <b>{html.escape(', '.join(symbols))}</b>")
+                return
+            
+            # Only the first page is rendered now; the buttons render the rest on demand
+            query = HistoryQuery(series, int(start_dt.timestamp() * 1000), int(end_dt.timestamp() * 1000),
+                                 page_size=config.HISTORY_PAGE_SIZE)
+            token = self.history_pager.add(query)
+            await self.send_message(chat_id, query.render_page(0), HistoryPager.keyboard(token, 0, query.page_count))
+            logger.info(f"Sent funding history for {', '.join(symbols)}: {sum(len(s) for s in series)} records, "
+                        f"{query.page_count} pages")
+            
+        except Exception as e:
+            logger.error(f"Error fetching funding history range for {symbols}: {e}")
+            await self.send_message(chat_id, "❌ Error fetching historical data")
+    
     async def send_top_funding(self, chat_id: int):
         """Send top 10 most extreme funding rates"""
-        # Refresh cache
-        await self.refresh_symbols_cache()
+        tickers = await self.snapshot.get()
         
-        if not self.symbols_cache:
+        if not tickers:
             await self.send_message(chat_id, "❌ No funding rate data available.")
             return
         
-        # Sort by absolute rate
-        sorted_rates = sorted(
-            self.symbols_cache.items(),
-            key=lambda x: abs(x[1]["fundingRate"]),
-            reverse=True
-        )[:10]
+        # Ranked and rendered once per snapshot version; repeats within the TTL are a dict lookup
+        version = self.snapshot.version
+        message = self.reply_cache.get(version, "top")
+        if message is None:
+            message = self._render_top_funding(tickers)
+            self.reply_cache.put(version, "top", message)
+        
+        await self.send_message(chat_id, message)
+    
+    def _render_top_funding(self, tickers: Dict[str, Ticker]) -> str:
+        """Format the top 10 reply from the current snapshot"""
+        # Top 10 by per-8h equivalent rate (argpartition over the snapshot's normalized column)
+        columns = self.snapshot.columns
+        top_symbols = columns.top_abs_rate(10)
         
         lines = ["📊 <b>Top 10 Extreme Funding Rates</b>\n"]
         
-        for symbol, data in sorted_rates:
-            rate = data["fundingRate"]
+        for symbol in top_symbols:
+            row = columns.index[symbol]
+            rate = tickers[symbol].funding_rate
             rate_pct = rate * 100
+            rate_8h = columns.rate_8h[row]
             
-            if rate > 0.0005:
+            if rate_8h > 0.0005:
                 emoji = "🔴"
-            elif rate > 0:
+            elif rate_8h > 0:
                 emoji = "🟠"
-            elif rate < -0.0005:
+            elif rate_8h < -0.0005:
                 emoji = "🟢"
-            elif rate < 0:
+            elif rate_8h < 0:
                 emoji = "🔵"
             else:
                 emoji = "⚪"
             
-            lines.append(f"{emoji} <b>{symbol}</b>: {rate_pct:+.4f}%")
+            lines.append(
+                f"{emoji} <b>{html.escape(symbol)}</b>: {rate_pct:+.4f}% / {int(columns.interval_hours[row])}h "
+                f"({columns.apr[row] * 100:+.1f}% APR)"
+            )
         
-        lines.append("\n<i>🔴 Longs pay | 🟢 Shorts pay</i>")
+        lines.append("\n<i>Ranked by 8h-equivalent rate</i>")
+        lines.append("<i>🔴 Longs pay | 🟢 Shorts pay</i>")
         lines.append("<i>💡 Use /funding SYMBOL DDMMYY [HH:MM:SS]</i>")
         
-        await self.send_message(chat_id, "\n".join(lines))
+        return "\n".join(lines)
     
     async def send_status(self, chat_id: int):
         """Send bot status"""
         cache_age = ""
-        if self.symbols_cache_time:
-            age_secs = (datetime.now(timezone.utc) - self.symbols_cache_time).total_seconds()
+        age_secs = self.snapshot.age()
+        if age_secs is not None:
             cache_age = f"{int(age_secs)}s ago"
         
+        stats = self.dispatcher.get_stats()
+        history = self.history_cache.get_stats()
+        replies = self.reply_cache.get_stats()
+        
         message = f"""<b>Funding Rate Bot Status</b>
 
 • Status: Running
-• Symbols Cached: {len(self.symbols_cache)}
+• Symbols Cached: {len(self.snapshot.tickers)}
 • Cache Updated: {cache_age or 'Never'}
+• Commands: {stats['completed']} handled, {stats['pending']} pending
+• Command Latency: p50 {stats['handler_time']['p50']}s, p95 {stats['handler_time']['p95']}s (queue p95 {stats['queue_wait']['p95']}s)
+• History Cache: {history['entries']} days, {history['hit_rate'] * 100:.0f}% hit rate
+• Reply Cache: {replies['entries']} replies for v{self.snapshot.version}, {replies['hit_rate'] * 100:.0f}% hit rate
 
 <b>Commands:</b>
 • /funding - Top 10 extreme rates
 • /funding SYMBOL - Current rate for symbol
 • /funding SYMBOL DDMMYY - Full day historical rates
 • /funding SYMBOL DDMMYY HH:MM:SS - Specific time rate
+• /funding SYMBOL DDMMYY-DDMMYY - Cumulative funding over a range
+• /funding BTC,ETH DDMMYY-DDMMYY - Compare symbols
 
 <i>A Mudrex service</i>"""
         
@@ -1,3 +1,4 @@
+import os
 from dataclasses import dataclass, field
 from typing import List, Optional
 
@@ -22,10 +23,18 @@ class FundingRateConfig:
                 "SOLUSDT",
             ]
     
-    # API settings (currently using Bybit)
-    BYBIT_BASE_URL = "https://api.bybit.com"
+    # API settings (Bybit drives alerts; other venues are fetched alongside it)
+    # Point the *_BASE_URL variables at mock_exchanges.py to run offline
+    BYBIT_BASE_URL = os.getenv("BYBIT_BASE_URL", "https://api.bybit.com")
     BYBIT_TICKERS_ENDPOINT = "/v5/market/tickers"
     BYBIT_FUNDING_HISTORY_ENDPOINT = "/v5/market/funding/history"
+    BINANCE_BASE_URL = os.getenv("BINANCE_BASE_URL", "https://fapi.binance.com")
+    OKX_BASE_URL = os.getenv("OKX_BASE_URL", "https://www.okx.com")
+    
+    # Venues whose tickers are fetched into the multi-venue snapshot (comma-separated)
+    ENABLED_VENUES: List[str] = field(default_factory=lambda: [
+        v.strip().lower() for v in os.getenv("ENABLED_VENUES", "bybit").split(",") if v.strip()
+    ])
     
     # ==========================================================================
     # FUNDING INTERVAL AWARENESS
@@ -36,12 +45,45 @@ class FundingRateConfig:
     #   - 4 hours: 290 symbols (6 settlements/day)
     #   - 8 hours: 179 symbols (3 settlements/day)
     #
-    # We check every 30 minutes to catch ALL 1-hour funding settlements
+    # The monitor wakes just after each settlement boundary (top of the hour for
+    # 1-hour symbols) and checks only the symbols that settled there
     # ==========================================================================
     
-    # Check interval in seconds (30 minutes to catch 1-hour funding)
+    # Longest sleep in seconds between checks (a fallback when no boundary is
+    # known yet; wakeups normally follow the settlement schedule)
     CHECK_INTERVAL = 1800  # 30 minutes
     
+    # Seconds after a settlement boundary to wake (history appears shortly after)
+    SETTLEMENT_WAKE_DELAY = 5
+    
+    # Seconds before re-checking a boundary whose nextFundingTime has not rolled over yet
+    SETTLEMENT_RETRY_DELAY = 10
+    
+    # Max concurrent funding history requests during a settlement sweep
+    # Bybit allows ~600 requests per 5s per IP; 10 in flight stays well below
+    SETTLEMENT_FETCH_CONCURRENCY = 10
+    
+    # Base request pacing shared by all Bybit calls in the process
+    # Adapted at runtime from Bybit's X-Bapi-Limit-* response headers
+    BYBIT_MAX_REQUESTS_PER_SECOND = 100
+    
+    # Each venue has its own limiter (limits are per venue and per IP)
+    # Binance limits by request weight: 2400/min per IP, we use half
+    BINANCE_MAX_WEIGHT_PER_SECOND = 20
+    # OKX public endpoints allow ~20 requests per 2s each
+    OKX_MAX_REQUESTS_PER_SECOND = 10
+    
+    # Seconds between /v5/market/instruments-info refreshes (listings, delistings
+    # and funding interval changes; one request, diffed against the cached copy)
+    INSTRUMENT_REFRESH_INTERVAL = 300
+    # Refuse a refresh that would delist more than this fraction of cached symbols
+    # (a truncated or partially paginated response looks like mass delistings)
+    INSTRUMENT_MAX_REMOVED_FRACTION = 0.2
+    
+    # Seconds a shared ticker snapshot is served before refetching /v5/market/tickers
+    # (start_bot.py shares one snapshot between the command handler and alert monitor)
+    TICKER_SNAPSHOT_TTL = 15
+    
     # ==========================================================================
     # ALERT MODE: SETTLEMENT-BASED (No spam, covers everything)
     # ==========================================================================
@@ -59,6 +101,8 @@ class FundingRateConfig:
     
     # Alert on extreme funding rates (above this absolute value)
     # 0.01 = 1% funding rate (considered extreme)
+    # Rate thresholds are per-8h equivalents: a 1h symbol at 0.2% (1.6% per 8h)
+    # is extreme, an 8h symbol at 0.2% is not
     EXTREME_RATE_THRESHOLD = 0.01
     
     # Alert on funding rate sign change (positive to negative or vice versa)
@@ -81,14 +125,119 @@ class FundingRateConfig:
     # Only send predicted alerts for extreme rates (prevent spam)
     PREDICTED_RATE_THRESHOLD = 0.01  # 1% - same as extreme threshold
     
+    # Alert when Bybit changes a symbol's funding interval (e.g. 8h -> 4h when
+    # the rate hits its cap); the next settlement alert also shows the change
+    ALERT_ON_INTERVAL_CHANGE = True
+    
+    # ==========================================================================
+    # ANOMALY ALERTS
+    # ==========================================================================
+    # Per-symbol rolling variance and EWMA of settled rates (per-8h equivalents);
+    # alert when a settled or live (EWMA-smoothed) rate is this many standard
+    # deviations from the symbol's recent settled level. Opt-in: set
+    # ALERT_ON_ANOMALIES=true to enable
+    ALERT_ON_ANOMALIES = os.getenv("ALERT_ON_ANOMALIES", "false").lower() == "true"
+    ANOMALY_Z_THRESHOLD = 4.0
+    
+    # Settlements seen before a symbol's history is trusted, and the rolling
+    # window (in settlements) older settlements decay over
+    ANOMALY_MIN_SAMPLES = 30
+    ANOMALY_WINDOW = 90
+    
+    # EWMA weight of each settled rate (the EWMA is the baseline z-scores are measured from)
+    ANOMALY_EWMA_ALPHA = 0.2
+    
+    # Live rates are smoothed over time: an update's weight in the live EWMA
+    # halves every ANOMALY_LIVE_HALF_LIFE seconds, however often tickers arrive.
+    # Live EWMAs are saved with the state snapshot at most every LIVE_EWMA_SAVE_INTERVAL seconds.
+    ANOMALY_LIVE_HALF_LIFE = 600
+    LIVE_EWMA_SAVE_INTERVAL = 600
+    
+    # Std floor so symbols pinned at the 0.01% base rate do not alert on 1bp moves
+    ANOMALY_MIN_STD = 0.0001
+    
+    # ==========================================================================
+    # CROSS-VENUE SPREAD ALERTS
+    # ==========================================================================
+    # With more than one venue in ENABLED_VENUES, alert when the annualized
+    # funding differential for an asset (highest venue - lowest venue, each
+    # normalized by its own interval) crosses this threshold. Opt-in: set
+    # ALERT_ON_SPREADS=true to enable
+    ALERT_ON_SPREADS = os.getenv("ALERT_ON_SPREADS", "false").lower() == "true"
+    SPREAD_ALERT_APR = 0.5  # 50% APR
+    
+    # Seconds between multi-venue snapshot fetches
+    SPREAD_CHECK_INTERVAL = 60
+    
+    # ==========================================================================
+    # LIVE TICKER STREAM (WebSocket)
+    # ==========================================================================
+    # When enabled, live rates come from Bybit's public tickers.{symbol} stream
+    # and predicted-rate alerts are evaluated on every update instead of polling.
+    # Point BYBIT_WS_URL at mock_bybit_ws.py to run offline.
+    ENABLE_WS_TICKER_STREAM = os.getenv("ENABLE_WS_TICKER_STREAM", "false").lower() == "true"
+    BYBIT_WS_URL = os.getenv("BYBIT_WS_URL", "wss://stream.bybit.com/v5/public/linear")
+    
+    # ==========================================================================
+    # TELEGRAM COMMAND UPDATES
+    # ==========================================================================
+    # Commands are long-polled (getUpdates) unless TELEGRAM_WEBHOOK_URL is set,
+    # e.g. https://bot.example.com/telegram. In webhook mode a small HTTP server
+    # listens on TELEGRAM_WEBHOOK_PORT (PORT on Railway) for that URL's path and
+    # only accepts requests carrying TELEGRAM_WEBHOOK_SECRET (random if unset).
+    TELEGRAM_WEBHOOK_URL = os.getenv("TELEGRAM_WEBHOOK_URL", "")
+    TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET", "")
+    TELEGRAM_WEBHOOK_HOST = os.getenv("TELEGRAM_WEBHOOK_HOST", "0.0.0.0")
+    TELEGRAM_WEBHOOK_PORT = int(os.getenv("TELEGRAM_WEBHOOK_PORT", os.getenv("PORT", "8080")))
+    
+    # Seconds Telegram holds a getUpdates request open waiting for a command
+    TELEGRAM_LONG_POLL_TIMEOUT = 50
+    
+    # Commands run concurrently (in order within each chat). Intake pauses once
+    # COMMAND_MAX_PENDING are queued, and a command running longer than
+    # COMMAND_DEADLINE seconds is cancelled with a "try again" reply.
+    COMMAND_MAX_CONCURRENCY = 8
+    COMMAND_MAX_PENDING = 100
+    COMMAND_DEADLINE = 30
+    
+    # /funding and /funding SYMBOL replies are rendered once per ticker snapshot
+    # and reused until the next refresh (max replies kept per snapshot)
+    REPLY_CACHE_SIZE = 1000
+    
+    # /funding SYM1,SYM2 DDMMYY-DDMMYY range and comparison queries: limits,
+    # settlements per page, and how many results stay pageable via the buttons
+    HISTORY_RANGE_MAX_DAYS = 31
+    HISTORY_COMPARE_MAX_SYMBOLS = 5
+    HISTORY_PAGE_SIZE = 20
+    HISTORY_PAGER_SIZE = 200
+    
     # ==========================================================================
     # DATA STORAGE
     # ==========================================================================
     DATA_DIR = "data"
     STATE_FILE = "data/funding_state.json"
     SETTLEMENT_HISTORY_FILE = "data/settlement_history.json"
+    # SQLite store of past settlements; /funding SYMBOL DDMMYY is served from it
+    FUNDING_HISTORY_DB = "data/funding_history.db"
+    # Cached instrument metadata (funding intervals) diffed on each refresh
+    INSTRUMENT_CACHE_FILE = "data/instruments.json"
+    # In-memory LRU of /funding SYMBOL DDMMYY results per (symbol, UTC day):
+    # closed days are kept until evicted, today's for HISTORY_CACHE_TODAY_TTL seconds.
+    # Closed days already persist in FUNDING_HISTORY_DB; set HISTORY_CACHE_FILE
+    # to also keep the LRU itself across restarts.
+    HISTORY_CACHE_SIZE = 2000
+    HISTORY_CACHE_TODAY_TTL = 60
+    HISTORY_CACHE_FILE = os.getenv("HISTORY_CACHE_FILE", "")
     LOG_FILE = "logs/funding_alerts.log"
     
+    # Monitor state is saved as an append-only journal next to SETTLEMENT_HISTORY_FILE
+    # and compacted into that file (atomic rename) after this many journal entries
+    STATE_JOURNAL_COMPACT_EVERY = 5000
+    
+    # Rules only collect state changes; the async loops write them from a worker
+    # thread after each check and at least every STATE_FLUSH_INTERVAL seconds
+    STATE_FLUSH_INTERVAL = 5
+    
     # ==========================================================================
     # RATE LIMITING
     # ==========================================================================
@@ -99,6 +248,17 @@ class FundingRateConfig:
     # - 8h symbols: ~22 per hour (at settlement times)
     # Total: ~50-150 alerts per hour at peak settlement times
     MAX_ALERTS_PER_HOUR = 200  # Allow all settlement alerts
+    
+    # Telegram delivery limits enforced by the outbound message queue
+    # (Telegram allows ~30 messages/s per bot and 20 messages/min per group)
+    TELEGRAM_GLOBAL_MESSAGES_PER_SECOND = 30
+    TELEGRAM_GROUP_MESSAGES_PER_MINUTE = 20
+    
+    # Coalesce the alerts from one check cycle into digest messages
+    # (grouped by alert type and funding interval, split at Telegram's 4096-char limit)
+    # Off by default: every alert is sent in its own message, as before.
+    # ALERT_DIGEST_MODE=true to enable
+    ALERT_DIGEST_MODE = os.getenv("ALERT_DIGEST_MODE", "false").lower() == "true"
 
 
 # Create default config instance
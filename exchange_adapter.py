@@ -0,0 +1,125 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional
+
+import aiohttp
+
+import json_codec
+from models import Settlement, Ticker
+from rate_limiter import RateLimiter, get_shared_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class ExchangeAdapter(ABC):
+    """
+    Funding data source for one venue
+
+    Subclasses fetch USDT-margined perpetual tickers and funding history and
+    return them as Ticker / Settlement records keyed by a normalized symbol
+    ("BTCUSDT" on every venue), so results from different venues line up.
+    Requests go through a pooled aiohttp session and the venue's own
+    process-wide rate limiter.
+    """
+
+    # Short venue name used in snapshot keys, limiter names and logs
+    VENUE = ""
+
+    # Retries after a rate limit response before giving up on a request
+    MAX_RATE_LIMIT_RETRIES = 3
+
+    def __init__(self, base_url: str, max_concurrency: int = 10,
+                 rate_limiter: Optional[RateLimiter] = None, requests_per_second: float = 10):
+        """
+        Args:
+            base_url: REST API root
+            max_concurrency: Max pooled connections
+            rate_limiter: Limiter to use (defaults to the shared limiter for VENUE)
+            requests_per_second: Pacing for the shared limiter if one is created
+        """
+        self.base_url = base_url
+        self.rate_limiter = rate_limiter or get_shared_limiter(self.VENUE, requests_per_second)
+
+        # Async session is created lazily inside the running event loop
+        self.max_concurrency = max_concurrency
+        self._async_session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def venue(self) -> str:
+        return self.VENUE
+
+    async def _get_async_session(self) -> aiohttp.ClientSession:
+        """Get (or lazily create) the pooled aiohttp session"""
+        if self._async_session is None or self._async_session.closed:
+            self._async_session = aiohttp.ClientSession(
+                headers={"Content-Type": "application/json"},
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency)
+            )
+        return self._async_session
+
+    async def close(self):
+        """Close the async HTTP session"""
+        if self._async_session and not self._async_session.closed:
+            await self._async_session.close()
+        self._async_session = None
+
+    def _is_rate_limited(self, status: int, data: Any) -> bool:
+        """Check whether a response is a rate limit rejection (418 is Binance's IP ban)"""
+        return status in (403, 418, 429)
+
+    async def _get_async(self, path: str, params: Dict, timeout: float = 10,
+                         decode: Callable[[bytes], Any] = json_codec.loads, weight: float = 1) -> Any:
+        """
+        GET an endpoint through the venue's rate limiter using the pooled session
+
+        Args:
+            path: Endpoint path
+            params: Query parameters
+            timeout: Request timeout in seconds
+            decode: Body decoder
+            weight: Request weight for venues with weighted limits
+
+        Returns:
+            Decoded JSON response (raises aiohttp exceptions on HTTP errors)
+        """
+        session = await self._get_async_session()
+        url = f"{self.base_url}{path}"
+
+        for attempt in range(self.MAX_RATE_LIMIT_RETRIES + 1):
+            await self.rate_limiter.acquire_async(weight)
+            async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                data = decode(await response.read()) if response.status == 200 else None
+
+                if self._is_rate_limited(response.status, data) and attempt < self.MAX_RATE_LIMIT_RETRIES:
+                    self.rate_limiter.on_rate_limited(response.headers)
+                    continue
+
+                response.raise_for_status()
+                self.rate_limiter.update_from_headers(response.headers)
+                self.rate_limiter.on_success()
+                return data
+
+    @abstractmethod
+    async def get_tickers_async(self, symbols: List[str] = None) -> Dict[str, Ticker]:
+        """
+        Get live funding tickers for all USDT perpetuals
+
+        Args:
+            symbols: Optional list of normalized symbols to filter
+
+        Returns:
+            Dict mapping normalized symbol to Ticker (empty on error)
+        """
+
+    @abstractmethod
+    async def get_funding_rate_history_async(self, symbol: str, limit: int = 10) -> List[Settlement]:
+        """
+        Get the most recent settlements for a symbol
+
+        Args:
+            symbol: Normalized symbol (e.g. "BTCUSDT")
+            limit: Number of records to fetch
+
+        Returns:
+            Settlements, newest first (empty on error)
+        """
@@ -1,10 +1,14 @@
-import json
+import asyncio
 import logging
-import os
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple
 
 from config import FundingRateConfig
+from models import HOURS_PER_YEAR, Alert, Settlement, Ticker
+from rolling_stats import RollingStats, decay_alpha, ewma_update
+from spread_engine import Spread, SpreadEngine
+from state_journal import StateJournal
+from ticker_columns import TickerColumns
 
 logger = logging.getLogger(__name__)
 
@@ -12,7 +16,13 @@ logger = logging.getLogger(__name__)
 class FundingRateMonitor:
     """Monitor funding rates and detect changes at settlement times"""
     
-    def __init__(self, config: FundingRateConfig = None):
+    def __init__(self, config: FundingRateConfig = None, defer_saves: bool = False):
+        """
+        Args:
+            config: Bot configuration
+            defer_saves: Only collect state changes when rules run; the owner writes
+                them with flush_state() (keeps journal I/O off the event loop)
+        """
         self.config = config or FundingRateConfig()
         
         # Track last seen settlement timestamp per symbol
@@ -22,6 +32,10 @@ class FundingRateMonitor:
         # Track previous settlement rates for comparison
         self.previous_settlement_rates: Dict[str, float] = {}
         
+        # Track the ticker nextFundingTime we have accounted for per symbol
+        # Only symbols whose nextFundingTime advances need a history call
+        self.next_funding_times: Dict[str, int] = {}
+        
         # Track predicted rates we've already alerted on (to avoid spam)
         # Now stores (rate, timestamp) tuple for time-based cooldown
         self.alerted_predicted_rates: Dict[str, tuple] = {}
@@ -29,49 +43,172 @@ class FundingRateMonitor:
         # Cooldown period for predicted alerts (59 minutes in seconds)
         self.PREDICTED_ALERT_COOLDOWN = 59 * 60
         
+        # Cross-venue spreads, updated incrementally per venue quote
+        self.spreads = SpreadEngine()
+        
+        # Track spreads we've alerted on: symbol -> (apr, short venue, long venue, timestamp)
+        self.alerted_spreads: Dict[str, tuple] = {}
+        self.SPREAD_ALERT_COOLDOWN = 59 * 60
+        
+        # Previous funding interval (hours) of symbols whose interval changed,
+        # shown on (and cleared by) their next settlement alert
+        self.interval_changes: Dict[str, int] = {}
+        
+        # Rolling stats of settled rates (per-8h equivalents) and the time-weighted
+        # EWMA of live rates per symbol as (ewma, updated at), for z-score anomaly alerts.
+        # Live EWMAs change on every ticker update, so they are not journaled per
+        # change: they are saved with the snapshot at most every LIVE_EWMA_SAVE_INTERVAL.
+        self.rate_stats: Dict[str, RollingStats] = {}
+        self.live_rate_ewma: Dict[str, tuple] = {}
+        self._live_ewma_changed = False
+        self._live_ewma_saved_at = datetime.now(timezone.utc).timestamp()
+        
+        # Track live anomalies we've alerted on: symbol -> (zscore, timestamp)
+        self.alerted_anomalies: Dict[str, tuple] = {}
+        self.ANOMALY_ALERT_COOLDOWN = 59 * 60
+        
         # Rate limiting
         self.alert_count_this_hour = 0
         self.hour_start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
         
+        # Persistence: snapshot plus append-only journal of changed symbols
+        state_file = getattr(self.config, 'SETTLEMENT_HISTORY_FILE', self.config.STATE_FILE)
+        self.journal = StateJournal(
+            state_file,
+            compact_every=getattr(self.config, 'STATE_JOURNAL_COMPACT_EVERY', 5000)
+        )
+        # (section, symbol) pairs changed since the last save
+        self._dirty = set()
+        self.defer_saves = defer_saves
+        self._save_pending = False
+        self._flush_lock = asyncio.Lock()
+        
         # Load previous state
         self._load_state()
     
     def _load_state(self):
-        """Load previous state from file"""
+        """Load previous state from the snapshot file and replay the journal"""
         try:
-            state_file = getattr(self.config, 'SETTLEMENT_HISTORY_FILE', self.config.STATE_FILE)
-            if os.path.exists(state_file):
-                with open(state_file, 'r') as f:
-                    state = json.load(f)
-                    self.last_settlement_timestamps = state.get("timestamps", {})
-                    self.previous_settlement_rates = state.get("rates", {})
-                    # Load alerted_predicted as dict of (rate, timestamp) tuples
-                    alerted = state.get("alerted_predicted", {})
-                    self.alerted_predicted_rates = {
-                        k: tuple(v) if isinstance(v, list) else (v, 0) 
-                        for k, v in alerted.items()
-                    }
-                    logger.info(f"Loaded state for {len(self.last_settlement_timestamps)} symbols, {len(self.alerted_predicted_rates)} predicted alerts tracked")
+            state = self.journal.load()
+            if state:
+                self.last_settlement_timestamps = state.get("timestamps", {})
+                self.previous_settlement_rates = state.get("rates", {})
+                self.next_funding_times = state.get("next_funding_times", {})
+                # Load alerted_predicted as dict of (rate, timestamp) tuples
+                alerted = state.get("alerted_predicted", {})
+                self.alerted_predicted_rates = {
+                    k: tuple(v) if isinstance(v, list) else (v, 0) 
+                    for k, v in alerted.items()
+                }
+                self.alerted_spreads = {k: tuple(v) for k, v in state.get("alerted_spreads", {}).items()}
+                self.interval_changes = state.get("interval_changes", {})
+                self.rate_stats = {k: RollingStats.from_list(v) for k, v in state.get("rate_stats", {}).items()}
+                # Older snapshots stored the EWMA alone; with no timestamp it is reseeded
+                self.live_rate_ewma = {
+                    k: tuple(v) if isinstance(v, list) else (v, 0.0)
+                    for k, v in state.get("live_ewma", {}).items()
+                }
+                self.alerted_anomalies = {k: tuple(v) for k, v in state.get("alerted_anomalies", {}).items()}
+                logger.info(f"Loaded state for {len(self.last_settlement_timestamps)} symbols, {len(self.alerted_predicted_rates)} predicted alerts tracked")
         except Exception as e:
             logger.warning(f"Could not load state file: {e}")
     
+    def _state_sections(self) -> Dict[str, Dict]:
+        """Map state file sections to the in-memory dicts backing them"""
+        return {
+            "timestamps": self.last_settlement_timestamps,
+            "rates": self.previous_settlement_rates,
+            "next_funding_times": self.next_funding_times,
+            "alerted_predicted": self.alerted_predicted_rates,
+            "alerted_spreads": self.alerted_spreads,
+            "interval_changes": self.interval_changes,
+            "rate_stats": self.rate_stats,
+            "live_ewma": self.live_rate_ewma,
+            "alerted_anomalies": self.alerted_anomalies,
+        }
+    
+    def _mark_dirty(self, section: str, symbol: str):
+        """Record that a symbol's value in a state section changed"""
+        self._dirty.add((section, symbol))
+    
     def _save_state(self):
-        """Save current state to file"""
+        """Journal the symbols changed since the last save, compacting when due"""
+        if self.defer_saves:
+            self._save_pending = True
+            return
+        changes, snapshot = self._prepare_save()
+        if not self._write_state(changes, snapshot):
+            self._dirty.update((section, symbol) for section, symbol, _ in changes)
+    
+    async def flush_state(self):
+        """
+        Write changes collected with defer_saves from a worker thread
+        
+        Journal entries and the compaction snapshot are built on the calling
+        thread, so rules can keep updating state while the write runs.
+        """
+        if not self._save_pending:
+            return
+        async with self._flush_lock:
+            self._save_pending = False
+            changes, snapshot = self._prepare_save()
+            loop = asyncio.get_running_loop()
+            if not await loop.run_in_executor(None, self._write_state, changes, snapshot):
+                self._dirty.update((section, symbol) for section, symbol, _ in changes)
+                self._save_pending = True
+    
+    def _prepare_save(self) -> Tuple[List[tuple], Optional[Dict]]:
+        """
+        Take the pending journal entries and, when compaction is due, a full state copy
+        
+        Returns:
+            Tuple of ((section, symbol, value) changes, snapshot to compact into or None)
+        """
+        sections = self._state_sections()
+        changes = []
+        for section, symbol in self._dirty:
+            value = sections[section].get(symbol)
+            # Tuples and stats become lists for JSON; None removes the symbol on replay
+            if isinstance(value, RollingStats):
+                value = value.to_list()
+            changes.append((section, symbol, list(value) if isinstance(value, tuple) else value))
+        self._dirty.clear()
+        
+        snapshot = None
+        if self.journal.entries + len(changes) >= self.journal.compact_every or self._live_ewma_save_due():
+            snapshot = self._snapshot_state()
+            self._live_ewma_changed = False
+            self._live_ewma_saved_at = datetime.now(timezone.utc).timestamp()
+        return changes, snapshot
+    
+    def _write_state(self, changes: List[tuple], snapshot: Optional[Dict]) -> bool:
+        """Append changes to the journal and compact into snapshot if given (returns False on error)"""
         try:
-            state_file = getattr(self.config, 'SETTLEMENT_HISTORY_FILE', self.config.STATE_FILE)
-            os.makedirs(os.path.dirname(state_file), exist_ok=True)
-            # Convert tuples to lists for JSON serialization
-            alerted_for_json = {k: list(v) for k, v in self.alerted_predicted_rates.items()}
-            state = {
-                "timestamps": self.last_settlement_timestamps,
-                "rates": self.previous_settlement_rates,
-                "alerted_predicted": alerted_for_json,
-                "last_updated": datetime.now(timezone.utc).isoformat()
-            }
-            with open(state_file, 'w') as f:
-                json.dump(state, f, indent=2)
+            self.journal.append(changes)
+            if snapshot is not None:
+                self.journal.compact(snapshot)
+            return True
         except Exception as e:
             logger.error(f"Could not save state file: {e}")
+            return False
+    
+    def _live_ewma_save_due(self) -> bool:
+        """Check whether live EWMAs changed and have not been saved for LIVE_EWMA_SAVE_INTERVAL"""
+        return (
+            self._live_ewma_changed
+            and datetime.now(timezone.utc).timestamp() - self._live_ewma_saved_at
+            >= getattr(self.config, 'LIVE_EWMA_SAVE_INTERVAL', 600)
+        )
+    
+    def _snapshot_state(self) -> Dict[str, Dict]:
+        """Copy every state section into JSON-ready dicts for compaction"""
+        state = {section: dict(values) for section, values in self._state_sections().items()}
+        state["alerted_predicted"] = {k: list(v) for k, v in self.alerted_predicted_rates.items()}
+        state["alerted_spreads"] = {k: list(v) for k, v in self.alerted_spreads.items()}
+        state["rate_stats"] = {k: v.to_list() for k, v in self.rate_stats.items()}
+        state["alerted_anomalies"] = {k: list(v) for k, v in self.alerted_anomalies.items()}
+        state["live_ewma"] = {k: list(v) for k, v in self.live_rate_ewma.items()}
+        return state
     
     def _reset_hourly_count_if_needed(self):
         """Reset alert count if we're in a new hour"""
@@ -109,24 +246,88 @@ class FundingRateMonitor:
         except Exception:
             return "Unknown"
     
-    def check_settlements(self, settlements: Dict[str, Dict], ticker_data: Dict[str, Dict]) -> List[Dict]:
+    def get_symbols_due_for_settlement(self, ticker_data: Dict[str, Ticker]) -> List[str]:
+        """
+        Find symbols that may have settled since the last check
+        
+        Uses the nextFundingTime from the bulk tickers response: when it has
+        advanced past the value we recorded, a settlement has happened and
+        the funding history endpoint needs to be queried for that symbol.
+        
+        Args:
+            ticker_data: Dict mapping symbol to current Ticker
+        
+        Returns:
+            List of symbols whose settlement history should be fetched
+        """
+        due = []
+        
+        for symbol, ticker in ticker_data.items():
+            next_time = ticker.next_funding_time
+            prev_next_time = self.next_funding_times.get(symbol)
+            
+            if prev_next_time is None or next_time > prev_next_time:
+                due.append(symbol)
+            elif next_time < prev_next_time:
+                # Settlement moved earlier (e.g. interval shortened), nothing settled yet
+                self.next_funding_times[symbol] = next_time
+                self._mark_dirty("next_funding_times", symbol)
+        
+        logger.debug(f"{len(due)}/{len(ticker_data)} symbols due for settlement check")
+        return due
+    
+    def get_settlement_candidates(self, ticker_data: Dict[str, Ticker],
+                                  woken: Optional[List[str]] = None) -> Dict[str, Ticker]:
+        """
+        Narrow the tickers to those worth a settlement check
+        
+        Args:
+            ticker_data: Dict mapping symbol to current Ticker
+            woken: Symbols whose boundary (or retry) the scheduler reached; None checks every symbol (startup catch-up)
+        
+        Returns:
+            Tickers of the woken symbols plus any with no recorded boundary yet (new listings)
+        """
+        if woken is None:
+            return ticker_data
+        candidates = {symbol: ticker_data[symbol] for symbol in woken if symbol in ticker_data}
+        for symbol, ticker in ticker_data.items():
+            if symbol not in self.next_funding_times:
+                candidates[symbol] = ticker
+        return candidates
+    
+    def get_lagging_settlements(self, ticker_data: Dict[str, Ticker], checked: List[str]) -> List[str]:
+        """
+        Symbols whose ticker rolled over but whose settlement is not in the history yet
+        
+        Args:
+            ticker_data: Dict mapping symbol to current Ticker
+            checked: Symbols whose settlements were just fetched
+        
+        Returns:
+            Symbols to re-check shortly (ones never seen settle are left to the next sweep)
+        """
+        still_due = self.get_symbols_due_for_settlement({s: ticker_data[s] for s in checked if s in ticker_data})
+        return [symbol for symbol in still_due if symbol in self.next_funding_times]
+    
+    def check_settlements(self, settlements: Dict[str, Settlement], ticker_data: Dict[str, Ticker]) -> List[Alert]:
         """
         Check for new funding settlements and generate alerts
         
         Args:
-            settlements: Dict mapping symbol to latest settlement data
-                        Each has: symbol, fundingRate, fundingRateTimestamp
-            ticker_data: Dict mapping symbol to current ticker data (for price, etc.)
+            settlements: Dict mapping symbol to its latest Settlement
+            ticker_data: Dict mapping symbol to current Ticker (for price, etc.)
         
         Returns:
-            List of alert dictionaries for new settlements
+            List of alerts for new settlements
         """
         alerts = []
         new_settlements = 0
+        schedule_changed = False
         
         for symbol, settlement in settlements.items():
-            current_timestamp = settlement.get("fundingRateTimestamp", 0)
-            current_rate = settlement.get("fundingRate", 0)
+            current_timestamp = settlement.timestamp
+            current_rate = settlement.funding_rate
             
             # Get previous data
             prev_timestamp = self.last_settlement_timestamps.get(symbol, 0)
@@ -136,6 +337,11 @@ class FundingRateMonitor:
             if current_timestamp > prev_timestamp:
                 new_settlements += 1
                 
+                # First settlement since an interval change carries the old interval
+                prev_interval = self.interval_changes.pop(symbol, None)
+                if prev_interval is not None:
+                    self._mark_dirty("interval_changes", symbol)
+                
                 # Generate alert if we have previous data to compare
                 if prev_rate is not None:
                     alert = self._create_settlement_alert(
@@ -143,7 +349,8 @@ class FundingRateMonitor:
                         current_rate, 
                         prev_rate, 
                         current_timestamp,
-                        ticker_data.get(symbol, {})
+                        ticker_data.get(symbol),
+                        prev_interval
                     )
                     
                     if alert and self._can_send_alert():
@@ -152,13 +359,35 @@ class FundingRateMonitor:
                 else:
                     logger.debug(f"{symbol}: First settlement observation, rate = {current_rate:.6f}")
                 
+                # Score against the symbol's own history, then add to it
+                anomaly = self._update_settled_stats(
+                    symbol, current_rate, prev_rate, current_timestamp, ticker_data.get(symbol)
+                )
+                if anomaly and self._can_send_alert():
+                    alerts.append(anomaly)
+                    self.alert_count_this_hour += 1
+                
                 # Update tracking
                 self.last_settlement_timestamps[symbol] = current_timestamp
                 self.previous_settlement_rates[symbol] = current_rate
+                self._mark_dirty("timestamps", symbol)
+                self._mark_dirty("rates", symbol)
+            
+            # Mark the funding boundary as handled once its settlement is visible
+            # (history can lag the ticker rollover, so keep it due until then)
+            ticker = ticker_data.get(symbol)
+            next_time = ticker.next_funding_time if ticker else 0
+            prev_next_time = self.next_funding_times.get(symbol)
+            if next_time and (prev_next_time is None or current_timestamp >= prev_next_time):
+                if prev_next_time != next_time:
+                    self.next_funding_times[symbol] = next_time
+                    self._mark_dirty("next_funding_times", symbol)
+                    schedule_changed = True
         
         # Save state after checking
-        if new_settlements > 0:
+        if new_settlements > 0 or schedule_changed:
             self._save_state()
+        if new_settlements > 0:
             logger.info(f"Detected {new_settlements} new settlements, generated {len(alerts)} alerts")
         
         return alerts
@@ -169,8 +398,9 @@ class FundingRateMonitor:
         current_rate: float,
         prev_rate: float,
         settlement_timestamp: int,
-        ticker_data: Dict
-    ) -> Optional[Dict]:
+        ticker: Optional[Ticker],
+        prev_interval: Optional[int] = None
+    ) -> Optional[Alert]:
         """
         Create an alert for a funding settlement
         
@@ -178,8 +408,11 @@ class FundingRateMonitor:
         - BTCUSDT (and symbols in FULL_ALERT_SYMBOLS): Only SIGN CHANGE (flip) alerts
         - Other symbols: No settlement alerts (only predicted alerts)
         
+        Args:
+            prev_interval: Funding interval (hours) before a change since the last settlement
+        
         Returns:
-            Alert dict if alert should be sent, None otherwise
+            Alert if one should be sent, None otherwise
         """
         # Check if this symbol gets flip alerts
         full_alert_symbols = getattr(self.config, 'FULL_ALERT_SYMBOLS', ['BTCUSDT'])
@@ -208,105 +441,273 @@ class FundingRateMonitor:
         rate_change = current_rate - prev_rate
         
         # Get funding interval from ticker if available
-        funding_interval = ticker_data.get("fundingIntervalHours", 8)
-        prev_interval = ticker_data.get("prevFundingIntervalHours", funding_interval)
+        funding_interval = ticker.funding_interval_hours if ticker else 8
+        
+        return Alert(
+            symbol=symbol,
+            alert_type=alert_type,
+            funding_rate=current_rate,
+            prev_funding_rate=prev_rate,
+            rate_change=rate_change,
+            last_price=ticker.last_price if ticker else 0.0,
+            settlement_time=self._format_settlement_time_ist(settlement_timestamp),
+            funding_interval=f"{funding_interval}h",
+            prev_funding_interval=f"{prev_interval or funding_interval}h",
+            volume_24h=ticker.volume_24h if ticker else 0.0,
+        )
+    
+    def check_interval_changes(self, changes: Dict[str, Tuple[int, int]],
+                               ticker_data: Dict[str, Ticker]) -> List[Alert]:
+        """
+        Record funding interval changes and generate alerts for them
         
-        return {
-            "symbol": symbol,
-            "fundingRate": current_rate,
-            "prevFundingRate": prev_rate,
-            "rateChange": rate_change,
-            "alertType": alert_type,
-            "lastPrice": ticker_data.get("lastPrice", 0),
-            "settlementTime": self._format_settlement_time_ist(settlement_timestamp),
-            "fundingInterval": f"{funding_interval}h",
-            "prevFundingInterval": f"{prev_interval}h",
-            "volume24h": ticker_data.get("volume24h", 0),
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }
+        Args:
+            changes: Dict mapping symbol to (old hours, new hours) from InstrumentCache
+            ticker_data: Dict mapping symbol to current Ticker (for rate, price, next settlement)
+        
+        Returns:
+            List of interval change alerts
+        """
+        alerts = []
+        for symbol, (old_interval, new_interval) in changes.items():
+            logger.info(f"{symbol}: Funding interval changed {old_interval}h -> {new_interval}h")
+            
+            # Keep the oldest interval if it changes twice before settling
+            if symbol not in self.interval_changes:
+                self.interval_changes[symbol] = old_interval
+                self._mark_dirty("interval_changes", symbol)
+            
+            if not getattr(self.config, 'ALERT_ON_INTERVAL_CHANGE', True):
+                continue
+            if self._can_send_alert():
+                alerts.append(self._create_interval_change_alert(
+                    symbol, old_interval, new_interval, ticker_data.get(symbol)
+                ))
+                self.alert_count_this_hour += 1
+        
+        if changes:
+            self._save_state()
+        return alerts
+    
+    def _create_interval_change_alert(self, symbol: str, old_interval: int, new_interval: int,
+                                      ticker: Optional[Ticker]) -> Alert:
+        rate = ticker.funding_rate if ticker else 0.0
+        next_time = ticker.next_funding_time if ticker else 0
+        return Alert(
+            symbol=symbol,
+            alert_type="interval_change",
+            funding_rate=rate,
+            last_price=ticker.last_price if ticker else 0.0,
+            settlement_time=self._format_settlement_time_ist(next_time) if next_time else "",
+            funding_interval=f"{new_interval}h",
+            prev_funding_interval=f"{old_interval}h",
+            volume_24h=ticker.volume_24h if ticker else 0.0,
+            apr=rate * HOURS_PER_YEAR / new_interval,
+        )
+    
+    def _update_settled_stats(self, symbol: str, rate: float, prev_rate: Optional[float],
+                              settlement_timestamp: int, ticker: Optional[Ticker]) -> Optional[Alert]:
+        """
+        Score a settled rate against the symbol's rolling stats, then add it
+        
+        Returns:
+            Anomaly alert if the rate deviates by ANOMALY_Z_THRESHOLD or more, None otherwise
+        """
+        interval = ticker.funding_interval_hours if ticker else 8
+        rate_8h = rate * 8 / (interval or 8)
+        
+        stats = self.rate_stats.get(symbol)
+        if stats is None:
+            stats = self.rate_stats[symbol] = RollingStats()
+        
+        alert = None
+        if (getattr(self.config, 'ALERT_ON_ANOMALIES', False)
+                and stats.count >= getattr(self.config, 'ANOMALY_MIN_SAMPLES', 30)):
+            zscore = stats.zscore(rate_8h, getattr(self.config, 'ANOMALY_MIN_STD', 0.0001))
+            if abs(zscore) >= getattr(self.config, 'ANOMALY_Z_THRESHOLD', 4.0):
+                logger.info(f"{symbol}: Settled rate {rate:.6f} is {zscore:+.1f} std from its mean")
+                alert = self._create_anomaly_alert(
+                    symbol, rate, stats.baseline, zscore, ticker,
+                    prev_rate=prev_rate,
+                    settlement_time=self._format_settlement_time_ist(settlement_timestamp)
+                )
+        
+        stats.update(
+            rate_8h,
+            getattr(self.config, 'ANOMALY_WINDOW', 90),
+            getattr(self.config, 'ANOMALY_EWMA_ALPHA', 0.2)
+        )
+        self._mark_dirty("rate_stats", symbol)
+        return alert
+    
+    def check_anomalies(self, ticker_data: Dict[str, Ticker]) -> List[Alert]:
+        """
+        Update live rate EWMAs and alert on symbols far from their settled history
+        
+        Args:
+            ticker_data: Dict mapping symbol to current Ticker
+        
+        Returns:
+            List of live anomaly alerts
+        """
+        if not getattr(self.config, 'ALERT_ON_ANOMALIES', False):
+            return []
+        
+        alerts = []
+        current_time = datetime.now(timezone.utc).timestamp()
+        for symbol, ticker in ticker_data.items():
+            alert = self._evaluate_live_anomaly(symbol, ticker, current_time)
+            if alert:
+                alerts.append(alert)
+        
+        if alerts:
+            logger.info(f"Generated {len(alerts)} live anomaly alerts")
+        if alerts or self._live_ewma_save_due():
+            self._save_state()
+        return alerts
+    
+    def check_anomaly(self, symbol: str, ticker: Ticker) -> Optional[Alert]:
+        """Check a single symbol's live rate against its history (O(1), for streaming updates)"""
+        if not getattr(self.config, 'ALERT_ON_ANOMALIES', False):
+            return None
+        
+        alert = self._evaluate_live_anomaly(symbol, ticker, datetime.now(timezone.utc).timestamp())
+        if alert or self._live_ewma_save_due():
+            self._save_state()
+        return alert
     
-    def get_current_summary(self, rates: Dict[str, Dict]) -> Dict:
-        """Get a summary of current funding rates"""
+    def _evaluate_live_anomaly(self, symbol: str, ticker: Ticker, current_time: float) -> Optional[Alert]:
+        """Update one symbol's live EWMA and apply the z-score rule and cooldown"""
+        previous = self.live_rate_ewma.get(symbol)
+        if previous is None:
+            live = ticker.rate_8h
+        else:
+            # Weighted by time since the last update, so REST polls and WS deltas agree
+            prev_live, prev_time = previous
+            alpha = decay_alpha(current_time - prev_time, getattr(self.config, 'ANOMALY_LIVE_HALF_LIFE', 600))
+            live = ewma_update(prev_live, ticker.rate_8h, alpha)
+        self.live_rate_ewma[symbol] = (live, current_time)
+        self._live_ewma_changed = True
+        
+        stats = self.rate_stats.get(symbol)
+        if stats is None or stats.count < getattr(self.config, 'ANOMALY_MIN_SAMPLES', 30):
+            return None
+        
+        zscore = stats.zscore(live, getattr(self.config, 'ANOMALY_MIN_STD', 0.0001))
+        if abs(zscore) < getattr(self.config, 'ANOMALY_Z_THRESHOLD', 4.0):
+            # Clear once the live rate is back within range
+            if symbol in self.alerted_anomalies:
+                del self.alerted_anomalies[symbol]
+                self._mark_dirty("alerted_anomalies", symbol)
+            return None
+        
+        # Skip if we alerted in the same direction within the cooldown
+        prev_alerted = self.alerted_anomalies.get(symbol)
+        if prev_alerted is not None:
+            prev_zscore, prev_time = prev_alerted
+            same_sign = (zscore > 0) == (prev_zscore > 0)
+            if same_sign and current_time - prev_time < self.ANOMALY_ALERT_COOLDOWN:
+                return None
+        
+        if not self._can_send_alert():
+            return None
+        
+        self.alert_count_this_hour += 1
+        self.alerted_anomalies[symbol] = (zscore, current_time)
+        self._mark_dirty("alerted_anomalies", symbol)
+        logger.info(f"{symbol}: Live rate {ticker.funding_rate:.6f} is {zscore:+.1f} std from its mean")
+        return self._create_anomaly_alert(symbol, ticker.funding_rate, stats.baseline, zscore, ticker)
+    
+    def _create_anomaly_alert(self, symbol: str, rate: float, baseline_8h: float, zscore: float,
+                              ticker: Optional[Ticker], prev_rate: Optional[float] = None,
+                              settlement_time: Optional[str] = None) -> Alert:
+        """Create an anomaly alert (settled when prev_rate is given, live otherwise)"""
+        interval = ticker.funding_interval_hours if ticker else 8
+        next_time = ticker.next_funding_time if ticker else 0
+        if settlement_time is None:
+            settlement_time = self._format_settlement_time_ist(next_time) if next_time else ""
+        return Alert(
+            symbol=symbol,
+            alert_type="anomaly",
+            funding_rate=rate,
+            prev_funding_rate=prev_rate,
+            rate_change=rate - prev_rate if prev_rate is not None else None,
+            last_price=ticker.last_price if ticker else 0.0,
+            settlement_time=settlement_time,
+            funding_interval=f"{interval}h",
+            volume_24h=ticker.volume_24h if ticker else 0.0,
+            apr=rate * HOURS_PER_YEAR / (interval or 8),
+            zscore=zscore,
+            mean_rate=baseline_8h,
+        )
+    
+    def get_current_summary(self, rates: Dict[str, Ticker], columns: Optional[TickerColumns] = None) -> Dict:
+        """
+        Get a summary of current funding rates
+        
+        Args:
+            rates: Dict mapping symbol to current Ticker
+            columns: Columns already built for rates (e.g. TickerSnapshotService.columns)
+        """
         if not rates:
             return {}
         
-        # Find extremes
-        most_positive = max(rates.items(), key=lambda x: x[1].get("fundingRate", 0))
-        most_negative = min(rates.items(), key=lambda x: x[1].get("fundingRate", 0))
-        
-        positive_count = sum(1 for d in rates.values() if d.get("fundingRate", 0) > 0)
-        negative_count = sum(1 for d in rates.values() if d.get("fundingRate", 0) < 0)
+        columns = columns or TickerColumns.from_tickers(rates)
+        most_positive = columns.most_positive()
+        most_negative = columns.most_negative()
         
         return {
-            "total_symbols": len(rates),
-            "positive_count": positive_count,
-            "negative_count": negative_count,
+            "total_symbols": len(columns),
+            "positive_count": columns.positive_count(),
+            "negative_count": columns.negative_count(),
             "most_positive": {
-                "symbol": most_positive[0],
-                "rate": most_positive[1].get("fundingRate", 0)
+                "symbol": most_positive,
+                "rate": rates[most_positive].funding_rate,
+                "rate_8h": rates[most_positive].rate_8h,
+                "apr": rates[most_positive].apr
             },
             "most_negative": {
-                "symbol": most_negative[0],
-                "rate": most_negative[1].get("fundingRate", 0)
+                "symbol": most_negative,
+                "rate": rates[most_negative].funding_rate,
+                "rate_8h": rates[most_negative].rate_8h,
+                "apr": rates[most_negative].apr
             }
         }
 
-    def check_predicted_rates(self, ticker_data: Dict[str, Dict]) -> List[Dict]:
+    def check_predicted_rates(self, ticker_data: Dict[str, Ticker],
+                              columns: Optional[TickerColumns] = None) -> List[Alert]:
         """
         Check current (predicted) funding rates and generate alerts for extreme values
         
         These are the rates that WILL settle at the next funding time.
-        Only alerts for extreme rates to avoid spam.
+        Only alerts for extreme rates to avoid spam. Rates are compared as
+        per-8h equivalents, so a 1h symbol counts 8x its raw rate.
         
         Args:
-            ticker_data: Dict mapping symbol to current ticker data with fundingRate
+            ticker_data: Dict mapping symbol to current Ticker
+            columns: Columns already built for the snapshot ticker_data came from
         
         Returns:
-            List of alert dictionaries for extreme predicted rates
+            List of alerts for extreme predicted rates
         """
         if not getattr(self.config, 'ALERT_ON_PREDICTED_RATES', False):
             return []
         
         alerts = []
-        threshold = getattr(self.config, 'PREDICTED_RATE_THRESHOLD', 0.001)
         current_time = datetime.now(timezone.utc).timestamp()
+        threshold = getattr(self.config, 'PREDICTED_RATE_THRESHOLD', 0.001)
         
-        for symbol, data in ticker_data.items():
-            current_rate = float(data.get("fundingRate", 0))
-            
-            # Only alert for extreme rates
-            if abs(current_rate) < threshold:
-                # Clear from alerted list if rate is no longer extreme
-                if symbol in self.alerted_predicted_rates:
-                    del self.alerted_predicted_rates[symbol]
-                continue
-            
-            # Check if we already alerted for this symbol recently
-            prev_alerted = self.alerted_predicted_rates.get(symbol)
-            if prev_alerted is not None:
-                prev_rate, prev_time = prev_alerted
-                time_since_alert = current_time - prev_time
-                
-                # Skip if within cooldown period (4 hours) and same direction
-                same_sign = (current_rate > 0) == (prev_rate > 0)
-                if same_sign and time_since_alert < self.PREDICTED_ALERT_COOLDOWN:
-                    continue
-                
-                # Also skip if rate hasn't changed significantly (50%+)
-                rate_change = abs(current_rate - prev_rate) / abs(prev_rate) if prev_rate != 0 else 1
-                if same_sign and rate_change < 0.5:
-                    continue
-            
-            if not self._can_send_alert():
-                continue
-            
-            # Create live rate alert
-            alert = self._create_predicted_alert(symbol, current_rate, data)
+        # Vectorized threshold check; only extreme symbols and those with a
+        # tracked alert (whose cooldown may need clearing) are evaluated
+        columns = columns or TickerColumns.from_tickers(ticker_data)
+        candidates = [s for s in columns.symbols_where(columns.extreme_mask(threshold)) if s in ticker_data]
+        extreme = set(candidates)
+        candidates += [s for s in self.alerted_predicted_rates if s in ticker_data and s not in extreme]
+        
+        for symbol in candidates:
+            alert = self._evaluate_predicted_rate(symbol, ticker_data[symbol], current_time)
             if alert:
                 alerts.append(alert)
-                self.alert_count_this_hour += 1
-                self.alerted_predicted_rates[symbol] = (current_rate, current_time)
-                logger.info(f"{symbol}: Extreme LIVE funding rate: {current_rate:.6f}")
         
         if alerts:
             logger.info(f"Generated {len(alerts)} live rate alerts")
@@ -314,30 +715,174 @@ class FundingRateMonitor:
         
         return alerts
     
-    def _create_predicted_alert(self, symbol: str, rate: float, ticker_data: Dict) -> Dict:
+    def check_predicted_rate(self, symbol: str, ticker: Ticker) -> Optional[Alert]:
+        """
+        Check a single symbol's live funding rate (O(1), for streaming updates)
+        
+        Args:
+            symbol: Symbol name
+            ticker: Current Ticker
+        
+        Returns:
+            Alert if the rate is extreme and not in cooldown, None otherwise
+        """
+        if not getattr(self.config, 'ALERT_ON_PREDICTED_RATES', False):
+            return None
+        
+        alert = self._evaluate_predicted_rate(symbol, ticker, datetime.now(timezone.utc).timestamp())
+        if alert:
+            self._save_state()
+        return alert
+    
+    def _evaluate_predicted_rate(self, symbol: str, ticker: Ticker, current_time: float) -> Optional[Alert]:
+        """Apply the extreme live rate rule and cooldown to one symbol"""
+        threshold = getattr(self.config, 'PREDICTED_RATE_THRESHOLD', 0.001)
+        current_rate = ticker.funding_rate
+        
+        # Only alert for extreme rates (per-8h equivalent)
+        if abs(ticker.rate_8h) < threshold:
+            # Clear from alerted list if rate is no longer extreme
+            if symbol in self.alerted_predicted_rates:
+                del self.alerted_predicted_rates[symbol]
+                self._mark_dirty("alerted_predicted", symbol)
+            return None
+        
+        # Check if we already alerted for this symbol recently
+        prev_alerted = self.alerted_predicted_rates.get(symbol)
+        if prev_alerted is not None:
+            prev_rate, prev_time = prev_alerted
+            time_since_alert = current_time - prev_time
+            
+            # Skip if within cooldown period (4 hours) and same direction
+            same_sign = (current_rate > 0) == (prev_rate > 0)
+            if same_sign and time_since_alert < self.PREDICTED_ALERT_COOLDOWN:
+                return None
+            
+            # Also skip if rate hasn't changed significantly (50%+)
+            rate_change = abs(current_rate - prev_rate) / abs(prev_rate) if prev_rate != 0 else 1
+            if same_sign and rate_change < 0.5:
+                return None
+        
+        if not self._can_send_alert():
+            return None
+        
+        # Create live rate alert
+        alert = self._create_predicted_alert(symbol, current_rate, ticker)
+        if alert:
+            self.alert_count_this_hour += 1
+            self.alerted_predicted_rates[symbol] = (current_rate, current_time)
+            self._mark_dirty("alerted_predicted", symbol)
+            logger.info(f"{symbol}: Extreme LIVE funding rate: {current_rate:.6f}")
+        return alert
+    
+    def _create_predicted_alert(self, symbol: str, rate: float, ticker: Ticker) -> Alert:
         """Create an alert for a live (upcoming) funding rate"""
-        from datetime import timedelta
+        return Alert(
+            symbol=symbol,
+            alert_type="predicted",
+            funding_rate=rate,
+            apr=ticker.apr,
+            last_price=ticker.last_price,
+            settlement_time=self._format_settlement_time_ist(ticker.next_funding_time),
+            funding_interval=f"{ticker.funding_interval_hours}h",
+            volume_24h=ticker.volume_24h,
+        )
+    
+    def check_spreads(self, snapshot: Dict[Tuple[str, str], Ticker]) -> List[Alert]:
+        """
+        Update cross-venue spreads from a (venue, symbol) snapshot and alert on wide ones
         
-        # Calculate next funding time
-        next_funding_time = int(ticker_data.get("nextFundingTime", 0))
+        Only symbols with a changed quote are re-evaluated.
         
-        funding_interval = ticker_data.get("fundingIntervalHours", 8)
+        Args:
+            snapshot: Output of VenueOrchestrator.fetch_all
         
-        return {
-            "symbol": symbol,
-            "fundingRate": rate,
-            "prevFundingRate": None,  # No previous for predicted
-            "rateChange": None,
-            "alertType": "predicted",
-            "lastPrice": ticker_data.get("lastPrice", 0),
-            "settlementTime": self._format_settlement_time_ist(next_funding_time),
-            "fundingInterval": f"{funding_interval}h",
-            "prevFundingInterval": None,
-            "volume24h": ticker_data.get("volume24h", 0),
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }
+        Returns:
+            List of spread alerts
+        """
+        changed = self.spreads.sync(snapshot)
+        if not getattr(self.config, 'ALERT_ON_SPREADS', False):
+            return []
+        
+        alerts = []
+        current_time = datetime.now(timezone.utc).timestamp()
+        for symbol in changed:
+            alert = self._evaluate_spread(symbol, self.spreads.get(symbol), current_time)
+            if alert:
+                alerts.append(alert)
+        
+        if alerts:
+            logger.info(f"Generated {len(alerts)} spread alerts")
+        if self._dirty:
+            self._save_state()
+        return alerts
+    
+    def update_venue_quote(self, venue: str, ticker: Ticker) -> Optional[Alert]:
+        """
+        Apply one streamed venue quote to its symbol's spread (one symbol recomputed, for streaming updates)
+        
+        Returns:
+            Alert if the symbol's spread crossed the threshold, None otherwise
+        """
+        spread = self.spreads.update(venue, ticker)
+        if not getattr(self.config, 'ALERT_ON_SPREADS', False):
+            return None
+        
+        alert = self._evaluate_spread(ticker.symbol, spread, datetime.now(timezone.utc).timestamp())
+        if self._dirty:
+            self._save_state()
+        return alert
+    
+    def _evaluate_spread(self, symbol: str, spread: Optional[Spread], current_time: float) -> Optional[Alert]:
+        """Apply the spread threshold and cooldown to one symbol"""
+        threshold = getattr(self.config, 'SPREAD_ALERT_APR', 0.5)
+        
+        if spread is None or spread.apr < threshold:
+            # Re-arm once the spread narrows
+            if symbol in self.alerted_spreads:
+                del self.alerted_spreads[symbol]
+                self._mark_dirty("alerted_spreads", symbol)
+            return None
+        
+        prev_alerted = self.alerted_spreads.get(symbol)
+        if prev_alerted is not None:
+            prev_apr, prev_short, prev_long, prev_time = prev_alerted
+            same_legs = (prev_short, prev_long) == (spread.short.venue, spread.long.venue)
+            
+            # Skip while in cooldown on the same venue pair, unless it widened 50%+
+            if same_legs and current_time - prev_time < self.SPREAD_ALERT_COOLDOWN:
+                return None
+            if same_legs and spread.apr < prev_apr * 1.5:
+                return None
+        
+        if not self._can_send_alert():
+            return None
+        
+        self.alert_count_this_hour += 1
+        self.alerted_spreads[symbol] = (spread.apr, spread.short.venue, spread.long.venue, current_time)
+        self._mark_dirty("alerted_spreads", symbol)
+        logger.info(
+            f"{symbol}: Funding spread {spread.apr:.1%} APR "
+            f"(short {spread.short.venue}, long {spread.long.venue})"
+        )
+        return self._create_spread_alert(spread)
+    
+    def _create_spread_alert(self, spread: Spread) -> Alert:
+        """Create an alert for a wide cross-venue funding spread"""
+        return Alert(
+            symbol=spread.symbol,
+            alert_type="spread",
+            funding_rate=spread.short.funding_rate,
+            funding_interval=f"{spread.short.interval_hours}h",
+            spread_apr=spread.apr,
+            short_venue=spread.short.venue,
+            long_venue=spread.long.venue,
+            long_funding_rate=spread.long.funding_rate,
+            long_funding_interval=f"{spread.long.interval_hours}h",
+        )
     
     def clear_predicted_alerts_after_settlement(self, symbol: str):
         """Clear predicted alert tracking after a settlement occurs"""
         if symbol in self.alerted_predicted_rates:
             del self.alerted_predicted_rates[symbol]
+            self._mark_dirty("alerted_predicted", symbol)
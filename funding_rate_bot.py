@@ -24,12 +24,21 @@ import os
 import sys
 import signal
 from datetime import datetime, timezone
+from typing import List, Optional
 from dotenv import load_dotenv
 
 from config import FundingRateConfig, config
 from bybit_fetcher import BybitDataFetcher
 from funding_monitor import FundingRateMonitor
+from funding_store import FundingHistoryStore
+from instrument_cache import InstrumentCache
+from models import Ticker
+from rate_limiter import get_shared_limiter
+from settlement_scheduler import SettlementScheduler
 from telegram_client import TelegramClient
+from telegram_outbox import TelegramOutbox
+from update_dispatcher import UpdateDispatcher
+from webhook_server import receive_updates
 
 # Load environment variables
 load_dotenv()
@@ -68,13 +77,23 @@ class FundingRateBot:
         self.config = config
         
         # Initialize components
-        self.fetcher = BybitDataFetcher(self.config.BYBIT_BASE_URL)
-        self.monitor = FundingRateMonitor(self.config)
+        self.fetcher = BybitDataFetcher(
+            self.config.BYBIT_BASE_URL,
+            self.config.SETTLEMENT_FETCH_CONCURRENCY,
+            rate_limiter=get_shared_limiter("bybit", self.config.BYBIT_MAX_REQUESTS_PER_SECOND),
+            history_store=FundingHistoryStore(self.config.FUNDING_HISTORY_DB)
+        )
+        self.monitor = FundingRateMonitor(self.config, defer_saves=True)
         self.telegram = TelegramClient(
             self.telegram_token,
             self.telegram_chat_id,
             topic_id=int(self.telegram_topic_id) if self.telegram_topic_id else None
         )
+        self.outbox = TelegramOutbox(
+            self.telegram,
+            global_per_second=self.config.TELEGRAM_GLOBAL_MESSAGES_PER_SECOND,
+            group_per_minute=self.config.TELEGRAM_GROUP_MESSAGES_PER_MINUTE
+        )
         
         # Get symbols and their funding intervals
         if self.config.MONITOR_ALL_SYMBOLS:
@@ -88,7 +107,7 @@ class FundingRateBot:
             # Count by interval
             self.interval_counts = {}
             for data in self.symbols_data.values():
-                interval = str(data.get("fundingIntervalHours", 8))
+                interval = str(data.funding_interval_hours)
                 self.interval_counts[interval] = self.interval_counts.get(interval, 0) + 1
             
             logger.info(f"Funding intervals: {self.interval_counts}")
@@ -97,52 +116,79 @@ class FundingRateBot:
             self.symbols_data = {}
             self.interval_counts = {}
         
+        # Wake at funding boundaries instead of a fixed interval
+        self.scheduler = SettlementScheduler(self.config.SETTLEMENT_WAKE_DELAY, self.config.SETTLEMENT_RETRY_DELAY)
+        self.scheduler.update(self.symbols_data)
+        
+        # Instrument metadata (listings, delistings, funding interval changes)
+        self.instruments = InstrumentCache(
+            self.fetcher, self.config.INSTRUMENT_CACHE_FILE,
+            max_removed_fraction=self.config.INSTRUMENT_MAX_REMOVED_FRACTION
+        )
+        
         # Bot state
         self.running = True
         self.last_check = None
-        self.last_symbol_refresh = datetime.now(timezone.utc)
-        self.symbol_refresh_interval = 86400  # 24 hours in seconds
         
         logger.info(f"Bot initialized. Monitoring {len(self.symbols)} symbols")
         logger.info(f"Symbols: {', '.join(self.symbols[:10])}{'...' if len(self.symbols) > 10 else ''}")
     
-    def refresh_symbols(self):
-        """Refresh the list of symbols from the exchange (for new listings/delistings)"""
-        if not self.config.MONITOR_ALL_SYMBOLS:
+    async def refresh_symbols(self):
+        """Apply new listings, delistings and funding interval changes from the instrument cache"""
+        diff = await self.instruments.refresh()
+        if diff is None or diff.empty:
             return
         
-        logger.info("Refreshing symbol list from Bybit...")
-        new_symbols_data = self.fetcher.get_all_perpetual_symbols_with_intervals()
-        
-        if not new_symbols_data:
-            logger.warning("Failed to refresh symbols, keeping existing list")
-            return
-        
-        old_count = len(self.symbols)
-        old_symbols = set(self.symbols)
-        new_symbols = set(new_symbols_data.keys())
-        
-        # Detect changes
-        added = new_symbols - old_symbols
-        removed = old_symbols - new_symbols
-        
-        if added:
-            logger.info(f"New listings detected: {', '.join(sorted(added))}")
-        if removed:
-            logger.info(f"Delistings detected: {', '.join(sorted(removed))}")
+        # Only symbols we monitor get interval alerts
+        interval_changes = {
+            symbol: change for symbol, change in diff.interval_changes.items()
+            if symbol in self.symbols
+        }
+        for symbol, (_, new_interval) in interval_changes.items():
+            if symbol in self.symbols_data:
+                self.symbols_data[symbol].funding_interval_hours = new_interval
         
-        # Update
-        self.symbols_data = new_symbols_data
-        self.symbols = list(new_symbols_data.keys())
+        if self.config.MONITOR_ALL_SYMBOLS and (diff.added or diff.removed):
+            old_count = len(self.symbols)
+            
+            if diff.added:
+                logger.info(f"New listings detected: {', '.join(sorted(diff.added))}")
+            if diff.removed:
+                logger.info(f"Delistings detected: {', '.join(sorted(diff.removed))}")
+            
+            # Update only the listed/delisted symbols
+            self.scheduler.remove(diff.removed)
+            for symbol in diff.removed:
+                self.symbols_data.pop(symbol, None)
+            for symbol, instrument in diff.added.items():
+                self.symbols_data.setdefault(
+                    symbol, Ticker(symbol, funding_interval_hours=instrument.funding_interval_hours)
+                )
+            self.symbols = list(self.symbols_data.keys())
+            logger.info(f"Symbol refresh complete. Now monitoring {len(self.symbols)} symbols (was {old_count})")
         
-        # Update interval counts
-        self.interval_counts = {}
-        for data in self.symbols_data.values():
-            interval = str(data.get("fundingIntervalHours", 8))
-            self.interval_counts[interval] = self.interval_counts.get(interval, 0) + 1
+        if interval_changes or diff.added or diff.removed:
+            # Update interval counts
+            self.interval_counts = {}
+            for data in self.symbols_data.values():
+                interval = str(data.funding_interval_hours)
+                self.interval_counts[interval] = self.interval_counts.get(interval, 0) + 1
         
-        self.last_symbol_refresh = datetime.now(timezone.utc)
-        logger.info(f"Symbol refresh complete. Now monitoring {len(self.symbols)} symbols (was {old_count})")
+        if interval_changes:
+            loop = asyncio.get_event_loop()
+            ticker_data = await loop.run_in_executor(None, self.fetcher.get_tickers, list(interval_changes))
+            alerts = self.monitor.check_interval_changes(interval_changes, ticker_data)
+            await self.monitor.flush_state()
+            self.outbox.enqueue_alerts(alerts, digest=config.ALERT_DIGEST_MODE)
+    
+    async def instrument_loop(self):
+        """Refresh instrument metadata every INSTRUMENT_REFRESH_INTERVAL"""
+        while self.running:
+            try:
+                await self.refresh_symbols()
+            except Exception as e:
+                logger.error(f"Error refreshing instruments: {e}", exc_info=True)
+            await asyncio.sleep(self.config.INSTRUMENT_REFRESH_INTERVAL)
     
     async def run(self):
         """Main bot loop"""
@@ -155,12 +201,15 @@ class FundingRateBot:
         for sig in (signal.SIGINT, signal.SIGTERM):
             signal.signal(sig, self._handle_shutdown)
         
+        self.outbox.start()
+        
         # Start command listener IMMEDIATELY (don't wait for first check)
         logger.info("Starting command listener...")
         
         try:
             await asyncio.gather(
                 self.monitoring_loop(),
+                self.instrument_loop(),
                 self.command_listener(),
                 return_exceptions=True
             )
@@ -171,6 +220,10 @@ class FundingRateBot:
             raise
         finally:
             logger.info("Bot shutting down...")
+            await self.monitor.flush_state()
+            await self.outbox.stop()
+            await self.fetcher.close()
+            await self.telegram.close()
     
     def _handle_shutdown(self, signum, frame):
         """Handle shutdown signals"""
@@ -179,28 +232,36 @@ class FundingRateBot:
     
     async def monitoring_loop(self):
         """Main monitoring loop - checks for new funding settlements"""
-        logger.info(f"Starting monitoring loop (interval: {self.config.CHECK_INTERVAL}s = {self.config.CHECK_INTERVAL // 60} min)")
+        logger.info(f"Starting monitoring loop (wakes at settlement boundaries, at most every {self.config.CHECK_INTERVAL // 60} min)")
         logger.info("Checking for funding SETTLEMENTS (not predicted rates)")
-        logger.info(f"Symbol list will refresh every {self.symbol_refresh_interval // 3600} hours")
+        logger.info(f"Instruments (listings, funding intervals) refresh every {self.config.INSTRUMENT_REFRESH_INTERVAL}s")
         
         while self.running:
             try:
-                # Check if we need to refresh the symbol list (every 24 hours)
-                time_since_refresh = (datetime.now(timezone.utc) - self.last_symbol_refresh).total_seconds()
-                if time_since_refresh >= self.symbol_refresh_interval:
-                    self.refresh_symbols()
+                due = self.scheduler.pop_due()
+                if due:
+                    logger.info(f"Settlement boundary reached for {len(due)} symbols")
                 
-                await self.check_funding_settlements()
+                await self.check_funding_settlements(due)
+                await self.monitor.flush_state()
                 self.last_check = datetime.now(timezone.utc)
                 
             except Exception as e:
                 logger.error(f"Error in monitoring loop: {e}", exc_info=True)
             
-            # Wait for next check
-            await asyncio.sleep(self.config.CHECK_INTERVAL)
+            # Wait for the next settlement group (or CHECK_INTERVAL at most)
+            until_next = self.scheduler.seconds_until_next_wake()
+            if until_next is None:
+                until_next = self.config.CHECK_INTERVAL
+            await asyncio.sleep(max(1.0, min(until_next, self.config.CHECK_INTERVAL)))
     
-    async def check_funding_settlements(self):
-        """Fetch latest settlements and send alerts for new ones"""
+    async def check_funding_settlements(self, due: Optional[List[str]] = None):
+        """
+        Fetch latest settlements and send alerts for new ones
+        
+        Args:
+            due: Symbols whose settlement boundary (or retry) the scheduler just reached
+        """
         logger.debug("Checking for new funding settlements...")
         
         # Run blocking fetcher in thread pool to not block async loop
@@ -214,82 +275,79 @@ class FundingRateBot:
         # Add funding interval info to ticker data
         for symbol, data in ticker_data.items():
             if symbol in self.symbols_data:
-                data["fundingIntervalHours"] = self.symbols_data[symbol].get("fundingIntervalHours", 8)
+                data.funding_interval_hours = self.symbols_data[symbol].funding_interval_hours
         
-        # Fetch latest settlement for each symbol in thread pool
-        logger.debug(f"Fetching settlement history for {len(self.symbols)} symbols...")
-        settlements = await loop.run_in_executor(None, self.fetcher.get_latest_settlements_batch, self.symbols)
-        
-        if not settlements:
-            logger.warning("No settlement data received")
-            return
+        # Reschedule from the latest nextFundingTime values
+        self.scheduler.update(ticker_data)
         
-        logger.debug(f"Fetched settlements for {len(settlements)} symbols")
+        # Fetch latest settlement only for the symbols the scheduler woke for (everything
+        # on the first check to catch up) whose nextFundingTime rolled over
+        candidates = self.monitor.get_settlement_candidates(
+            ticker_data, (due or []) if self.last_check else None
+        )
+        due_symbols = self.monitor.get_symbols_due_for_settlement(candidates)
+        settlements = {}
+        if due_symbols:
+            logger.debug(f"Fetching settlement history for {len(due_symbols)} symbols...")
+            settlements = await self.fetcher.get_latest_settlements_batch_async(due_symbols)
+            logger.debug(f"Fetched settlements for {len(settlements)} symbols")
         
         # Check for new settlements and generate alerts
         alerts = self.monitor.check_settlements(settlements, ticker_data)
         
+        # History can lag the ticker rollover; re-check those symbols after the retry delay
+        lagging = self.monitor.get_lagging_settlements(ticker_data, due_symbols)
+        if lagging:
+            logger.info(f"Settlement not in history yet for {len(lagging)} symbols, retrying")
+            self.scheduler.retry(lagging)
+        
         # Clear predicted alert tracking for symbols that just settled
         for alert in alerts:
-            self.monitor.clear_predicted_alerts_after_settlement(alert['symbol'])
+            self.monitor.clear_predicted_alerts_after_settlement(alert.symbol)
         
         # Also check predicted (current) rates for extreme values
         predicted_alerts = self.monitor.check_predicted_rates(ticker_data)
         
-        # Limit predicted alerts to top 5 most extreme to avoid spam
+        # Limit predicted alerts to top 5 most extreme (per-8h equivalent) to avoid spam
         if len(predicted_alerts) > 5:
             predicted_alerts = sorted(
                 predicted_alerts, 
-                key=lambda x: abs(x.get('fundingRate', 0)), 
+                key=lambda x: abs(ticker_data[x.symbol].rate_8h), 
                 reverse=True
             )[:5]
             logger.info(f"Limited to top 5 most extreme predicted rates")
         
-        # Combine alerts (settlements first, then predictions)
-        all_alerts = alerts + predicted_alerts
+        # Live rates far from each symbol's own settled history (top 5 by z-score)
+        anomaly_alerts = self.monitor.check_anomalies(ticker_data)
+        if len(anomaly_alerts) > 5:
+            anomaly_alerts = sorted(anomaly_alerts, key=lambda x: abs(x.zscore), reverse=True)[:5]
         
-        # Send alerts quickly (reduce delay)
-        for alert in all_alerts:
-            success = await self.telegram.send_funding_alert(alert)
-            if success:
-                logger.info(f"Alert sent for {alert['symbol']}: {alert['alertType']}")
-            else:
-                logger.error(f"Failed to send alert for {alert['symbol']}")
-            
-            # Minimal delay between alerts
-            await asyncio.sleep(0.3)
+        # Combine alerts (settlements first, then predictions and anomalies)
+        all_alerts = alerts + predicted_alerts + anomaly_alerts
+        
+        # Queue alerts as digests; the outbox enforces Telegram limits and flips go first
+        self.outbox.enqueue_alerts(all_alerts, digest=config.ALERT_DIGEST_MODE)
     
     async def command_listener(self):
-        """Listen for Telegram commands"""
-        import aiohttp
-        
+        """Listen for Telegram commands (webhook if TELEGRAM_WEBHOOK_URL is set, long polling otherwise)"""
         logger.info("Starting command listener...")
-        last_update_id = 0
-        
-        async with aiohttp.ClientSession() as session:
-            while self.running:
-                try:
-                    url = f"https://api.telegram.org/bot{self.telegram_token}/getUpdates"
-                    params = {
-                        "offset": last_update_id + 1,
-                        "timeout": 5  # Short timeout for faster response
-                    }
-                    
-                    async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            
-                            if data.get("ok"):
-                                for update in data.get("result", []):
-                                    last_update_id = update.get("update_id", last_update_id)
-                                    await self.handle_command(update)
-                    
-                except asyncio.TimeoutError:
-                    continue
-                except Exception as e:
-                    logger.error(f"Error in command listener: {e}")
-                    await asyncio.sleep(1)
-                await asyncio.sleep(5)
+        dispatcher = UpdateDispatcher(
+            self.handle_command,
+            max_concurrency=self.config.COMMAND_MAX_CONCURRENCY,
+            max_pending=self.config.COMMAND_MAX_PENDING,
+            deadline=self.config.COMMAND_DEADLINE
+        )
+        await receive_updates(
+            self.telegram,
+            dispatcher.submit,
+            lambda: self.running,
+            webhook_url=self.config.TELEGRAM_WEBHOOK_URL,
+            secret_token=self.config.TELEGRAM_WEBHOOK_SECRET,
+            host=self.config.TELEGRAM_WEBHOOK_HOST,
+            port=self.config.TELEGRAM_WEBHOOK_PORT,
+            poll_timeout=self.config.TELEGRAM_LONG_POLL_TIMEOUT
+        )
+        await dispatcher.stop()
     
     async def handle_command(self, update: dict):
         """Handle incoming Telegram commands"""
@@ -365,15 +423,15 @@ For support, contact @DecentralizedJM"""
                 await self.telegram.send_message(f"❌ No data available for <b>{symbol}</b>.")
                 return
             
-            ticker = ticker_data.get(symbol, {})
-            settlement = settlements.get(symbol, {}) if settlements else {}
+            ticker = ticker_data[symbol]
+            settlement = settlements.get(symbol) if settlements else None
             
             # Current (predicted) rate
-            predicted_rate = float(ticker.get("fundingRate", 0))
+            predicted_rate = ticker.funding_rate
             predicted_pct = predicted_rate * 100
             
             # Last settled rate
-            settled_rate = float(settlement.get("fundingRate", 0)) if settlement else 0
+            settled_rate = settlement.funding_rate if settlement else 0
             settled_pct = settled_rate * 100
             
             # Format rates
@@ -392,10 +450,10 @@ For support, contact @DecentralizedJM"""
             # Get interval
             interval = 8
             if symbol in self.symbols_data:
-                interval = self.symbols_data[symbol].get("fundingIntervalHours", 8)
+                interval = self.symbols_data[symbol].funding_interval_hours
             
             # Next funding time
-            next_funding = int(ticker.get("nextFundingTime", 0))
+            next_funding = ticker.next_funding_time
             if next_funding:
                 from datetime import datetime, timezone, timedelta
                 dt = datetime.fromtimestamp(next_funding / 1000, tz=timezone.utc)
@@ -406,7 +464,7 @@ For support, contact @DecentralizedJM"""
                 next_time_str = "Unknown"
             
             # Last settlement time
-            last_settlement = int(settlement.get("fundingRateTimestamp", 0)) if settlement else 0
+            last_settlement = settlement.timestamp if settlement else 0
             if last_settlement:
                 from datetime import datetime, timezone, timedelta
                 dt = datetime.fromtimestamp(last_settlement / 1000, tz=timezone.utc)
@@ -443,11 +501,11 @@ For support, contact @DecentralizedJM"""
                 return
             
             settlement = settlements[symbol]
-            ticker = ticker_data.get(symbol, {})
+            ticker = ticker_data.get(symbol)
             
-            rate = settlement.get("fundingRate", 0)
+            rate = settlement.funding_rate
             rate_pct = rate * 100
-            timestamp = settlement.get("fundingRateTimestamp", 0)
+            timestamp = settlement.timestamp
             
             # Format rate with sign
             rate_str = f"+{rate_pct:.4f}%" if rate >= 0 else f"{rate_pct:.4f}%"
@@ -473,9 +531,9 @@ For support, contact @DecentralizedJM"""
                 settlement_time = "Unknown"
             
             # Get interval
-            interval = ticker.get("fundingIntervalHours", 8)
+            interval = ticker.funding_interval_hours if ticker else 8
             if symbol in self.symbols_data:
-                interval = self.symbols_data[symbol].get("fundingIntervalHours", interval)
+                interval = self.symbols_data[symbol].funding_interval_hours
             
             message = f"""{color} <b>{symbol}</b>
 
@@ -0,0 +1,189 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from models import Settlement
+
+logger = logging.getLogger(__name__)
+
+DAY_MS = 86_400_000
+
+
+class FundingHistoryStore:
+    """
+    Local SQLite store of funding settlements keyed by (symbol, timestamp)
+
+    Filled from every funding history response the fetcher sees (including the
+    monitor's settlement sweeps). A UTC day is marked synced once it has been
+    fetched in full after it closed, so past days are served locally and only
+    gaps go upstream. The database runs in WAL mode so the command handler and
+    alert monitor processes can read while the other writes.
+    """
+
+    # Seconds after a UTC day ends before it is treated as complete
+    # (the last settlement of the day can take a moment to show up in history)
+    DAY_CLOSE_GRACE = 120
+
+    def __init__(self, path: str = "data/funding_history.db"):
+        """
+        Open (or create) the store
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS settlements (
+                symbol TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                rate REAL NOT NULL,
+                PRIMARY KEY (symbol, ts)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS synced_days (
+                symbol TEXT NOT NULL,
+                day INTEGER NOT NULL,
+                PRIMARY KEY (symbol, day)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS backfill_progress (
+                symbol TEXT PRIMARY KEY,
+                since INTEGER NOT NULL,
+                until INTEGER NOT NULL,
+                cursor INTEGER NOT NULL,
+                done INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID;
+        """)
+        self._conn.commit()
+
+        # Counters
+        self.local_hits = 0
+        self.upstream_fills = 0
+
+    @staticmethod
+    def day_start(timestamp_ms: int) -> int:
+        """Start of the UTC day containing timestamp_ms, in milliseconds"""
+        return timestamp_ms - timestamp_ms % DAY_MS
+
+    def is_day_closed(self, day_start_ms: int, now: Optional[float] = None) -> bool:
+        """Check whether a UTC day has ended (plus the grace period)"""
+        now_ms = int((time.time() if now is None else now) * 1000)
+        return now_ms >= day_start_ms + DAY_MS + self.DAY_CLOSE_GRACE * 1000
+
+    def add_settlements(self, records: Iterable[Settlement]) -> int:
+        """
+        Insert settlement records (duplicates are replaced)
+
+        Returns:
+            Number of records written
+        """
+        rows = [(r.symbol, r.timestamp, r.funding_rate) for r in records if r and r.symbol and r.timestamp]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO settlements VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+        return len(rows)
+
+    def get_range(self, symbol: str, start_ms: int, end_ms: int) -> List[Settlement]:
+        """
+        Get stored settlements for a symbol in [start_ms, end_ms], oldest first
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ts, rate FROM settlements WHERE symbol = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                (symbol, start_ms, end_ms)
+            ).fetchall()
+        return [Settlement(symbol, rate, ts) for ts, rate in rows]
+
+    def is_day_synced(self, symbol: str, day_start_ms: int) -> bool:
+        """Check whether a closed day has been fetched in full"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM synced_days WHERE symbol = ? AND day = ?", (symbol, day_start_ms)
+            ).fetchone()
+        return row is not None
+
+    def mark_day_synced(self, symbol: str, day_start_ms: int):
+        """Record that a closed day is complete locally"""
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO synced_days VALUES (?, ?)", (symbol, day_start_ms))
+            self._conn.commit()
+
+    def mark_days_synced(self, symbol: str, first_day_ms: int, last_day_ms: int):
+        """Mark every closed UTC day in [first_day_ms, last_day_ms] as complete locally"""
+        rows = [
+            (symbol, day)
+            for day in range(self.day_start(first_day_ms), self.day_start(last_day_ms) + 1, DAY_MS)
+            if self.is_day_closed(day)
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR IGNORE INTO synced_days VALUES (?, ?)", rows)
+            self._conn.commit()
+
+    def get_day(self, symbol: str, day_start_ms: int) -> Optional[List[Settlement]]:
+        """
+        Get a day's settlements if the day is complete locally
+
+        Returns:
+            Records oldest first, or None if the day needs an upstream fetch
+        """
+        if not self.is_day_synced(symbol, day_start_ms):
+            return None
+        self.local_hits += 1
+        return self.get_range(symbol, day_start_ms, day_start_ms + DAY_MS - 1)
+
+    def mark_day_fetched(self, symbol: str, day_start_ms: int):
+        """Record that a full day was fetched upstream (synced if the day has closed)"""
+        self.upstream_fills += 1
+        if self.is_day_closed(day_start_ms):
+            self.mark_day_synced(symbol, day_start_ms)
+
+    def get_backfill_checkpoint(self, symbol: str) -> Optional[Dict]:
+        """
+        Get a symbol's backfill progress
+
+        Returns:
+            Dict with since, until, cursor (walk continues below it) and done, or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT since, until, cursor, done FROM backfill_progress WHERE symbol = ?", (symbol,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"since": row[0], "until": row[1], "cursor": row[2], "done": bool(row[3])}
+
+    def save_backfill_checkpoint(self, symbol: str, since: int, until: int, cursor: int, done: bool = False):
+        """Record backfill progress for a symbol"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO backfill_progress VALUES (?, ?, ?, ?, ?)",
+                (symbol, since, until, cursor, int(done))
+            )
+            self._conn.commit()
+
+    def get_stats(self) -> Dict:
+        """Get row counts and hit counters"""
+        with self._lock:
+            settlements = self._conn.execute("SELECT COUNT(*) FROM settlements").fetchone()[0]
+            synced_days = self._conn.execute("SELECT COUNT(*) FROM synced_days").fetchone()[0]
+        return {
+            "settlements": settlements,
+            "synced_days": synced_days,
+            "local_hits": self.local_hits,
+            "upstream_fills": self.upstream_fills,
+        }
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
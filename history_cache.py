@@ -0,0 +1,147 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from bybit_fetcher import BybitDataFetcher
+from funding_store import DAY_MS, FundingHistoryStore
+from models import Settlement
+
+logger = logging.getLogger(__name__)
+
+DayKey = Tuple[str, int]
+
+
+class HistoryDayCache:
+    """
+    LRU cache of parsed funding settlements per (symbol, UTC day)
+
+    Sits in front of the fetcher's day lookup (history store, then Bybit).
+    Closed days never change, so they stay cached until evicted; the current
+    day is refetched after today_ttl seconds. Concurrent lookups of the same
+    day share one fetch. Closed days can also be saved to a JSON file so the
+    cache comes back warm after a restart.
+    """
+
+    def __init__(self, fetcher: BybitDataFetcher, max_entries: int = 2000, today_ttl: float = 60,
+                 cache_file: Optional[str] = None):
+        """
+        Args:
+            fetcher: Fetcher used on a miss (get_funding_rate_history_day_async)
+            max_entries: Max (symbol, day) entries kept
+            today_ttl: Seconds a day that has not closed yet is served from cache
+            cache_file: JSON file closed days are saved to and loaded from (None = memory only)
+        """
+        self.fetcher = fetcher
+        self.max_entries = max_entries
+        self.today_ttl = today_ttl
+        self.cache_file = cache_file
+
+        # key -> (records oldest first, expiry in monotonic seconds or None if immutable)
+        self._entries: "OrderedDict[DayKey, Tuple[List[Settlement], Optional[float]]]" = OrderedDict()
+        self._inflight: Dict[DayKey, asyncio.Task] = {}
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+        self._load()
+
+    @staticmethod
+    def _is_closed(day_start_ms: int) -> bool:
+        now_ms = int(time.time() * 1000)
+        return now_ms >= day_start_ms + DAY_MS + FundingHistoryStore.DAY_CLOSE_GRACE * 1000
+
+    async def get_day(self, symbol: str, day_start_ms: int) -> Tuple[List[Settlement], str]:
+        """
+        Get a symbol's settlements for one UTC day
+
+        Args:
+            symbol: Symbol name (e.g., "BTCUSDT")
+            day_start_ms: Start of the UTC day in milliseconds
+
+        Returns:
+            Tuple of (records sorted oldest first, error message if any)
+        """
+        key = (symbol, day_start_ms)
+        entry = self._entries.get(key)
+        if entry is not None:
+            records, expires_at = entry
+            if expires_at is None or time.monotonic() < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return records, ""
+            self.expired += 1
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.create_task(self.fetcher.get_funding_rate_history_day_async(symbol, day_start_ms))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+
+        records, error_msg = await asyncio.shield(task)
+        if not error_msg:
+            self._put(key, records)
+        return records, error_msg
+
+    def _put(self, key: DayKey, records: List[Settlement]):
+        expires_at = None if self._is_closed(key[1]) else time.monotonic() + self.today_ttl
+        self._entries[key] = (records, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+            for symbol, day, records in data[-self.max_entries:]:
+                self._entries[(symbol, day)] = ([Settlement(symbol, rate, ts) for rate, ts in records], None)
+            logger.info(f"Loaded {len(self._entries)} cached history days")
+        except Exception as e:
+            logger.warning(f"Could not load history cache: {e}")
+
+    def save(self):
+        """Write closed days to cache_file, least recently used first (atomic rename)"""
+        if not self.cache_file:
+            return
+        try:
+            data = [
+                [symbol, day, [[r.funding_rate, r.timestamp] for r in records]]
+                for (symbol, day), (records, expires_at) in self._entries.items()
+                if expires_at is None
+            ]
+            os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+            tmp_path = self.cache_file + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_file)
+            logger.info(f"Saved {len(data)} history days to {self.cache_file}")
+        except Exception as e:
+            logger.error(f"Could not save history cache: {e}")
+
+    def get_stats(self) -> Dict:
+        """Get entry count, hit rate and counters"""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,242 @@
+import asyncio
+import html
+import secrets
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from funding_store import DAY_MS
+from history_cache import HistoryDayCache
+from models import Settlement
+
+# Inline keyboard callback data: "hist:<token>:<page>"
+CALLBACK_PREFIX = "hist"
+
+
+def parse_ddmmyy(date_str: str) -> datetime:
+    """Parse a DDMMYY date as the start of that UTC day (raises ValueError)"""
+    if len(date_str) != 6 or not date_str.isdigit():
+        raise ValueError(f"not DDMMYY: {date_str}")
+    return datetime(int(date_str[4:6]) + 2000, int(date_str[2:4]), int(date_str[0:2]), tzinfo=timezone.utc)
+
+
+def format_rate(rate: float) -> str:
+    """Format a rate fraction as a signed percentage"""
+    return f"{rate * 100:+.4f}%"
+
+
+def format_ist(timestamp_ms: int) -> str:
+    """Format a millisecond timestamp in IST (DD/MM/YY H:M:S)"""
+    dt = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc) + timedelta(hours=5, minutes=30)
+    return dt.strftime('%d/%m/%y %H:%M:%S')
+
+
+class FundingSeries:
+    """
+    One symbol's settlements over a date range as NumPy columns
+
+    Cumulative funding is a single cumsum over the rate column, so page
+    rendering only slices arrays instead of re-summing settlements.
+    """
+
+    __slots__ = ("symbol", "timestamps", "rates", "cumulative")
+
+    def __init__(self, symbol: str, records: List[Settlement]):
+        n = len(records)
+        self.symbol = symbol
+        self.timestamps = np.fromiter((r.timestamp for r in records), dtype=np.int64, count=n)
+        self.rates = np.fromiter((r.funding_rate for r in records), dtype=np.float64, count=n)
+        self.cumulative = np.cumsum(self.rates)
+
+    def __len__(self) -> int:
+        return len(self.rates)
+
+    @property
+    def total(self) -> float:
+        return float(self.cumulative[-1]) if len(self) else 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / len(self) if len(self) else 0.0
+
+    def positive_count(self) -> int:
+        return int(np.count_nonzero(self.rates > 0))
+
+    def negative_count(self) -> int:
+        return int(np.count_nonzero(self.rates < 0))
+
+
+async def load_series(cache: HistoryDayCache, symbols: List[str], first_day_ms: int,
+                      last_day_ms: int) -> Tuple[List[FundingSeries], str]:
+    """
+    Load settlements for several symbols over a range of UTC days
+
+    Days go through the per-day cache (history store first, then Bybit),
+    at most fetcher.max_concurrency at a time.
+
+    Args:
+        cache: Per-day history cache
+        symbols: Symbol names
+        first_day_ms: Start of the first UTC day in milliseconds
+        last_day_ms: Start of the last UTC day in milliseconds
+
+    Returns:
+        Tuple of (one series per symbol, in order; first error message if any)
+    """
+    semaphore = asyncio.Semaphore(cache.fetcher.max_concurrency)
+    days = range(first_day_ms, last_day_ms + 1, DAY_MS)
+
+    async def get_day(symbol: str, day_ms: int) -> Tuple[List[Settlement], str]:
+        async with semaphore:
+            return await cache.get_day(symbol, day_ms)
+
+    results = await asyncio.gather(*(get_day(symbol, day) for symbol in symbols for day in days))
+
+    series = []
+    for i, symbol in enumerate(symbols):
+        records = []
+        for day_records, error_msg in results[i * len(days):(i + 1) * len(days)]:
+            if error_msg:
+                return [], error_msg
+            records.extend(day_records)
+        series.append(FundingSeries(symbol, records))
+    return series, ""
+
+
+class HistoryQuery:
+    """
+    Result of a range or multi-symbol /funding query, rendered one page at a time
+
+    A multi-symbol query opens on a comparison page ranked by cumulative
+    funding, followed by each symbol's settlements; a single symbol shows its
+    settlements only. Only the requested page is ever formatted.
+    """
+
+    def __init__(self, series: List[FundingSeries], first_day_ms: int, last_day_ms: int, page_size: int = 20):
+        """
+        Args:
+            series: One series per requested symbol
+            first_day_ms: Start of the first UTC day in milliseconds
+            last_day_ms: Start of the last UTC day in milliseconds
+            page_size: Settlements per page
+        """
+        self.series = series
+        self.page_size = page_size
+
+        first = datetime.fromtimestamp(first_day_ms / 1000, tz=timezone.utc).strftime('%d/%m/%y')
+        last = datetime.fromtimestamp(last_day_ms / 1000, tz=timezone.utc).strftime('%d/%m/%y')
+        self.range_display = first if first == last else f"{first} – {last}"
+
+        # (series index, first row) per page; index -1 is the comparison page
+        self.pages: List[Tuple[int, int]] = [(-1, 0)] if len(series) > 1 else []
+        for i, s in enumerate(series):
+            self.pages.extend((i, row) for row in range(0, max(len(s), 1), page_size))
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    def render_page(self, page: int) -> str:
+        """Format one page (clamped to the valid range)"""
+        index, row = self.pages[min(max(page, 0), self.page_count - 1)]
+        if index < 0:
+            return self._render_comparison()
+        return self._render_settlements(self.series[index], row)
+
+    def _render_comparison(self) -> str:
+        totals = np.fromiter((s.total for s in self.series), dtype=np.float64, count=len(self.series))
+
+        lines = ["📊 <b>Cumulative Funding</b>", f"📅 {self.range_display}\n"]
+        for i in np.argsort(-totals):
+            s = self.series[i]
+            symbol = html.escape(s.symbol)
+            emoji = "🟢" if s.total >= 0 else "🔴"
+            if len(s):
+                lines.append(
+                    f"{emoji} <b>{symbol}</b>: <b>{format_rate(s.total)}</b> "
+                    f"({len(s)} settlements, avg {format_rate(s.mean)})"
+                )
+            else:
+                lines.append(f"⚪ <b>{symbol}</b>: no data")
+
+        lines.append("\n<i>Ranked by cumulative funding</i>")
+        lines.append("<i>Use the buttons for each symbol's settlements</i>")
+        return "\n".join(lines)
+
+    def _render_settlements(self, s: FundingSeries, row: int) -> str:
+        symbol = html.escape(s.symbol)
+        lines = [f"📊 <b>{symbol}</b> Historical Funding Rates", f"📅 {self.range_display}\n"]
+        if not len(s):
+            lines.append(f"❌ No funding rate data found for <b>{symbol}</b>")
+            return "\n".join(lines)
+
+        end = min(row + self.page_size, len(s))
+        for ts, rate, cumulative in zip(s.timestamps[row:end].tolist(), s.rates[row:end].tolist(),
+                                        s.cumulative[row:end].tolist()):
+            emoji = "🟢" if rate >= 0 else "🔴"
+            lines.append(f"{emoji} {format_ist(ts)}: <b>{format_rate(rate)}</b> (Σ {format_rate(cumulative)})")
+
+        total_emoji = "🟢" if s.total >= 0 else "🔴"
+        lines.append(f"\n{total_emoji} <b>Total: {format_rate(s.total)}</b>")
+        lines.append(f"📈 Settlements: {len(s)} ({s.positive_count()} positive, {s.negative_count()} negative)")
+        lines.append(f"<i>Showing {row + 1}-{end} of {len(s)}</i>")
+        return "\n".join(lines)
+
+
+class HistoryPager:
+    """
+    Recent history queries kept for inline keyboard paging
+
+    Each query is stored under a short random token carried in the buttons'
+    callback data. The least recently viewed queries are dropped first; a
+    button on a dropped query asks the user to run the command again.
+    """
+
+    def __init__(self, max_queries: int = 200):
+        """
+        Args:
+            max_queries: Max queries kept for paging
+        """
+        self.max_queries = max_queries
+        self._queries: "OrderedDict[str, HistoryQuery]" = OrderedDict()
+
+    def add(self, query: HistoryQuery) -> str:
+        """Store a query and return its token"""
+        token = secrets.token_hex(4)
+        self._queries[token] = query
+        while len(self._queries) > self.max_queries:
+            self._queries.popitem(last=False)
+        return token
+
+    def get(self, token: str) -> Optional[HistoryQuery]:
+        query = self._queries.get(token)
+        if query is not None:
+            self._queries.move_to_end(token)
+        return query
+
+    @staticmethod
+    def parse_callback(data: str) -> Optional[Tuple[str, int]]:
+        """Token and page from a button's callback data (None if it is not a history button)"""
+        parts = data.split(":")
+        if len(parts) != 3 or parts[0] != CALLBACK_PREFIX or not parts[2].isdigit():
+            return None
+        return parts[1], int(parts[2])
+
+    @staticmethod
+    def keyboard(token: str, page: int, page_count: int) -> Optional[Dict]:
+        """Prev / page / next buttons (None when everything fits on one page)"""
+        if page_count <= 1:
+            return None
+
+        def button(text: str, target: int) -> Dict:
+            return {"text": text, "callback_data": f"{CALLBACK_PREFIX}:{token}:{target}"}
+
+        row = []
+        if page > 0:
+            row.append(button("« Prev", page - 1))
+        row.append(button(f"{page + 1}/{page_count}", page))
+        if page < page_count - 1:
+            row.append(button("Next »", page + 1))
+        return {"inline_keyboard": [row]}
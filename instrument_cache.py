@@ -0,0 +1,137 @@
+import json
+import logging
+import os
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from models import Instrument
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentDiff(NamedTuple):
+    """What changed between two instrument refreshes"""
+    added: Dict[str, Instrument]
+    removed: List[str]
+    interval_changes: Dict[str, Tuple[int, int]]  # symbol -> (old hours, new hours)
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.removed or self.interval_changes)
+
+
+class InstrumentCache:
+    """
+    Cached Bybit instrument metadata, diffed on every refresh
+
+    A refresh is one /v5/market/instruments-info call compared against the
+    cached copy; only listings, delistings and funding interval changes are
+    returned, so callers touch just the symbols that changed. The cache is
+    saved to disk (temp file + atomic rename) so an interval change made while
+    the bot was down is still detected on the next start.
+
+    A refresh that would delist more than max_removed_fraction of the cached
+    symbols is refused: a truncated response looks like mass delistings.
+    """
+
+    def __init__(self, fetcher, cache_file: Optional[str] = None, max_removed_fraction: float = 0.2):
+        """
+        Args:
+            fetcher: BybitDataFetcher (provides get_instruments_async)
+            cache_file: JSON file the metadata is persisted to (None = memory only)
+            max_removed_fraction: Largest share of cached symbols one refresh may delist
+        """
+        self.fetcher = fetcher
+        self.cache_file = cache_file
+        self.max_removed_fraction = max_removed_fraction
+        self.instruments: Dict[str, Instrument] = {}
+        self.refreshed_at: Optional[float] = None
+        self._load()
+
+    def _load(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+            self.instruments = {
+                symbol: Instrument(symbol, int(interval), status)
+                for symbol, (interval, status) in data.items()
+            }
+            logger.info(f"Loaded {len(self.instruments)} cached instruments")
+        except Exception as e:
+            logger.warning(f"Could not load instrument cache: {e}")
+
+    def _save(self):
+        if not self.cache_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+            tmp_path = self.cache_file + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({s: [i.funding_interval_hours, i.status] for s, i in self.instruments.items()}, f)
+            os.replace(tmp_path, self.cache_file)
+        except Exception as e:
+            logger.error(f"Could not save instrument cache: {e}")
+
+    def interval(self, symbol: str, default: int = 8) -> int:
+        """Cached funding interval for a symbol in hours"""
+        instrument = self.instruments.get(symbol)
+        return instrument.funding_interval_hours if instrument else default
+
+    def is_due(self, max_age: float) -> bool:
+        """Whether the cache is older than max_age seconds (or never refreshed)"""
+        return self.refreshed_at is None or time.monotonic() - self.refreshed_at >= max_age
+
+    def diff(self, latest: Dict[str, Instrument]) -> InstrumentDiff:
+        """Compare a fresh instrument list against the cached one"""
+        added = {}
+        changes = {}
+        for symbol, instrument in latest.items():
+            cached = self.instruments.get(symbol)
+            if cached is None:
+                added[symbol] = instrument
+            elif cached.funding_interval_hours != instrument.funding_interval_hours:
+                changes[symbol] = (cached.funding_interval_hours, instrument.funding_interval_hours)
+        removed = [symbol for symbol in self.instruments if symbol not in latest]
+        return InstrumentDiff(added, removed, changes)
+
+    async def refresh(self) -> Optional[InstrumentDiff]:
+        """
+        Fetch instruments and apply the diff to the cache
+
+        The first refresh without a saved cache only records a baseline.
+
+        Returns:
+            The diff (empty when nothing changed), or None if the fetch failed
+            or was refused as implausible
+        """
+        latest = await self.fetcher.get_instruments_async()
+        if not latest:
+            logger.warning("Instrument refresh failed, keeping cached metadata")
+            return None
+
+        if not self.instruments:
+            diff = InstrumentDiff({}, [], {})
+            logger.info(f"Instrument cache initialized with {len(latest)} symbols")
+        else:
+            diff = self.diff(latest)
+            if len(diff.removed) > self.max_removed_fraction * len(self.instruments):
+                logger.warning(
+                    f"Instrument refresh would delist {len(diff.removed)} of {len(self.instruments)} symbols, "
+                    f"treating the response as incomplete and keeping cached metadata"
+                )
+                return None
+
+        self.refreshed_at = time.monotonic()
+        if diff.empty and self.instruments:
+            return diff
+
+        self.instruments = latest
+        self._save()
+        if not diff.empty:
+            logger.info(
+                f"Instruments: {len(diff.added)} listed, {len(diff.removed)} delisted, "
+                f"{len(diff.interval_changes)} interval changes"
+            )
+        return diff
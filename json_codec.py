@@ -0,0 +1,157 @@
+"""
+JSON decoding for Bybit and Telegram responses
+
+Generic decoding (loads) uses orjson, or the stdlib json module without it.
+Ticker responses (decode_tickers) use msgspec typed structs that decode only
+the ticker fields we use and skip the rest of each row, falling back to loads
+plus parse_ticker. All backends produce the same output.
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional, Union
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from models import Ticker
+
+logger = logging.getLogger(__name__)
+
+Body = Union[bytes, str]
+
+
+def _stdlib_loads(body: Body) -> Any:
+    return json.loads(body)
+
+
+if orjson is not None:
+    loads: Callable[[Body], Any] = orjson.loads
+    BACKEND = "orjson"
+else:
+    loads = _stdlib_loads
+    BACKEND = "json"
+
+
+def parse_ticker(ticker: Dict) -> Ticker:
+    """Parse a raw Bybit ticker (REST or WebSocket) into a Ticker"""
+    funding_rate = ticker.get("fundingRate", "0")
+    next_funding_time = ticker.get("nextFundingTime", "0")
+
+    return Ticker(
+        symbol=ticker.get("symbol", ""),
+        funding_rate=float(funding_rate) if funding_rate else 0.0,
+        next_funding_time=int(next_funding_time) if next_funding_time else 0,
+        last_price=float(ticker.get("lastPrice") or 0),
+        price_24h_pcnt=float(ticker.get("price24hPcnt") or 0),
+        volume_24h=float(ticker.get("volume24h") or 0),
+        open_interest=float(ticker.get("openInterest") or 0),
+        funding_interval_hours=int(ticker.get("fundingIntervalHour") or 8),
+    )
+
+
+def decode_tickers_generic(body: Body, loads_fn: Callable[[Body], Any] = loads) -> Dict:
+    """
+    Decode a /v5/market/tickers response with a generic JSON decoder
+
+    Returns:
+        The Bybit envelope with result.list replaced by Ticker records
+    """
+    data = loads_fn(body)
+    result = data.get("result") or {}
+    return {
+        "retCode": data.get("retCode"),
+        "retMsg": data.get("retMsg", ""),
+        "result": {"list": [parse_ticker(t) for t in result.get("list", [])]},
+    }
+
+
+def _float(value: Union[str, float], default: float = 0.0) -> float:
+    """Convert a Bybit numeric field ("" on dated futures and pre-listing rows) like parse_ticker does"""
+    return float(value) if value else default
+
+
+def _int(value: Union[str, int], default: int = 0) -> int:
+    return int(value) if value else default
+
+
+if msgspec is not None:
+    class _Ticker(msgspec.Struct):
+        """
+        Ticker fields we use; everything else in the payload is skipped
+
+        Numeric fields are kept as sent: Bybit sends numbers as strings and
+        leaves fundingRate / nextFundingTime empty on dated futures and
+        pre-listing rows, which a float/int field would reject. They are
+        converted when building the Ticker, with parse_ticker's defaults.
+        """
+        symbol: str = ""
+        lastPrice: Union[str, float] = ""
+        fundingRate: Union[str, float] = ""
+        nextFundingTime: Union[str, int] = ""
+        price24hPcnt: Union[str, float] = ""
+        volume24h: Union[str, float] = ""
+        openInterest: Union[str, float] = ""
+        fundingIntervalHour: Union[str, int] = ""
+
+    class _TickerList(msgspec.Struct):
+        list: List[_Ticker] = []
+
+    class _TickersResponse(msgspec.Struct):
+        retCode: int = -1
+        retMsg: str = ""
+        result: Optional[_TickerList] = None
+
+    _tickers_decoder = msgspec.json.Decoder(_TickersResponse)
+
+    def decode_tickers_msgspec(body: Body) -> Dict:
+        """Decode a /v5/market/tickers response straight into typed structs"""
+        response = _tickers_decoder.decode(body)
+        tickers = response.result.list if response.result else []
+        return {
+            "retCode": response.retCode,
+            "retMsg": response.retMsg,
+            "result": {"list": [
+                Ticker(
+                    t.symbol,
+                    _float(t.fundingRate),
+                    _int(t.nextFundingTime),
+                    _float(t.lastPrice),
+                    _float(t.price24hPcnt),
+                    _float(t.volume24h),
+                    _float(t.openInterest),
+                    _int(t.fundingIntervalHour, 8),
+                )
+                for t in tickers
+            ]},
+        }
+
+    TICKERS_BACKEND = "msgspec"
+else:
+    decode_tickers_msgspec = None
+    TICKERS_BACKEND = BACKEND
+
+
+def decode_tickers(body: Body) -> Dict:
+    """
+    Decode a /v5/market/tickers response with the fastest available backend
+
+    Falls back to the generic decoder if the typed one rejects the payload
+    (e.g. a field of an unexpected type).
+
+    Returns:
+        The Bybit envelope (retCode, retMsg) with result.list holding Ticker records
+    """
+    if decode_tickers_msgspec is not None:
+        try:
+            return decode_tickers_msgspec(body)
+        except msgspec.ValidationError as e:
+            logger.debug(f"Typed ticker decode failed ({e}), using generic decoder")
+    return decode_tickers_generic(body)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for Bybit's public linear WebSocket (tickers topic only)
+
+Lets the WebSocket ingestion mode run offline:
+
+    python mock_bybit_ws.py --port 8765
+    BYBIT_WS_URL=ws://127.0.0.1:8765/v5/public/linear ENABLE_WS_TICKER_STREAM=true python alert_monitor.py
+
+Sends a snapshot per subscribed topic, then random funding rate deltas.
+Use --drop-every N to close the connection every N deltas (exercises reconnect),
+--skip-snapshot-every N to omit snapshots (exercises gap detection) and
+--regress-every N to replay every Nth delta with an older sequence/timestamp
+(exercises out-of-order resync).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+def _initial_ticker(symbol: str, next_funding_time: int) -> dict:
+    return {
+        "symbol": symbol,
+        "lastPrice": f"{random.uniform(0.1, 50000):.4f}",
+        "fundingRate": f"{random.uniform(-0.001, 0.001):.6f}",
+        "nextFundingTime": str(next_funding_time),
+        "price24hPcnt": f"{random.uniform(-0.1, 0.1):.4f}",
+        "volume24h": f"{random.uniform(1e3, 1e7):.2f}",
+        "openInterest": f"{random.uniform(1e3, 1e6):.2f}",
+    }
+
+
+class MockTickerServer:
+    """Serve tickers.{symbol} snapshots and deltas over a WebSocket"""
+
+    def __init__(self, delta_interval: float = 0.1, extreme_probability: float = 0.02,
+                 drop_every: int = 0, skip_snapshot_every: int = 0, regress_every: int = 0):
+        self.delta_interval = delta_interval
+        self.extreme_probability = extreme_probability
+        self.drop_every = drop_every
+        self.skip_snapshot_every = skip_snapshot_every
+        self.regress_every = regress_every
+        self.next_funding_time = (int(time.time()) // 3600 + 1) * 3600 * 1000
+        self.tickers = {}
+        self.sequence = 0
+
+        # Counters
+        self.connections = 0
+        self.subscribe_counts = {}
+
+    def _message(self, symbol: str, msg_type: str, data: dict, stale: bool = False) -> str:
+        if stale:
+            # Looks like a delta delivered late: older than anything sent for the symbol
+            sequence, ts = 1, int(time.time() * 1000) - 60_000
+        else:
+            self.sequence += 1
+            sequence, ts = self.sequence, int(time.time() * 1000)
+        return json.dumps({
+            "topic": f"tickers.{symbol}",
+            "type": msg_type,
+            "data": data,
+            "cs": sequence,
+            "ts": ts,
+        })
+
+    async def handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        subscribed = []
+        subscriptions = 0
+        sent = 0
+
+        async def push_deltas():
+            nonlocal sent
+            while not ws.closed:
+                await asyncio.sleep(self.delta_interval)
+                if not subscribed:
+                    continue
+                symbol = random.choice(subscribed)
+                if random.random() < self.extreme_probability:
+                    rate = random.choice([-1, 1]) * random.uniform(0.01, 0.03)
+                else:
+                    rate = random.uniform(-0.001, 0.001)
+                self.tickers[symbol]["fundingRate"] = f"{rate:.6f}"
+                sent += 1
+                stale = bool(self.regress_every) and sent % self.regress_every == 0
+                await ws.send_str(
+                    self._message(symbol, "delta", {"symbol": symbol, "fundingRate": f"{rate:.6f}"}, stale)
+                )
+                if self.drop_every and sent % self.drop_every == 0:
+                    logger.info("Dropping connection")
+                    await ws.close()
+
+        pusher = asyncio.create_task(push_deltas())
+        try:
+            async for msg in ws:
+                if msg.type != web.WSMsgType.TEXT:
+                    continue
+                request_msg = json.loads(msg.data)
+                op = request_msg.get("op")
+                if op == "ping":
+                    await ws.send_json({"success": True, "ret_msg": "pong", "op": "ping"})
+                elif op in ("subscribe", "unsubscribe"):
+                    await ws.send_json({"success": True, "ret_msg": "", "op": op})
+                    for topic in request_msg.get("args", []):
+                        symbol = topic.split(".", 1)[1]
+                        if op == "unsubscribe":
+                            if symbol in subscribed:
+                                subscribed.remove(symbol)
+                            continue
+                        subscribed.append(symbol)
+                        subscriptions += 1
+                        self.subscribe_counts[symbol] = self.subscribe_counts.get(symbol, 0) + 1
+                        if symbol not in self.tickers:
+                            self.tickers[symbol] = _initial_ticker(symbol, self.next_funding_time)
+                        if self.skip_snapshot_every and subscriptions % self.skip_snapshot_every == 0:
+                            continue
+                        await ws.send_str(self._message(symbol, "snapshot", self.tickers[symbol]))
+        finally:
+            pusher.cancel()
+        return ws
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Bybit public ticker WebSocket")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delta-interval", type=float, default=0.1)
+    parser.add_argument("--drop-every", type=int, default=0)
+    parser.add_argument("--skip-snapshot-every", type=int, default=0)
+    parser.add_argument("--regress-every", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    server = MockTickerServer(
+        delta_interval=args.delta_interval,
+        drop_every=args.drop_every,
+        skip_snapshot_every=args.skip_snapshot_every,
+        regress_every=args.regress_every
+    )
+    app = web.Application()
+    app.router.add_get("/v5/public/linear", server.handle)
+    web.run_app(app, host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
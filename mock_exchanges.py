@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Bybit, Binance and OKX REST endpoints the adapters use
+
+Serves recorded responses from fixtures/<venue>/ so the multi-venue fetch
+runs offline:
+
+    python mock_exchanges.py --port 8766
+    BYBIT_BASE_URL=http://127.0.0.1:8766 BINANCE_BASE_URL=http://127.0.0.1:8766 \\
+        OKX_BASE_URL=http://127.0.0.1:8766 ENABLED_VENUES=bybit,binance,okx python start_bot.py
+
+Refresh the fixtures from the live APIs with --record. Funding history
+fixtures are recorded for one symbol and replayed for any requested symbol.
+Use --rate-limit-every N to answer every Nth request with HTTP 429
+(exercises the per-venue limiters) and --delay to add latency.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from typing import Dict, Optional
+
+import aiohttp
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+LIVE_BASE_URLS = {
+    "bybit": "https://api.bybit.com",
+    "binance": "https://fapi.binance.com",
+    "okx": "https://www.okx.com",
+}
+
+# Symbol whose funding history is recorded
+RECORD_SYMBOL = "BTCUSDT"
+
+# path -> (venue, fixture file, query params used when recording)
+ROUTES = {
+    "/v5/market/tickers": ("bybit", "tickers.json", {"category": "linear"}),
+    "/v5/market/instruments-info": ("bybit", "instruments_info.json", {"category": "linear", "limit": "1000"}),
+    "/v5/market/funding/history": (
+        "bybit", "funding_history.json", {"category": "linear", "symbol": RECORD_SYMBOL, "limit": "50"}
+    ),
+    "/fapi/v1/premiumIndex": ("binance", "premium_index.json", {}),
+    "/fapi/v1/ticker/24hr": ("binance", "ticker_24hr.json", {}),
+    "/fapi/v1/fundingInfo": ("binance", "funding_info.json", {}),
+    "/fapi/v1/fundingRate": ("binance", "funding_rate.json", {"symbol": RECORD_SYMBOL, "limit": "50"}),
+    "/api/v5/public/funding-rate": ("okx", "funding_rate.json", {"instId": "ANY"}),
+    "/api/v5/market/tickers": ("okx", "tickers.json", {"instType": "SWAP"}),
+    "/api/v5/public/funding-rate-history": (
+        "okx", "funding_rate_history.json", {"instId": "BTC-USDT-SWAP", "limit": "50"}
+    ),
+}
+
+
+def _fixture_path(venue: str, name: str) -> str:
+    return os.path.join(FIXTURE_DIR, venue, name)
+
+
+def _replay_history(path: str, body, query) -> Optional[object]:
+    """Rewrite a recorded history response for the requested symbol and limit"""
+    limit = int(query.get("limit", 0) or 0)
+
+    if path == "/v5/market/funding/history":
+        records = body["result"]["list"][:limit or None]
+        symbol = query.get("symbol", RECORD_SYMBOL)
+        return {**body, "result": {**body["result"], "list": [{**r, "symbol": symbol} for r in records]}}
+    if path == "/fapi/v1/fundingRate":
+        records = body[-limit:] if limit else body
+        symbol = query.get("symbol", RECORD_SYMBOL)
+        return [{**r, "symbol": symbol} for r in records]
+    if path == "/api/v5/public/funding-rate-history":
+        records = body["data"][:limit or None]
+        inst_id = query.get("instId", "BTC-USDT-SWAP")
+        return {**body, "data": [{**r, "instId": inst_id} for r in records]}
+    return None
+
+
+class FixtureServer:
+    """Serve recorded venue responses"""
+
+    def __init__(self, rate_limit_every: int = 0, delay: float = 0.0):
+        self.rate_limit_every = rate_limit_every
+        self.delay = delay
+        self.fixtures: Dict[str, object] = {}
+        self.requests = 0
+
+        for path, (venue, name, _) in ROUTES.items():
+            fixture = _fixture_path(venue, name)
+            if os.path.exists(fixture):
+                with open(fixture, "r") as f:
+                    self.fixtures[path] = json.load(f)
+            else:
+                logger.warning(f"No fixture for {path} ({fixture})")
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.rate_limit_every and self.requests % self.rate_limit_every == 0:
+            return web.json_response({"msg": "Too many requests"}, status=429, headers={"Retry-After": "1"})
+
+        body = self.fixtures.get(request.path)
+        if body is None:
+            return web.json_response({"msg": "No fixture"}, status=404)
+
+        replayed = _replay_history(request.path, body, request.query)
+        return web.json_response(replayed if replayed is not None else body)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        for path in ROUTES:
+            app.router.add_get(path, self.handle)
+        return app
+
+
+async def record():
+    """Fetch every route from the live venues and save it as a fixture"""
+    async with aiohttp.ClientSession() as session:
+        for path, (venue, name, params) in ROUTES.items():
+            url = f"{LIVE_BASE_URLS[venue]}{path}"
+            async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=20)) as response:
+                response.raise_for_status()
+                body = await response.json()
+
+            fixture = _fixture_path(venue, name)
+            os.makedirs(os.path.dirname(fixture), exist_ok=True)
+            with open(fixture, "w") as f:
+                json.dump(body, f, indent=1)
+            logger.info(f"Recorded {venue} {path} -> {fixture}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded Bybit/Binance/OKX REST fixtures")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--record", action="store_true", help="Refresh fixtures from the live APIs and exit")
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.record:
+        asyncio.run(record())
+        return
+
+    server = FixtureServer(rate_limit_every=args.rate_limit_every, delay=args.delay)
+    web.run_app(server.app(), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
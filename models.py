@@ -0,0 +1,66 @@
+from dataclasses import dataclass
+from typing import NamedTuple, Optional
+
+HOURS_PER_YEAR = 24 * 365
+
+
+@dataclass(slots=True)
+class Ticker:
+    """Live ticker for one perpetual (parsed once per snapshot or stream update)"""
+    symbol: str
+    funding_rate: float = 0.0
+    next_funding_time: int = 0
+    last_price: float = 0.0
+    price_24h_pcnt: float = 0.0
+    volume_24h: float = 0.0
+    open_interest: float = 0.0
+    funding_interval_hours: int = 8
+    
+    @property
+    def rate_8h(self) -> float:
+        """Funding rate scaled to an 8h interval (0.5% every 1h -> 4%)"""
+        return self.funding_rate * 8 / (self.funding_interval_hours or 8)
+    
+    @property
+    def apr(self) -> float:
+        """Annualized funding rate (0.01% every 8h -> 10.95%)"""
+        return self.funding_rate * HOURS_PER_YEAR / (self.funding_interval_hours or 8)
+
+
+class Settlement(NamedTuple):
+    """One settled funding rate"""
+    symbol: str
+    funding_rate: float
+    timestamp: int  # settlement time in milliseconds
+
+
+class Instrument(NamedTuple):
+    """Contract metadata for one perpetual (from /v5/market/instruments-info)"""
+    symbol: str
+    funding_interval_hours: int
+    status: str = "Trading"
+
+
+@dataclass(slots=True)
+class Alert:
+    """A funding alert ready to be formatted for Telegram"""
+    symbol: str
+    alert_type: str  # "sign_change", "extreme", "predicted", "spread", "interval_change" or "anomaly"
+    funding_rate: float
+    prev_funding_rate: Optional[float] = None
+    rate_change: Optional[float] = None
+    last_price: float = 0.0
+    settlement_time: str = ""
+    funding_interval: str = "8h"
+    prev_funding_interval: Optional[str] = None
+    volume_24h: float = 0.0
+    apr: Optional[float] = None  # funding_rate annualized over funding_interval
+    # Cross-venue spread alerts: funding_rate/funding_interval are the short leg
+    spread_apr: Optional[float] = None
+    short_venue: str = ""
+    long_venue: str = ""
+    long_funding_rate: Optional[float] = None
+    long_funding_interval: str = ""
+    # Anomaly alerts: deviation from the symbol's own rolling history (per-8h rates)
+    zscore: Optional[float] = None
+    mean_rate: Optional[float] = None
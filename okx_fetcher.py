@@ -0,0 +1,142 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+from exchange_adapter import ExchangeAdapter
+from models import Settlement, Ticker
+from rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class OKXFetcher(ExchangeAdapter):
+    """Fetch funding rate data from OKX USDT-margined perpetual swaps"""
+
+    VENUE = "okx"
+
+    # OKX error codes for "too many requests"
+    RATE_LIMIT_CODES = ("50011", "50061")
+
+    INST_SUFFIX = "-USDT-SWAP"
+
+    def __init__(self, base_url: str = "https://www.okx.com", max_concurrency: int = 10,
+                 rate_limiter: Optional[RateLimiter] = None, requests_per_second: float = 10):
+        super().__init__(base_url, max_concurrency, rate_limiter, requests_per_second)
+
+    def _is_rate_limited(self, status: int, data: Any) -> bool:
+        """Check whether a response is an OKX rate limit rejection"""
+        if status == 429:
+            return True
+        return bool(data) and data.get("code") in self.RATE_LIMIT_CODES
+
+    @classmethod
+    def to_symbol(cls, inst_id: str) -> Optional[str]:
+        """Normalize an OKX instrument ID ("BTC-USDT-SWAP" -> "BTCUSDT"), None if not a USDT swap"""
+        if not inst_id.endswith(cls.INST_SUFFIX):
+            return None
+        return inst_id[:-len(cls.INST_SUFFIX)] + "USDT"
+
+    @classmethod
+    def to_inst_id(cls, symbol: str) -> str:
+        """OKX instrument ID for a normalized symbol ("BTCUSDT" -> "BTC-USDT-SWAP")"""
+        return symbol[:-len("USDT")] + cls.INST_SUFFIX
+
+    async def get_tickers_async(self, symbols: List[str] = None) -> Dict[str, Ticker]:
+        """
+        Get live funding tickers for all USDT perpetual swaps
+
+        Combines funding-rate (instId=ANY returns every swap) with the swap
+        market tickers for price and volume.
+
+        Args:
+            symbols: Optional list of normalized symbols to filter
+
+        Returns:
+            Dict mapping normalized symbol to Ticker
+        """
+        try:
+            funding, market = await asyncio.gather(
+                self._get_async("/api/v5/public/funding-rate", {"instId": "ANY"}),
+                self._get_async("/api/v5/market/tickers", {"instType": "SWAP"}),
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error fetching OKX tickers: {e}")
+            return {}
+        except Exception as e:
+            logger.error(f"Unexpected error fetching OKX tickers: {e}")
+            return {}
+
+        for response in (funding, market):
+            if response.get("code") != "0":
+                logger.error(f"OKX API error: {response.get('msg')}")
+                return {}
+
+        wanted = set(symbols) if symbols else None
+        market_by_inst = {item["instId"]: item for item in market.get("data", [])}
+        result = {}
+
+        for item in funding.get("data", []):
+            inst_id = item.get("instId", "")
+            symbol = self.to_symbol(inst_id)
+            if symbol is None or (wanted and symbol not in wanted):
+                continue
+
+            # fundingTime is the upcoming settlement, nextFundingTime the one after it
+            funding_time = int(item.get("fundingTime") or 0)
+            following_time = int(item.get("nextFundingTime") or 0)
+            interval_hours = (following_time - funding_time) // 3_600_000 if following_time > funding_time else 8
+
+            day = market_by_inst.get(inst_id, {})
+            last_price = float(day.get("last") or 0)
+            open_24h = float(day.get("open24h") or 0)
+
+            result[symbol] = Ticker(
+                symbol=symbol,
+                funding_rate=float(item.get("fundingRate") or 0),
+                next_funding_time=funding_time,
+                last_price=last_price,
+                price_24h_pcnt=last_price / open_24h - 1 if open_24h else 0.0,
+                volume_24h=float(day.get("volCcy24h") or 0),
+                funding_interval_hours=interval_hours,
+            )
+
+        logger.debug(f"Fetched {len(result)} tickers from OKX")
+        return result
+
+    async def get_funding_rate_history_async(self, symbol: str, limit: int = 10) -> List[Settlement]:
+        """
+        Get the most recent settlements for a symbol
+
+        Args:
+            symbol: Normalized symbol (e.g., "BTCUSDT")
+            limit: Number of records to fetch (1-400)
+
+        Returns:
+            Settlements, newest first
+        """
+        try:
+            data = await self._get_async(
+                "/api/v5/public/funding-rate-history",
+                {"instId": self.to_inst_id(symbol), "limit": min(limit, 400)}
+            )
+            if data.get("code") != "0":
+                logger.error(f"OKX API error for {symbol}: {data.get('msg')}")
+                return []
+
+            # realizedRate is what actually settled (fundingRate can differ under the cap)
+            return [
+                Settlement(
+                    symbol,
+                    float(item.get("realizedRate") or item.get("fundingRate") or 0),
+                    int(item.get("fundingTime") or 0)
+                )
+                for item in data.get("data", [])
+            ]
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error fetching OKX funding history for {symbol}: {e}")
+            return []
+        except Exception as e:
+            logger.error(f"Unexpected error fetching OKX funding history: {e}")
+            return []
@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out reservations instead of blocking"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initialize the bucket
+
+        Args:
+            rate: Tokens added per second
+            capacity: Max burst size (defaults to one second worth of tokens)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Take tokens, going into debt if needed
+
+        Returns:
+            Seconds the caller must wait before using the reservation
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def set_rate(self, rate: float):
+        """Change the refill rate, keeping the current balance"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(rate, 0.01)
+
+
+class RateLimiter:
+    """
+    Shared request pacing for an exchange API
+
+    Paces requests with a token bucket and adapts the rate in real time from the
+    X-Bapi-Limit-Status / X-Bapi-Limit-Reset-Timestamp response headers. When
+    the venue answers with a rate limit (HTTP 403/429 or Bybit retCode 10006), all
+    callers pause until the reset time, Retry-After, or an exponential backoff.
+    Venues with weighted limits (Binance) reserve several tokens per request.
+    Safe to share between threads and the event loop; use get_shared_limiter()
+    so every fetcher in the process draws from the same per-IP budget.
+    """
+
+    # retCodes Bybit uses for "too many visits"
+    RATE_LIMIT_RET_CODES = (10006, 10018)
+
+    def __init__(self, requests_per_second: float = 100, burst: Optional[float] = None, name: str = "bybit"):
+        """
+        Initialize the limiter
+
+        Args:
+            requests_per_second: Base pacing (Bybit allows ~600 requests per 5s per IP)
+            burst: Max burst size (defaults to requests_per_second)
+            name: Venue name used in logs
+        """
+        self.name = name
+        self.base_rate = requests_per_second
+        self.bucket = TokenBucket(requests_per_second, burst)
+        self._lock = threading.Lock()
+
+        # Wall-clock time (seconds) before which no request may be sent
+        self._blocked_until = 0.0
+        self._backoff = 1.0
+
+        # Counters
+        self.requests = 0
+        self.throttled = 0
+        self.waited_count = 0
+        self.waited_seconds = 0.0
+
+    def _reserve(self, weight: float = 1) -> float:
+        """Reserve a request slot and return how long to wait for it"""
+        wait = self.bucket.reserve(weight)
+        with self._lock:
+            self.requests += 1
+            blocked_for = self._blocked_until - time.time()
+            wait = max(wait, blocked_for)
+            if wait > 0:
+                self.waited_count += 1
+                self.waited_seconds += wait
+        return max(wait, 0.0)
+
+    def acquire(self, weight: float = 1):
+        """Block the calling thread until a request of this weight may be sent"""
+        wait = self._reserve(weight)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, weight: float = 1):
+        """Wait (without blocking the event loop) until a request of this weight may be sent"""
+        wait = self._reserve(weight)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """
+        Adapt pacing from Bybit's rate limit headers
+
+        Spreads the remaining quota evenly over the time left in the window, and
+        restores the base rate once the window has plenty of headroom.
+        """
+        status = headers.get("X-Bapi-Limit-Status")
+        limit = headers.get("X-Bapi-Limit")
+        reset = headers.get("X-Bapi-Limit-Reset-Timestamp")
+        if status is None or reset is None:
+            return
+
+        try:
+            remaining = int(status)
+            reset_in = int(reset) / 1000 - time.time()
+            total = int(limit) if limit else None
+        except ValueError:
+            return
+
+        if reset_in <= 0:
+            return
+
+        if remaining <= 0:
+            with self._lock:
+                self._blocked_until = max(self._blocked_until, time.time() + reset_in)
+            return
+
+        if total and remaining > total / 2:
+            self.bucket.set_rate(self.base_rate)
+        else:
+            self.bucket.set_rate(min(self.base_rate, remaining / reset_in))
+
+    def on_rate_limited(self, headers: Optional[Mapping[str, str]] = None):
+        """Pause all callers after a rate limit response"""
+        reset = headers.get("X-Bapi-Limit-Reset-Timestamp") if headers else None
+        retry_after = headers.get("Retry-After") if headers else None
+
+        # A malformed or already-passed reset falls through to Retry-After / backoff
+        reset_at = None
+        if reset:
+            try:
+                reset_at = int(reset) / 1000
+            except ValueError:
+                logger.debug(f"{self.name}: ignoring malformed reset timestamp {reset!r}")
+
+        with self._lock:
+            self.throttled += 1
+            now = time.time()
+            if reset_at is not None and reset_at > now:
+                until = reset_at
+            elif retry_after and retry_after.isdigit():
+                until = now + int(retry_after)
+            else:
+                until = now + self._backoff
+                self._backoff = min(self._backoff * 2, 60)
+            self._blocked_until = max(self._blocked_until, until)
+            pause = self._blocked_until - now
+        logger.warning(f"{self.name} rate limit hit, pausing requests for {pause:.1f}s")
+
+    def on_success(self):
+        """Reset the backoff after a successful request"""
+        self._backoff = 1.0
+
+    def get_stats(self) -> Dict:
+        """Get limiter counters"""
+        return {
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "waited": self.waited_count,
+            "waited_seconds": round(self.waited_seconds, 3),
+            "current_rate": round(self.bucket.rate, 2),
+        }
+
+
+# One limiter per venue, shared by every fetcher in the process (limits are per IP)
+_shared_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_shared_limiter(name: str = "bybit", requests_per_second: float = 100,
+                       burst: Optional[float] = None) -> RateLimiter:
+    """Get (or create) the process-wide limiter for a venue"""
+    limiter = _shared_limiters.get(name)
+    if limiter is None:
+        limiter = RateLimiter(requests_per_second, burst, name=name)
+        _shared_limiters[name] = limiter
+    return limiter
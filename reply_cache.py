@@ -0,0 +1,77 @@
+import logging
+from typing import Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ReplyCache:
+    """
+    Rendered command replies for the current ticker snapshot version
+
+    A reply built from snapshot data (the /funding top-10, a symbol's live
+    rate) is the same for everyone until the snapshot is refreshed, so it is
+    rendered once per snapshot version and then served from memory. Storing
+    a reply for a newer version drops everything rendered from older ones.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        """
+        Args:
+            max_entries: Max replies kept for one version (oldest dropped first)
+        """
+        self.max_entries = max_entries
+
+        self.version: Optional[int] = None
+        self._replies: Dict[Hashable, str] = {}
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, version: int, key: Hashable) -> Optional[str]:
+        """
+        Get a reply rendered from this snapshot version
+
+        Args:
+            version: TickerSnapshotService.version the caller is serving
+            key: Reply key (e.g. "top" or ("symbol", "BTCUSDT"))
+
+        Returns:
+            The rendered reply, or None if it must be rendered
+        """
+        if version == self.version:
+            reply = self._replies.get(key)
+            if reply is not None:
+                self.hits += 1
+                return reply
+        self.misses += 1
+        return None
+
+    def put(self, version: int, key: Hashable, reply: str):
+        """Store a reply rendered from this snapshot version"""
+        if version != self.version:
+            if version < (self.version or 0):
+                # Rendered from a snapshot that has since been replaced
+                return
+            if self._replies:
+                self.invalidations += 1
+                logger.debug(f"Reply cache: snapshot v{version}, dropping {len(self._replies)} replies")
+            self._replies.clear()
+            self.version = version
+
+        self._replies[key] = reply
+        if len(self._replies) > self.max_entries:
+            del self._replies[next(iter(self._replies))]
+
+    def get_stats(self) -> Dict:
+        """Get entry count, hit rate and counters"""
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "entries": len(self._replies),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,82 @@
+import math
+from typing import List, Optional
+
+
+class RollingStats:
+    """
+    O(1)-update mean, variance and EWMA of one series in four floats
+
+    Mean and variance use Welford's update in variance form with weight
+    1/count. The count is capped at the window, so the first `window`
+    observations are weighted equally (exact running mean/variance) and after
+    that each new value gets weight 1/window while older ones decay
+    geometrically: a rolling window of roughly `window` observations with no
+    buffer to keep.
+
+    Z-scores are taken from the EWMA (the series' recent level) and scaled by
+    the window's std, so a symbol that has moved to a new level and stayed
+    there stops scoring as anomalous after a few observations.
+    """
+
+    __slots__ = ("count", "mean", "var", "ewma")
+
+    def __init__(self, count: int = 0, mean: float = 0.0, var: float = 0.0, ewma: Optional[float] = None):
+        self.count = count
+        self.mean = mean
+        self.var = var
+        self.ewma = ewma
+
+    def update(self, x: float, window: int, alpha: float):
+        """
+        Add one observation
+
+        Args:
+            x: New value
+            window: Max effective sample count
+            alpha: EWMA smoothing factor (weight of the new value)
+        """
+        self.count = min(self.count + 1, window)
+        weight = 1 / self.count
+        delta = x - self.mean
+        self.mean += weight * delta
+        self.var = (1 - weight) * (self.var + weight * delta * delta)
+        self.ewma = ewma_update(self.ewma, x, alpha)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.var)
+
+    @property
+    def baseline(self) -> float:
+        """Level z-scores are measured from: the EWMA, or the mean before any EWMA exists"""
+        return self.mean if self.ewma is None else self.ewma
+
+    def zscore(self, x: float, min_std: float = 0.0) -> float:
+        """Standard deviations of x from the baseline (std floored at min_std)"""
+        std = max(self.std, min_std)
+        return (x - self.baseline) / std if std > 0 else 0.0
+
+    def to_list(self) -> List:
+        return [self.count, self.mean, self.var, self.ewma]
+
+    @classmethod
+    def from_list(cls, values: List) -> "RollingStats":
+        count, mean, var, ewma = values
+        return cls(int(count), float(mean), float(var), ewma)
+
+
+def ewma_update(previous: Optional[float], x: float, alpha: float) -> float:
+    """One EWMA step (seeds with x when there is no previous value)"""
+    return x if previous is None else previous + alpha * (x - previous)
+
+
+def decay_alpha(elapsed: float, half_life: float) -> float:
+    """
+    EWMA weight for a value observed elapsed seconds after the previous one
+
+    Older values lose half their weight every half_life seconds however many
+    updates arrive in between, so the average decays with time, not message rate.
+    """
+    if half_life <= 0 or elapsed <= 0:
+        return 1.0 if half_life <= 0 else 0.0
+    return 1.0 - 0.5 ** (elapsed / half_life)
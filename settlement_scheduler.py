@@ -0,0 +1,145 @@
+import heapq
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from models import Ticker
+
+logger = logging.getLogger(__name__)
+
+
+class SettlementScheduler:
+    """Schedule wakeups at funding settlement boundaries using a min-heap"""
+
+    def __init__(self, wake_delay: float = 5, retry_delay: float = 10):
+        """
+        Initialize the scheduler
+
+        Args:
+            wake_delay: Seconds after a settlement boundary to wake (history lags slightly)
+            retry_delay: Seconds to wait before re-checking a boundary that has not rolled over yet
+        """
+        self.wake_delay_ms = int(wake_delay * 1000)
+        self.retry_delay_ms = int(retry_delay * 1000)
+
+        # Heap of (wake_time_ms, symbol); stale entries are skipped lazily
+        self._heap: List[Tuple[int, str]] = []
+
+        # Current wake time per scheduled symbol (used to detect stale heap entries)
+        self._scheduled: Dict[str, int] = {}
+
+        # Last seen nextFundingTime and interval per symbol
+        self._next_funding_times: Dict[str, int] = {}
+        self._intervals: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._scheduled)
+
+    def update(self, tickers: Dict[str, Ticker], now_ms: Optional[int] = None):
+        """
+        Schedule (or reschedule) symbols from their tickers
+
+        Args:
+            tickers: Dict mapping symbol to Ticker (next_funding_time, funding_interval_hours)
+            now_ms: Current time in milliseconds (defaults to wall clock)
+        """
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+
+        for symbol, ticker in tickers.items():
+            next_time = ticker.next_funding_time
+            if not next_time:
+                continue
+
+            interval = ticker.funding_interval_hours
+            prev_interval = self._intervals.get(symbol)
+            if prev_interval is not None and prev_interval != interval:
+                logger.info(f"{symbol}: Funding interval changed {prev_interval}h -> {interval}h")
+            self._intervals[symbol] = interval
+
+            prev_next_time = self._next_funding_times.get(symbol)
+            if next_time == prev_next_time and symbol in self._scheduled:
+                continue
+
+            if prev_next_time and next_time != prev_next_time and symbol in self._scheduled:
+                logger.debug(f"{symbol}: Settlement moved {prev_next_time} -> {next_time}")
+
+            wake_time = next_time + self.wake_delay_ms
+            if wake_time <= now_ms:
+                # Boundary has passed but the ticker has not rolled over yet
+                wake_time = now_ms + self.retry_delay_ms
+
+            self._next_funding_times[symbol] = next_time
+            self._scheduled[symbol] = wake_time
+            heapq.heappush(self._heap, (wake_time, symbol))
+
+    def retry(self, symbols, now_ms: Optional[int] = None):
+        """
+        Wake for symbols again after retry_delay
+
+        Used when a boundary has rolled over in the ticker but the settlement
+        is not in the funding history yet. An earlier wake already scheduled
+        for a symbol is kept.
+        """
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+        wake_time = now_ms + self.retry_delay_ms
+
+        for symbol in symbols:
+            scheduled = self._scheduled.get(symbol)
+            if scheduled is not None and scheduled <= wake_time:
+                continue
+            self._scheduled[symbol] = wake_time
+            heapq.heappush(self._heap, (wake_time, symbol))
+
+    def remove(self, symbols):
+        """Stop tracking symbols (e.g. delistings)"""
+        for symbol in symbols:
+            self._scheduled.pop(symbol, None)
+            self._next_funding_times.pop(symbol, None)
+            self._intervals.pop(symbol, None)
+
+    def _discard_stale(self):
+        """Drop heap entries that were superseded by a reschedule or removal"""
+        while self._heap:
+            wake_time, symbol = self._heap[0]
+            if self._scheduled.get(symbol) == wake_time:
+                return
+            heapq.heappop(self._heap)
+
+    def next_wake_time(self) -> Optional[int]:
+        """Get the next wake time in milliseconds, or None if nothing is scheduled"""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def seconds_until_next_wake(self, now_ms: Optional[int] = None) -> Optional[float]:
+        """Get seconds until the next settlement group is due"""
+        wake_time = self.next_wake_time()
+        if wake_time is None:
+            return None
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+        return max(0.0, (wake_time - now_ms) / 1000)
+
+    def pop_due(self, now_ms: Optional[int] = None) -> List[str]:
+        """
+        Pop all symbols whose settlement boundary has been reached
+
+        Popped symbols are rescheduled on the next update() with fresh ticker data.
+
+        Returns:
+            List of symbols due for a settlement check
+        """
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+        due = []
+
+        while True:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > now_ms:
+                break
+            _, symbol = heapq.heappop(self._heap)
+            del self._scheduled[symbol]
+            due.append(symbol)
+
+        return due
@@ -0,0 +1,119 @@
+import bisect
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from models import Ticker
+
+
+class VenueQuote(NamedTuple):
+    """One venue's live funding rate for an asset"""
+    venue: str
+    funding_rate: float
+    interval_hours: int
+    apr: float
+
+
+class Spread(NamedTuple):
+    """Widest annualized funding differential for one asset"""
+    symbol: str
+    apr: float
+    short: VenueQuote  # highest rate: shorts collect here
+    long: VenueQuote   # lowest rate: longs pay least (or collect) here
+
+
+class SpreadEngine:
+    """
+    Incrementally maintained cross-venue funding spreads
+
+    Holds the latest quote per (venue, symbol). An update recomputes only that
+    symbol's spread (max - min annualized rate over its venues, so funding
+    intervals are comparable) and repositions it in a list kept sorted widest
+    first, so the ranking is always current without a full re-sort. bisect
+    finds the position in O(log n); the insert/delete shifts the list tail, so
+    an update is O(n) overall, but the shift is a single memmove over a few
+    hundred pointers per symbol.
+    """
+
+    def __init__(self):
+        self._quotes: Dict[str, Dict[str, VenueQuote]] = {}
+        self._spreads: Dict[str, Spread] = {}
+        # (-apr, symbol), ascending = widest first
+        self._ranked: List[Tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._spreads)
+
+    def update(self, venue: str, ticker: Ticker) -> Optional[Spread]:
+        """
+        Apply one venue quote and recompute that symbol's spread
+
+        Returns:
+            The symbol's spread, or None while it is quoted on fewer than two venues
+        """
+        quotes = self._quotes.setdefault(ticker.symbol, {})
+        quotes[venue] = VenueQuote(
+            venue, ticker.funding_rate, ticker.funding_interval_hours or 8, ticker.apr
+        )
+        return self._recompute(ticker.symbol)
+
+    def remove(self, venue: str, symbol: str) -> Optional[Spread]:
+        """Drop a venue's quote (e.g. delisted or venue unavailable) and recompute"""
+        quotes = self._quotes.get(symbol)
+        if not quotes or quotes.pop(venue, None) is None:
+            return self._spreads.get(symbol)
+        if not quotes:
+            del self._quotes[symbol]
+        return self._recompute(symbol)
+
+    def sync(self, snapshot: Dict[Tuple[str, str], Ticker]) -> List[str]:
+        """
+        Bring the engine in line with a full (venue, symbol) snapshot
+
+        Only quotes whose rate or interval changed are applied, and quotes
+        missing from the snapshot are removed.
+
+        Returns:
+            Symbols whose spread was recomputed
+        """
+        changed = set()
+        for (venue, symbol), ticker in snapshot.items():
+            quote = self._quotes.get(symbol, {}).get(venue)
+            if (quote is None or quote.funding_rate != ticker.funding_rate
+                    or quote.interval_hours != (ticker.funding_interval_hours or 8)):
+                self.update(venue, ticker)
+                changed.add(symbol)
+
+        stale = [
+            (venue, symbol)
+            for symbol, quotes in self._quotes.items()
+            for venue in quotes
+            if (venue, symbol) not in snapshot
+        ]
+        for venue, symbol in stale:
+            self.remove(venue, symbol)
+            changed.add(symbol)
+        return list(changed)
+
+    def _recompute(self, symbol: str) -> Optional[Spread]:
+        old = self._spreads.pop(symbol, None)
+        if old is not None:
+            index = bisect.bisect_left(self._ranked, (-old.apr, symbol))
+            del self._ranked[index]
+
+        quotes = self._quotes.get(symbol)
+        if not quotes or len(quotes) < 2:
+            return None
+
+        short = max(quotes.values(), key=lambda q: q.apr)
+        long = min(quotes.values(), key=lambda q: q.apr)
+        spread = Spread(symbol, short.apr - long.apr, short, long)
+
+        self._spreads[symbol] = spread
+        bisect.insort(self._ranked, (-spread.apr, symbol))
+        return spread
+
+    def get(self, symbol: str) -> Optional[Spread]:
+        return self._spreads.get(symbol)
+
+    def widest(self, n: int = 10) -> List[Spread]:
+        """The n widest spreads, widest first"""
+        return [self._spreads[symbol] for _, symbol in self._ranked[:n]]
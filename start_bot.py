@@ -26,17 +26,46 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-async def run_command_handler():
+def create_shared_snapshot():
+    """Create the ticker snapshot shared by the command handler and alert monitor"""
+    from config import config
+    from bybit_fetcher import BybitDataFetcher
+    from funding_store import FundingHistoryStore
+    from rate_limiter import get_shared_limiter
+    from ticker_snapshot import TickerSnapshotService
+    
+    fetcher = BybitDataFetcher(
+        config.BYBIT_BASE_URL,
+        config.SETTLEMENT_FETCH_CONCURRENCY,
+        rate_limiter=get_shared_limiter("bybit", config.BYBIT_MAX_REQUESTS_PER_SECOND),
+        history_store=FundingHistoryStore(config.FUNDING_HISTORY_DB)
+    )
+    return TickerSnapshotService(fetcher, config.TICKER_SNAPSHOT_TTL)
+
+
+def create_shared_telegram():
+    """Create the Telegram client (one keep-alive pool) shared by both components"""
+    from telegram_client import TelegramClient
+    
+    topic_id = os.getenv("TELEGRAM_TOPIC_ID")
+    return TelegramClient(
+        os.getenv("TELEGRAM_BOT_TOKEN"),
+        os.getenv("TELEGRAM_CHAT_ID"),
+        topic_id=int(topic_id) if topic_id else None
+    )
+
+
+async def run_command_handler(snapshot, telegram):
     """Run the command handler"""
     from command_handler import CommandHandler
-    handler = CommandHandler()
+    handler = CommandHandler(snapshot=snapshot, telegram=telegram)
     await handler.start()
 
 
-async def run_alert_monitor():
+async def run_alert_monitor(snapshot, telegram):
     """Run the alert monitor"""
     from alert_monitor import AlertMonitor
-    monitor = AlertMonitor()
+    monitor = AlertMonitor(snapshot=snapshot, telegram=telegram)
     await monitor.run()
 
 
@@ -50,10 +79,16 @@ async def main():
     
     logger.info("Starting both Command Handler and Alert Monitor...")
     
+    # One ticker snapshot serves both, so /funding and alert checks share upstream calls
+    snapshot = create_shared_snapshot()
+    
+    # One non-blocking Telegram client, so alert fan-out never stalls command replies
+    telegram = create_shared_telegram()
+    
     # Run both concurrently
     await asyncio.gather(
-        run_command_handler(),
-        run_alert_monitor()
+        run_command_handler(snapshot, telegram),
+        run_alert_monitor(snapshot, telegram)
     )
 
 
@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StateJournal:
+    """
+    Append-only journal of per-symbol state changes with snapshot compaction
+
+    State is a dict of sections (e.g. "timestamps", "rates"), each mapping a
+    symbol to a JSON value. Changes are appended to "<snapshot>.journal" as one
+    JSON line per (section, symbol, value), so a save costs as much as the number
+    of changed symbols. Once the journal grows past compact_every entries the full
+    state is written to a temp file and atomically renamed over the snapshot,
+    and the journal is truncated. The snapshot keeps the original JSON layout.
+    """
+
+    def __init__(self, snapshot_path: str, compact_every: int = 5000, fsync: bool = True):
+        """
+        Initialize the journal
+
+        Args:
+            snapshot_path: Path of the JSON snapshot file
+            compact_every: Compact after this many journal entries
+            fsync: Flush each append to disk before returning
+        """
+        self.snapshot_path = snapshot_path
+        self.journal_path = snapshot_path + ".journal"
+        self.compact_every = compact_every
+        self.fsync = fsync
+
+        self.entries = 0
+        self._file = None
+
+    def load(self) -> Dict[str, Dict]:
+        """
+        Load the snapshot and replay the journal on top of it
+
+        A torn last line (crash mid-append) is dropped and cut from the file so
+        later appends start on a clean line.
+
+        Returns:
+            Snapshot dict with journaled changes applied (empty if nothing stored)
+        """
+        state: Dict[str, Dict] = {}
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r') as f:
+                state = json.load(f)
+
+        replayed = 0
+        if os.path.exists(self.journal_path):
+            good_offset = 0
+            torn = False
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("missing newline")
+                        section, key, value = json.loads(line)
+                    except ValueError:
+                        torn = True
+                        break
+                    self._apply(state, section, key, value)
+                    good_offset += len(line)
+                    replayed += 1
+            if torn:
+                logger.warning(f"Dropping torn journal tail in {self.journal_path} at byte {good_offset}")
+                os.truncate(self.journal_path, good_offset)
+
+        self.entries = replayed
+        if replayed:
+            logger.info(f"Replayed {replayed} journal entries from {self.journal_path}")
+        return state
+
+    @staticmethod
+    def _apply(state: Dict[str, Dict], section: str, key: str, value):
+        values = state.setdefault(section, {})
+        if value is None:
+            values.pop(key, None)
+        else:
+            values[key] = value
+
+    def append(self, changes: Iterable[Tuple[str, str, object]]) -> int:
+        """
+        Append changes to the journal
+
+        Args:
+            changes: (section, symbol, value) tuples; a value of None deletes the symbol
+
+        Returns:
+            Number of entries written
+        """
+        lines = [json.dumps([section, key, value], separators=(",", ":")) + "\n" for section, key, value in changes]
+        if not lines:
+            return 0
+
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+            self._file = open(self.journal_path, 'a')
+
+        self._file.write("".join(lines))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+        self.entries += len(lines)
+        return len(lines)
+
+    def needs_compaction(self) -> bool:
+        """Check whether the journal has grown past the compaction threshold"""
+        return self.entries >= self.compact_every
+
+    def compact(self, state: Dict[str, Dict]):
+        """
+        Write the full state as a new snapshot and truncate the journal
+
+        The snapshot is written to a temp file and renamed into place, so a
+        crash leaves either the old snapshot plus journal or the new snapshot.
+        """
+        os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+        snapshot = dict(state)
+        snapshot["last_updated"] = datetime.now(timezone.utc).isoformat()
+
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        # Only truncate once the new snapshot is durable
+        self.close()
+        with open(self.journal_path, 'w'):
+            pass
+
+        logger.debug(f"Compacted {self.entries} journal entries into {self.snapshot_path}")
+        self.entries = 0
+
+    def close(self):
+        """Close the journal file handle"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
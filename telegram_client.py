@@ -1,7 +1,12 @@
+import asyncio
 import logging
-import requests
+import aiohttp
 import html
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+
+import json_codec
+from models import Alert, Ticker
+from ticker_columns import TickerColumns
 
 logger = logging.getLogger(__name__)
 
@@ -9,7 +14,23 @@ logger = logging.getLogger(__name__)
 class TelegramClient:
     """Send alerts to Telegram with topic support"""
     
-    def __init__(self, bot_token: str, chat_id, topic_id: Optional[int] = None):
+    # Telegram's limit on message text length
+    MAX_MESSAGE_LENGTH = 4096
+    
+    # Digest section headers, in delivery order
+    DIGEST_SECTIONS = {
+        "sign_change": "🔄 <b>BIAS FLIPPED</b>",
+        "extreme": "⚠️ <b>EXTREME RATE</b>",
+        "predicted": "⚡ <b>EXTREME FUNDING RATES</b>",
+        "spread": "↔️ <b>FUNDING SPREADS</b>",
+        "interval_change": "⏰ <b>INTERVAL CHANGED</b>",
+        "anomaly": "📊 <b>FUNDING ANOMALIES</b>",
+    }
+    
+    VENUE_NAMES = {"bybit": "Bybit", "binance": "Binance", "okx": "OKX"}
+    
+    def __init__(self, bot_token: str, chat_id, topic_id: Optional[int] = None,
+                 session: Optional[aiohttp.ClientSession] = None, max_connections: int = 20):
         """
         Initialize Telegram client
         
@@ -17,11 +38,16 @@ class TelegramClient:
             bot_token: Telegram bot token from BotFather
             chat_id: Target chat ID for alerts
             topic_id: Optional Telegram topic ID (for supergroups with topics enabled)
+            session: Optional aiohttp session to reuse (one is created lazily otherwise)
+            max_connections: Size of the keep-alive connection pool
         """
         self.bot_token = bot_token
         self.chat_id = int(chat_id) if isinstance(chat_id, str) else chat_id
         self.topic_id = topic_id
         self.api_url = f"https://api.telegram.org/bot{bot_token}"
+        self.max_connections = max_connections
+        self._session = session
+        self._owns_session = session is None
         
         if not bot_token or not chat_id:
             logger.error("Telegram credentials missing. Check .env file.")
@@ -30,7 +56,91 @@ class TelegramClient:
         if self.topic_id:
             logger.info(f"✅ Telegram topic configured: Topic ID {self.topic_id}")
     
-    async def send_message(self, text: str, topic_id: Optional[int] = None, chat_id: Optional[int] = None) -> bool:
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Get the pooled keep-alive session (shared with the command handler)"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+            )
+            self._owns_session = True
+        return self._session
+    
+    async def close(self):
+        """Close the HTTP session if this client created it"""
+        if self._owns_session and self._session and not self._session.closed:
+            await self._session.close()
+    
+    async def _call(self, method: str, payload: Dict, timeout: float = 10) -> Dict:
+        """
+        Call a Bot API method
+        
+        Returns:
+            Decoded JSON response (includes "ok" and "description" on errors)
+        """
+        session = await self.get_session()
+        async with session.post(
+            f"{self.api_url}/{method}",
+            json=payload,
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            body = await response.read()
+            try:
+                return json_codec.loads(body)
+            except ValueError:
+                return {"ok": False, "error_code": response.status, "description": body.decode(errors="replace")}
+    
+    async def get_updates(self, offset: int, timeout: int = 0, allowed_updates: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Poll for updates
+        
+        Args:
+            offset: Identifier of the first update to return
+            timeout: Long polling timeout in seconds
+            allowed_updates: Update types to receive (None keeps the previous setting)
+        
+        Returns:
+            List of updates (empty on error)
+        """
+        payload = {"offset": offset, "timeout": timeout}
+        if allowed_updates is not None:
+            payload["allowed_updates"] = allowed_updates
+        result = await self._call("getUpdates", payload, timeout=timeout + 10)
+        if not result.get("ok"):
+            logger.error(f"getUpdates failed: {result.get('description')}")
+            return []
+        return result.get("result", [])
+    
+    async def set_webhook(self, url: str, secret_token: str, allowed_updates: Optional[List[str]] = None) -> bool:
+        """
+        Register a webhook (Telegram then POSTs updates instead of serving getUpdates)
+        
+        Args:
+            url: Public HTTPS URL of the webhook server
+            secret_token: Sent back in the X-Telegram-Bot-Api-Secret-Token header
+            allowed_updates: Update types to receive (None keeps Telegram's default)
+        
+        Returns:
+            True if the webhook was set
+        """
+        payload = {"url": url, "secret_token": secret_token}
+        if allowed_updates is not None:
+            payload["allowed_updates"] = allowed_updates
+        result = await self._call("setWebhook", payload)
+        if not result.get("ok"):
+            logger.error(f"setWebhook failed: {result.get('description')}")
+            return False
+        return True
+    
+    async def delete_webhook(self) -> bool:
+        """Remove any webhook so getUpdates can be used (pending updates are kept)"""
+        result = await self._call("deleteWebhook", {"drop_pending_updates": False})
+        if not result.get("ok"):
+            logger.error(f"deleteWebhook failed: {result.get('description')}")
+            return False
+        return True
+    
+    async def send_message(self, text: str, topic_id: Optional[int] = None, chat_id: Optional[int] = None,
+                           reply_markup: Optional[Dict] = None) -> bool:
         """
         Send a message to Telegram chat/topic
         
@@ -38,10 +148,24 @@ class TelegramClient:
             text: Message text (supports HTML formatting)
             topic_id: Optional topic ID (overrides self.topic_id if provided)
             chat_id: Optional chat ID (overrides self.chat_id if provided, for DM replies)
+            reply_markup: Optional inline keyboard ({"inline_keyboard": [[button, ...], ...]})
         
         Returns:
             True if sent successfully, False otherwise
         """
+        sent, _ = await self.deliver_message(text, topic_id=topic_id, chat_id=chat_id, reply_markup=reply_markup)
+        return sent
+    
+    async def deliver_message(
+        self, text: str, topic_id: Optional[int] = None, chat_id: Optional[int] = None,
+        reply_markup: Optional[Dict] = None
+    ) -> Tuple[bool, Optional[float]]:
+        """
+        Send a message and report Telegram's flood control back-off
+        
+        Returns:
+            Tuple of (sent successfully, retry_after seconds if rate limited with 429)
+        """
         try:
             payload = {
                 "chat_id": chat_id or self.chat_id,
@@ -53,38 +177,69 @@ class TelegramClient:
             effective_topic_id = topic_id or self.topic_id
             if effective_topic_id:
                 payload["message_thread_id"] = effective_topic_id
+            if reply_markup:
+                payload["reply_markup"] = reply_markup
             
-            response = requests.post(
-                f"{self.api_url}/sendMessage",
-                json=payload,
-                timeout=10
-            )
+            result = await self._call("sendMessage", payload)
             
-            if response.status_code == 200:
-                result = response.json()
-                if result.get("ok"):
-                    logger.debug(f"Message sent successfully")
-                    return True
-                else:
-                    logger.error(f"Telegram API error: {result.get('description')}")
-                    return False
-            else:
-                logger.error(f"HTTP error {response.status_code}: {response.text}")
-                return False
+            if result.get("ok"):
+                logger.debug(f"Message sent successfully")
+                return True, None
+            
+            retry_after = result.get("parameters", {}).get("retry_after")
+            if result.get("error_code") == 429 and retry_after is not None:
+                logger.warning(f"Telegram flood control: retry after {retry_after}s")
+                return False, float(retry_after)
+            
+            logger.error(f"Telegram API error {result.get('error_code')}: {result.get('description')}")
+            return False, None
                 
-        except requests.exceptions.Timeout:
+        except asyncio.TimeoutError:
             logger.error("Telegram request timed out")
-            return False
+            return False, None
         except Exception as e:
             logger.error(f"Error sending Telegram message: {e}")
+            return False, None
+    
+    async def edit_message_text(self, chat_id: int, message_id: int, text: str,
+                                reply_markup: Optional[Dict] = None) -> bool:
+        """
+        Replace the text (and inline keyboard) of a message the bot sent
+        
+        Returns:
+            True if edited (or already identical), False otherwise
+        """
+        try:
+            payload = {"chat_id": chat_id, "message_id": message_id, "text": text, "parse_mode": "HTML"}
+            if reply_markup:
+                payload["reply_markup"] = reply_markup
+            result = await self._call("editMessageText", payload)
+            if result.get("ok") or "message is not modified" in result.get("description", ""):
+                return True
+            logger.error(f"editMessageText failed: {result.get('description')}")
+            return False
+        except Exception as e:
+            logger.error(f"Error editing Telegram message: {e}")
             return False
     
-    async def send_funding_alert(self, alert: dict) -> bool:
+    async def answer_callback_query(self, callback_query_id: str, text: Optional[str] = None) -> bool:
+        """Acknowledge an inline keyboard press (stops the button's loading spinner)"""
+        try:
+            payload = {"callback_query_id": callback_query_id}
+            if text:
+                payload["text"] = text
+            result = await self._call("answerCallbackQuery", payload)
+            return bool(result.get("ok"))
+        except Exception as e:
+            logger.error(f"Error answering callback query: {e}")
+            return False
+    
+    async def send_funding_alert(self, alert: Alert) -> bool:
         """
         Send a formatted funding rate alert
         
         Args:
-            alert: Alert dictionary with funding rate info
+            alert: Alert with funding rate info
         
         Returns:
             True if sent successfully
@@ -92,15 +247,15 @@ class TelegramClient:
         message = self._format_funding_alert(alert)
         return await self.send_message(message)
     
-    def _format_funding_alert(self, alert: dict) -> str:
+    def _format_funding_alert(self, alert: Alert) -> str:
         """Format funding rate alert as Telegram message"""
-        symbol = html.escape(alert.get("symbol", "UNKNOWN"))
-        rate = alert.get("fundingRate", 0)
-        prev_rate = alert.get("prevFundingRate")
-        alert_type = alert.get("alertType", "change")
-        funding_interval = alert.get("fundingInterval", "8h")
-        prev_interval = alert.get("prevFundingInterval", funding_interval)
-        settlement_time = alert.get("settlementTime", "")
+        symbol = html.escape(alert.symbol or "UNKNOWN")
+        rate = alert.funding_rate
+        prev_rate = alert.prev_funding_rate
+        alert_type = alert.alert_type
+        funding_interval = alert.funding_interval
+        prev_interval = alert.prev_funding_interval or funding_interval
+        settlement_time = alert.settlement_time
         
         # Format rates as percentages with + for positive
         rate_pct = rate * 100
@@ -114,6 +269,39 @@ class TelegramClient:
         else:
             color_emoji = "🔴"
         
+        # Cross-venue spread: short the high-rate venue, long the low-rate one
+        if alert_type == "spread":
+            long_rate = alert.long_funding_rate or 0
+            message = f"""↔️ <b>FUNDING SPREAD</b>
+
+<b>{symbol}</b>: <b>{alert.spread_apr * 100:.1f}% APR</b>
+
+• Short {self._venue_name(alert.short_venue)}: {format_rate(rate_pct)} / {funding_interval}
+• Long {self._venue_name(alert.long_venue)}: {format_rate(long_rate * 100)} / {alert.long_funding_interval}"""
+            
+            return message.strip()
+        
+        # Rate far outside the symbol's own history (settled when prev_rate is set)
+        if alert_type == "anomaly":
+            direction = "📈" if (alert.zscore or 0) > 0 else "📉"
+            if prev_rate is not None:
+                rate_line = f"• Rate: {format_rate(prev_rate * 100)} → <b>{format_rate(rate_pct)}</b>"
+                time_line = f"• Settled: {settlement_time}"
+            else:
+                rate_line = f"• Live Rate: <b>{format_rate(rate_pct)}</b>"
+                time_line = f"• Settles: {settlement_time}"
+            
+            message = f"""{direction} <b>FUNDING ANOMALY</b>
+
+{color_emoji} <b>{symbol}</b>
+
+{rate_line}
+• Deviation: <b>{alert.zscore:+.1f}σ</b> from its recent average ({format_rate((alert.mean_rate or 0) * 100)} / 8h)
+• Interval: {funding_interval}
+{time_line}"""
+            
+            return message.strip()
+        
         # Handle LIVE RATE alerts (previously called "predicted")
         if alert_type == "predicted":
             if rate >= 0:
@@ -122,11 +310,12 @@ class TelegramClient:
                 bias_text = "Negative (Shorts Pay Longs)"
             
             header = f"⚡ <b>EXTREME FUNDING RATE</b>\n\n{color_emoji} <b>{symbol}</b>"
+            apr_text = f" ({alert.apr * 100:+.1f}% APR)" if alert.apr is not None else ""
             
             message = f"""{header}
 
 • Bias: {bias_text}
-• Live Rate: <b>{format_rate(rate_pct)}</b>
+• Live Rate: <b>{format_rate(rate_pct)}</b>{apr_text}
 • Interval: {funding_interval}
 • Settles: {settlement_time}
 
@@ -183,15 +372,141 @@ class TelegramClient:
         else:
             rate_line = f"• Rate: <b>{format_rate(rate_pct)}</b>"
         
+        # Interval change alerts are sent between settlements
+        time_label = "Next Settlement" if alert_type == "interval_change" else "Settled"
+        
         message = f"""{header}
 
 • Bias: {bias_text}
 {rate_line}
 • Interval: {interval_text}
-• Settled: {settlement_time}"""
+• {time_label}: {settlement_time}"""
         
         return message.strip()
     
+    async def send_funding_digest(self, alerts: List[Alert]) -> bool:
+        """
+        Send alerts from one cycle as as few messages as possible
+        
+        Args:
+            alerts: Alerts from one check cycle
+        
+        Returns:
+            True if every message was sent
+        """
+        results = []
+        for text, _ in self.build_alert_digest(alerts):
+            results.append(await self.send_message(text))
+        return all(results)
+    
+    def build_alert_digest(self, alerts: List[Alert]) -> List[Tuple[str, List[Alert]]]:
+        """
+        Coalesce alerts into digest messages under the 4096-char limit
+        
+        Alerts are grouped into sections by alert type and funding interval.
+        A single alert keeps the regular _format_funding_alert layout.
+        
+        Args:
+            alerts: Alerts from one check cycle
+        
+        Returns:
+            List of (message text, alerts included in that message)
+        """
+        if not alerts:
+            return []
+        if len(alerts) == 1:
+            return [(self._format_funding_alert(alerts[0]), list(alerts))]
+        
+        # Group by (type, interval), sections ordered by type then interval length
+        # (spreads and interval changes span intervals, so each shares one section)
+        type_order = list(self.DIGEST_SECTIONS)
+        groups: Dict[Tuple[str, str], List[Alert]] = {}
+        for alert in alerts:
+            interval = "" if alert.alert_type in ("spread", "interval_change") else alert.funding_interval or "8h"
+            key = (alert.alert_type, interval)
+            groups.setdefault(key, []).append(alert)
+        
+        def section_order(key):
+            alert_type, interval = key
+            type_rank = type_order.index(alert_type) if alert_type in type_order else len(type_order)
+            hours = interval.rstrip("h")
+            return type_rank, int(hours) if hours.isdigit() else 0
+        
+        messages: List[Tuple[str, List[Alert]]] = []
+        current_text = ""
+        current_alerts: List[Alert] = []
+        
+        def flush():
+            nonlocal current_text, current_alerts
+            if current_alerts:
+                messages.append((current_text.strip(), current_alerts))
+            current_text, current_alerts = "", []
+        
+        for key in sorted(groups, key=section_order):
+            alert_type, interval = key
+            title = self.DIGEST_SECTIONS.get(alert_type, "📢 <b>FUNDING ALERTS</b>")
+            if interval:
+                title = f"{title} · {html.escape(interval)}"
+            header = f"{title}\n"
+            
+            section_started = False
+            ranked = sorted(groups[key], key=lambda a: abs(a.spread_apr or a.zscore or a.funding_rate), reverse=True)
+            for alert in ranked:
+                line = self._format_digest_line(alert) + "\n"
+                prefix = "" if section_started else ("\n" if current_text else "") + header
+                
+                if len(current_text) + len(prefix) + len(line) > self.MAX_MESSAGE_LENGTH:
+                    flush()
+                    prefix = header if not section_started else f"{title} (cont.)\n"
+                
+                current_text += prefix + line
+                current_alerts.append(alert)
+                section_started = True
+        
+        flush()
+        return messages
+    
+    def _venue_name(self, venue: str) -> str:
+        return html.escape(self.VENUE_NAMES.get(venue, venue))
+    
+    def _format_digest_line(self, alert: Alert) -> str:
+        """Format one alert as a compact digest line"""
+        symbol = html.escape(alert.symbol or "UNKNOWN")
+        rate = alert.funding_rate
+        prev_rate = alert.prev_funding_rate
+        
+        def format_rate(r):
+            return f"+{r:.4f}%" if r >= 0 else f"{r:.4f}%"
+        
+        color_emoji = "🟢" if rate >= 0 else "🔴"
+        
+        if alert.alert_type == "predicted":
+            return f"{color_emoji} <b>{symbol}</b>: <b>{format_rate(rate * 100)}</b> · settles {alert.settlement_time}"
+        
+        if alert.alert_type == "spread":
+            return (
+                f"↔️ <b>{symbol}</b>: <b>{alert.spread_apr * 100:.1f}% APR</b> · "
+                f"short {self._venue_name(alert.short_venue)} {format_rate(rate * 100)}/{alert.funding_interval}, "
+                f"long {self._venue_name(alert.long_venue)} {format_rate((alert.long_funding_rate or 0) * 100)}"
+                f"/{alert.long_funding_interval}"
+            )
+        
+        if alert.alert_type == "anomaly":
+            return (
+                f"{color_emoji} <b>{symbol}</b>: <b>{format_rate(rate * 100)}</b> · {alert.zscore:+.1f}σ "
+                f"vs {format_rate((alert.mean_rate or 0) * 100)}/8h"
+            )
+        
+        if alert.alert_type == "interval_change":
+            return (
+                f"{color_emoji} <b>{symbol}</b>: {alert.prev_funding_interval} → <b>{alert.funding_interval}</b> · "
+                f"{format_rate(rate * 100)}"
+            )
+        
+        if prev_rate is not None:
+            return f"{color_emoji} <b>{symbol}</b>: {format_rate(prev_rate * 100)} → <b>{format_rate(rate * 100)}</b>"
+        return f"{color_emoji} <b>{symbol}</b>: <b>{format_rate(rate * 100)}</b>"
+    
     async def send_startup_message(self, symbols: list, intervals: dict = None) -> bool:
         """Send bot startup notification"""
         
@@ -216,7 +531,7 @@ Monitoring <b>{len(symbols)}</b> symbols for funding rate changes.
 • ⚠️ Extreme rates at settlement (≥0.1%)
 • 🔄 Rate flips (+ ↔ -)
 
-<i>Bot checks every 30 minutes.</i>
+<i>Bot checks each symbol right after its funding settles.</i>
 """
         return await self.send_message(message.strip())
     
@@ -238,37 +553,39 @@ Alerts will be sent when:
 """
         return await self.send_message(message.strip())
     
-    async def send_summary(self, rates: dict) -> bool:
+    async def send_summary(self, rates: Dict[str, Ticker]) -> bool:
         """Send a summary of current funding rates"""
         if not rates:
             return await self.send_message("No funding rate data available.")
         
-        # Sort by absolute funding rate (most extreme first)
-        sorted_rates = sorted(
-            rates.items(),
-            key=lambda x: abs(x[1].get("fundingRate", 0)),
-            reverse=True
-        )
+        # Most extreme per-8h equivalent first (partial sort over the normalized column)
+        columns = TickerColumns.from_tickers(rates)
+        top_symbols = columns.top_abs_rate(10)
         
         lines = ["📊 <b>Current Funding Rates (Top 10)</b>\n"]
         
-        for symbol, data in sorted_rates[:10]:
+        for symbol in top_symbols:
             safe_symbol = html.escape(symbol)
-            rate = data.get("fundingRate", 0)
+            row = columns.index[symbol]
+            rate = rates[symbol].funding_rate
             rate_pct = rate * 100
+            rate_8h = columns.rate_8h[row]
             
-            if rate > 0.0005:
+            if rate_8h > 0.0005:
                 emoji = "🔴"  # High positive (longs pay)
-            elif rate > 0:
+            elif rate_8h > 0:
                 emoji = "🟠"  # Positive
-            elif rate < -0.0005:
+            elif rate_8h < -0.0005:
                 emoji = "🟢"  # High negative (shorts pay)
-            elif rate < 0:
+            elif rate_8h < 0:
                 emoji = "🔵"  # Negative
             else:
                 emoji = "⚪"
             
-            lines.append(f"{emoji} <b>{safe_symbol}</b>: {rate_pct:+.4f}%")
+            lines.append(
+                f"{emoji} <b>{safe_symbol}</b>: {rate_pct:+.4f}% / {int(columns.interval_hours[row])}h "
+                f"({columns.apr[row] * 100:+.1f}% APR)"
+            )
         
         lines.append("\n<i>🔴 Longs pay | 🟢 Shorts pay</i>")
         
@@ -0,0 +1,269 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import Dict, List, Optional
+
+from metrics import LatencyHistogram
+from models import Alert
+from rate_limiter import TokenBucket
+from telegram_client import TelegramClient
+
+logger = logging.getLogger(__name__)
+
+# Lower value = delivered first
+PRIORITY_FLIP = 0
+PRIORITY_SETTLEMENT = 1
+PRIORITY_PREDICTED = 2
+
+ALERT_PRIORITIES = {
+    "sign_change": PRIORITY_FLIP,
+    "extreme": PRIORITY_SETTLEMENT,
+    "predicted": PRIORITY_PREDICTED,
+    "spread": PRIORITY_PREDICTED,
+    "interval_change": PRIORITY_SETTLEMENT,
+    "anomaly": PRIORITY_SETTLEMENT,
+}
+
+
+class OutboxMessage:
+    """A queued Telegram message"""
+
+    __slots__ = ("text", "chat_id", "topic_id", "priority", "enqueued_at", "attempts", "label", "ready_at")
+
+    def __init__(self, text: str, chat_id, topic_id: Optional[int], priority: int, label: str = ""):
+        self.text = text
+        self.chat_id = chat_id
+        self.topic_id = topic_id
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.attempts = 0
+        self.label = label
+
+        # Monotonic time of the per-chat send slot reserved for this attempt (None = not reserved yet)
+        self.ready_at: Optional[float] = None
+
+
+class TelegramOutbox:
+    """
+    Priority outbox for outbound Telegram messages
+
+    Enforces Telegram's limits with token buckets (about 30 messages/s globally
+    and 20 messages/min per group) and honors the retry_after of 429 responses,
+    so bursts at settlement boundaries are paced rather than dropped.
+    Flip alerts are delivered ahead of settlement and predicted-rate alerts.
+    A message whose chat is paced or under a retry_after block is set aside
+    until the chat frees up, so one chat never holds back the others.
+    """
+
+    def __init__(
+        self,
+        telegram: TelegramClient,
+        global_per_second: float = 30,
+        group_per_minute: float = 20,
+        max_attempts: int = 5
+    ):
+        """
+        Initialize the outbox
+
+        Args:
+            telegram: Client used for delivery
+            global_per_second: Bot-wide message rate
+            group_per_minute: Per group chat message rate
+            max_attempts: Give up on a message after this many failed attempts
+        """
+        self.telegram = telegram
+        self.group_per_minute = group_per_minute
+        self.max_attempts = max_attempts
+
+        self._global_bucket = TokenBucket(global_per_second)
+        self._chat_buckets: Dict[object, TokenBucket] = {}
+        self._chat_blocked_until: Dict[object, float] = {}
+
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
+        self._worker: Optional[asyncio.Task] = None
+
+        # Messages set aside until their chat may be sent to again
+        self._deferred = 0
+
+        # Metrics
+        self.delivery_latency = LatencyHistogram()
+        self.enqueued = 0
+        self.delivered = 0
+        self.failed = 0
+        self.retried = 0
+        self.rate_limited = 0
+        self.max_depth = 0
+
+    def start(self):
+        """Start the delivery worker"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self, drain_timeout: float = 10):
+        """Stop the worker, giving queued messages a chance to go out first"""
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._drain(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Outbox stopped with {self._queue.qsize() + self._deferred} undelivered messages")
+        self._worker.cancel()
+        self._worker = None
+
+    def enqueue(self, text: str, priority: int = PRIORITY_SETTLEMENT, chat_id=None,
+                topic_id: Optional[int] = None, label: str = ""):
+        """
+        Queue a message for delivery
+
+        Args:
+            text: Message text (HTML)
+            priority: Lower is sent first (see PRIORITY_*)
+            chat_id: Target chat (defaults to the client's chat)
+            topic_id: Target topic (defaults to the client's topic)
+            label: Short description for logs
+        """
+        message = OutboxMessage(text, chat_id or self.telegram.chat_id, topic_id, priority, label)
+        self._put(message)
+        self.enqueued += 1
+
+    def enqueue_alert(self, alert: Alert):
+        """Format and queue a funding alert with its type's priority"""
+        self.enqueue(
+            self.telegram._format_funding_alert(alert),
+            priority=ALERT_PRIORITIES.get(alert.alert_type, PRIORITY_SETTLEMENT),
+            label=f"{alert.symbol} ({alert.alert_type})"
+        )
+
+    def enqueue_alerts(self, alerts: List[Alert], digest: bool = True):
+        """
+        Queue the alerts from one cycle
+
+        In digest mode alerts are coalesced into as few messages as possible;
+        each message takes the most urgent priority among its alerts.
+        """
+        if not digest:
+            for alert in alerts:
+                self.enqueue_alert(alert)
+            return
+
+        for text, included in self.telegram.build_alert_digest(alerts):
+            priority = min(ALERT_PRIORITIES.get(a.alert_type, PRIORITY_SETTLEMENT) for a in included)
+            if len(included) == 1:
+                label = f"{included[0].symbol} ({included[0].alert_type})"
+            else:
+                label = f"digest of {len(included)} alerts"
+            self.enqueue(text, priority=priority, label=label)
+
+    async def _drain(self):
+        """Wait until every queued and set-aside message has been handled"""
+        while True:
+            await self._queue.join()
+            if not self._deferred:
+                return
+            await asyncio.sleep(0.05)
+
+    def _put(self, message: OutboxMessage):
+        self._queue.put_nowait((message.priority, next(self._sequence), message))
+        self.max_depth = max(self.max_depth, self._queue.qsize() + self._deferred)
+
+    def _defer(self, entry: tuple, delay: float):
+        """Requeue a message (keeping its place among equal priorities) after delay seconds"""
+        self._deferred += 1
+
+        def requeue():
+            self._deferred -= 1
+            self._queue.put_nowait(entry)
+
+        asyncio.get_running_loop().call_later(delay, requeue)
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            # Groups have negative IDs; private chats get about one message per second
+            if isinstance(chat_id, int) and chat_id < 0:
+                bucket = TokenBucket(self.group_per_minute / 60, capacity=self.group_per_minute)
+            else:
+                bucket = TokenBucket(1, capacity=1)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _chat_delay(self, message: OutboxMessage) -> float:
+        """
+        Seconds until a message may be sent to its chat
+
+        Covers a flood-control block and the per-chat bucket; the bucket slot
+        is reserved once per attempt, so a set-aside message keeps its turn.
+        """
+        now = time.monotonic()
+        blocked_for = self._chat_blocked_until.get(message.chat_id, 0) - now
+        if blocked_for > 0:
+            return blocked_for
+        if message.ready_at is None:
+            message.ready_at = now + self._chat_bucket(message.chat_id).reserve()
+        return message.ready_at - now
+
+    async def _run(self):
+        """Deliver queued messages in priority order, setting aside those whose chat is not ready"""
+        while True:
+            entry = await self._queue.get()
+            message = entry[2]
+            try:
+                delay = self._chat_delay(message)
+                if delay > 0:
+                    self._defer(entry, delay)
+                else:
+                    await self._deliver(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Outbox delivery error: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, message: OutboxMessage):
+        # The global limit applies to every chat alike, so waiting on it blocks nothing extra
+        wait = self._global_bucket.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        message.attempts += 1
+        sent, retry_after = await self.telegram.deliver_message(
+            message.text, topic_id=message.topic_id, chat_id=message.chat_id
+        )
+
+        if sent:
+            self.delivered += 1
+            self.delivery_latency.observe(time.monotonic() - message.enqueued_at)
+            if message.label:
+                logger.info(f"Alert sent: {message.label}")
+            return
+
+        if retry_after is not None:
+            self.rate_limited += 1
+        else:
+            # Transient failure: back off before retrying this chat
+            retry_after = min(2 ** message.attempts, 30)
+        self._chat_blocked_until[message.chat_id] = time.monotonic() + retry_after
+
+        if message.attempts < self.max_attempts:
+            self.retried += 1
+            message.ready_at = None
+            self._put(message)
+        else:
+            self.failed += 1
+            logger.error(f"Dropping message after {message.attempts} attempts: {message.label or message.text[:40]}")
+
+    def get_stats(self) -> Dict:
+        """Get queue depth, delivery counters and latency summary"""
+        return {
+            "queue_depth": self._queue.qsize() + self._deferred,
+            "max_queue_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "retried": self.retried,
+            "rate_limited": self.rate_limited,
+            "delivery_latency": self.delivery_latency.summary(),
+        }
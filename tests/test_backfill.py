@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+import backfill
+from backfill import FundingBackfill
+from funding_store import DAY_MS, FundingHistoryStore
+from models import Settlement
+
+HOUR_MS = 3_600_000
+SINCE = 1_700_006_400_000 - 1_700_006_400_000 % DAY_MS
+
+
+class FakeFetcher:
+    """Serves settlements every 8h, newest-first pages like Bybit, and records them into the store"""
+
+    def __init__(self, store, until_ms, fail_after=None):
+        self.store = store
+        self.history = [Settlement("BTCUSDT", 0.0001, ts) for ts in range(SINCE, until_ms + 1, 8 * HOUR_MS)]
+        self.calls = []
+        self.fail_after = fail_after
+
+    async def get_funding_rate_history_range_async(self, symbol, start_time, end_time, limit=200):
+        self.calls.append((start_time, end_time))
+        if self.fail_after is not None and len(self.calls) > self.fail_after:
+            return [], "boom"
+        records = [r for r in self.history if start_time <= r.timestamp <= end_time][-limit:]
+        self.store.add_settlements(records)
+        return records, ""
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = FundingHistoryStore(str(tmp_path / "history.db"))
+    yield store
+    store.close()
+
+
+@pytest.fixture(autouse=True)
+def small_pages(monkeypatch):
+    monkeypatch.setattr(backfill, "PAGE_SIZE", 2)
+
+
+def test_full_walk_marks_done(store):
+    until = SINCE + 3 * DAY_MS
+    fetcher = FakeFetcher(store, until)
+    asyncio.run(FundingBackfill(fetcher, store).backfill_symbol("BTCUSDT", SINCE, until))
+
+    assert len(store.get_range("BTCUSDT", SINCE, until)) == len(fetcher.history)
+    assert store.get_backfill_checkpoint("BTCUSDT") == {"since": SINCE, "until": until, "cursor": SINCE, "done": True}
+    assert store.is_day_synced("BTCUSDT", SINCE)
+
+
+def test_interrupted_walk_resumes_below_cursor(store):
+    until = SINCE + 3 * DAY_MS
+    failing = FakeFetcher(store, until, fail_after=2)
+    run = FundingBackfill(failing, store)
+    asyncio.run(run.backfill_symbol("BTCUSDT", SINCE, until))
+
+    checkpoint = store.get_backfill_checkpoint("BTCUSDT")
+    assert run.failed == ["BTCUSDT"]
+    assert not checkpoint["done"]
+    assert checkpoint["cursor"] < until
+
+    fetcher = FakeFetcher(store, until)
+    # A later run with a newer until still resumes the interrupted range
+    asyncio.run(FundingBackfill(fetcher, store).backfill_symbol("BTCUSDT", SINCE, until + DAY_MS))
+    assert fetcher.calls[0] == (SINCE, checkpoint["cursor"])
+    assert store.get_backfill_checkpoint("BTCUSDT")["done"]
+    assert len(store.get_range("BTCUSDT", SINCE, until)) == len(fetcher.history)
+
+
+def test_completed_symbol_only_fetches_the_gap(store):
+    until = SINCE + 3 * DAY_MS
+    asyncio.run(FundingBackfill(FakeFetcher(store, until), store).backfill_symbol("BTCUSDT", SINCE, until))
+
+    later = until + DAY_MS
+    fetcher = FakeFetcher(store, later)
+    run = FundingBackfill(fetcher, store)
+    asyncio.run(run.backfill_symbol("BTCUSDT", SINCE, later))
+
+    assert all(start == until for start, _ in fetcher.calls)
+    assert run.completed == 1
+    assert store.get_backfill_checkpoint("BTCUSDT")["until"] == later
+    assert len(store.get_range("BTCUSDT", SINCE, later)) == len(fetcher.history)
+
+
+def test_completed_and_current_symbol_makes_no_requests(store):
+    until = SINCE + 3 * DAY_MS
+    asyncio.run(FundingBackfill(FakeFetcher(store, until), store).backfill_symbol("BTCUSDT", SINCE, until))
+
+    fetcher = FakeFetcher(store, until)
+    asyncio.run(FundingBackfill(fetcher, store).backfill_symbol("BTCUSDT", SINCE, until))
+    assert fetcher.calls == []
@@ -0,0 +1,75 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from bybit_fetcher import BybitDataFetcher
+from models import Settlement
+from rate_limiter import RateLimiter
+
+
+class HistoryServer:
+    """Funding history endpoint that tracks requests in flight and fails for chosen symbols"""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.requests = []
+
+    async def handle(self, request: web.Request) -> web.Response:
+        symbol = request.query["symbol"]
+        self.requests.append(symbol)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+
+        if symbol == "DOWNUSDT":
+            return web.json_response({"msg": "Internal error"}, status=500)
+        if symbol == "BADUSDT":
+            return web.json_response({"retCode": 10001, "retMsg": "params error: symbol invalid", "result": {}})
+        if symbol == "NEWUSDT":
+            return web.json_response({"retCode": 0, "retMsg": "OK", "result": {"list": []}})
+        return web.json_response({"retCode": 0, "retMsg": "OK", "result": {"list": [
+            {"symbol": symbol, "fundingRate": "0.0001", "fundingRateTimestamp": "1700006400000"}
+        ]}})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/v5/market/funding/history", self.handle)
+        return app
+
+
+async def run_batch(server: HistoryServer, symbols, **kwargs):
+    async with TestServer(server.app()) as test_server:
+        fetcher = BybitDataFetcher(
+            str(test_server.make_url("")).rstrip("/"), max_concurrency=10,
+            rate_limiter=RateLimiter(requests_per_second=10_000)
+        )
+        try:
+            return await fetcher.get_latest_settlements_batch_async(symbols, **kwargs)
+        finally:
+            await fetcher.close()
+
+
+def test_batch_is_bounded_by_concurrency():
+    server = HistoryServer()
+    symbols = [f"S{i}USDT" for i in range(20)]
+    results = asyncio.run(run_batch(server, symbols, concurrency=4))
+
+    assert server.peak == 4
+    assert sorted(server.requests) == sorted(symbols)
+    assert results["S0USDT"] == Settlement("S0USDT", 0.0001, 1700006400000)
+    assert len(results) == 20
+
+
+def test_batch_keeps_successes_when_some_symbols_fail():
+    server = HistoryServer()
+    symbols = ["BTCUSDT", "DOWNUSDT", "BADUSDT", "NEWUSDT", "ETHUSDT"]
+    results = asyncio.run(run_batch(server, symbols))
+
+    assert set(results) == {"BTCUSDT", "ETHUSDT"}
+    assert results["ETHUSDT"].funding_rate == 0.0001
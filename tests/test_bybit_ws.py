@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from bybit_ws import BybitTickerStream
+from mock_bybit_ws import MockTickerServer
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+
+
+async def stream_until(server: MockTickerServer, condition, timeout: float = 5):
+    """Run a stream against the mock server until condition(stream) holds
+
+    Returns the stream and the symbols in its snapshot at that point (stopping clears it).
+    """
+    app = web.Application()
+    app.router.add_get("/v5/public/linear", server.handle)
+    async with TestServer(app) as test_server:
+        url = str(test_server.make_url("/v5/public/linear")).replace("http://", "ws://")
+        stream = BybitTickerStream(SYMBOLS, url=url, stale_timeout=2)
+        task = asyncio.create_task(stream.run())
+        try:
+            deadline = time.monotonic() + timeout
+            while not condition(stream):
+                assert time.monotonic() < deadline, "condition not reached"
+                await asyncio.sleep(0.01)
+            live_symbols = set(stream.snapshot)
+        finally:
+            await stream.stop()
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    return stream, live_symbols
+
+
+def test_snapshots_then_deltas_go_live():
+    server = MockTickerServer(delta_interval=0.01)
+    stream, live_symbols = asyncio.run(stream_until(server, lambda s: s.is_live() and s.messages_received > 10))
+    assert live_symbols == set(SYMBOLS)
+    assert stream.gaps_detected == 0
+
+
+def test_reconnect_resubscribes_every_symbol_for_fresh_snapshots():
+    server = MockTickerServer(delta_interval=0.01, drop_every=10)
+    seen_offline = []
+
+    def reconnected_and_live(stream):
+        if stream.reconnects and not stream.is_live():
+            seen_offline.append(len(stream.snapshot))
+        return stream.reconnects >= 1 and stream.is_live()
+
+    stream, live_symbols = asyncio.run(stream_until(server, reconnected_and_live))
+
+    assert server.connections >= 2
+    assert all(server.subscribe_counts[symbol] >= 2 for symbol in SYMBOLS)
+    # Tickers from the dropped connection were not served while waiting to reconnect
+    assert seen_offline and seen_offline[0] == 0
+    assert live_symbols == set(SYMBOLS)
+
+
+def test_regressed_delta_resyncs_the_symbol():
+    server = MockTickerServer(delta_interval=0.01, regress_every=5)
+    stream, live_symbols = asyncio.run(stream_until(server, lambda s: s.gaps_detected >= 2 and s.is_live()))
+
+    # Each stale delta resubscribed its symbol on the same connection
+    assert server.connections == 1
+    assert sum(server.subscribe_counts.values()) >= len(SYMBOLS) + 2
+    assert live_symbols == set(SYMBOLS)
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+
+import pytest
+
+import state_journal
+from config import FundingRateConfig
+from funding_monitor import FundingRateMonitor
+from models import Ticker
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = FundingRateConfig()
+    config.SETTLEMENT_HISTORY_FILE = str(tmp_path / "state.json")
+    config.STATE_JOURNAL_COMPACT_EVERY = 3
+    return config
+
+
+def test_deferred_saves_are_written_off_the_event_loop(config, monkeypatch):
+    writer_threads = []
+    append = state_journal.StateJournal.append
+
+    def recording_append(self, changes):
+        writer_threads.append(threading.current_thread())
+        return append(self, changes)
+
+    monkeypatch.setattr(state_journal.StateJournal, "append", recording_append)
+
+    async def main():
+        monitor = FundingRateMonitor(config, defer_saves=True)
+        for i, symbol in enumerate(["BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT"]):
+            monitor.next_funding_times[symbol] = i
+            monitor._mark_dirty("next_funding_times", symbol)
+            monitor._save_state()
+        assert writer_threads == []
+
+        await monitor.flush_state()
+        return monitor
+
+    monitor = asyncio.run(main())
+    assert len(writer_threads) == 1
+    assert writer_threads[0] is not threading.main_thread()
+    # Past compact_every the changes went straight into the snapshot
+    assert monitor.journal.entries == 0
+    assert FundingRateMonitor(config).next_funding_times == {"BTCUSDT": 0, "ETHUSDT": 1, "SOLUSDT": 2, "XRPUSDT": 3}
+
+
+def test_flush_without_changes_writes_nothing(config, monkeypatch):
+    monkeypatch.setattr(state_journal.StateJournal, "append", lambda self, changes: pytest.fail("unexpected write"))
+    asyncio.run(FundingRateMonitor(config, defer_saves=True).flush_state())
+
+
+def anomaly_config(config) -> FundingRateConfig:
+    config.ALERT_ON_ANOMALIES = True
+    config.ANOMALY_MIN_SAMPLES = 5
+    config.ANOMALY_Z_THRESHOLD = 4.0
+    config.ANOMALY_MIN_STD = 0.0001
+    config.MAX_ALERTS_PER_HOUR = 100
+    return config
+
+
+def seeded_monitor(config, rates=(0.0001,) * 10) -> FundingRateMonitor:
+    monitor = FundingRateMonitor(anomaly_config(config))
+    for i, rate in enumerate(rates):
+        monitor._update_settled_stats("BTCUSDT", rate, None, i, Ticker("BTCUSDT"))
+    return monitor
+
+
+def test_anomalies_are_opt_in():
+    assert FundingRateConfig().ALERT_ON_ANOMALIES is False
+
+
+def test_settled_anomaly_needs_history_and_min_std(config):
+    monitor = FundingRateMonitor(anomaly_config(config))
+    ticker = Ticker("BTCUSDT")
+    for i in range(5):
+        assert monitor._update_settled_stats("BTCUSDT", 0.0001, None, i, ticker) is None
+
+    # Flat history: the std floor keeps a 2bp move from alerting
+    assert monitor._update_settled_stats("BTCUSDT", 0.0003, 0.0001, 5, ticker) is None
+
+    alert = monitor._update_settled_stats("BTCUSDT", 0.002, 0.0003, 6, ticker)
+    assert alert.alert_type == "anomaly"
+    assert alert.zscore > 4
+    assert alert.prev_funding_rate == 0.0003
+
+
+def test_settled_stats_use_per_8h_rates(config):
+    monitor = seeded_monitor(config)
+    # 0.00005 every 4h is 0.0001 per 8h: right on the baseline
+    assert monitor._update_settled_stats(
+        "BTCUSDT", 0.00005, 0.0001, 99, Ticker("BTCUSDT", funding_interval_hours=4)
+    ) is None
+    assert monitor.rate_stats["BTCUSDT"].ewma == pytest.approx(0.0001)
+
+
+def test_live_anomaly_cooldown_and_sign(config):
+    monitor = seeded_monitor(config)
+    high = Ticker("BTCUSDT", funding_rate=0.003)
+    low = Ticker("BTCUSDT", funding_rate=-0.003)
+
+    assert monitor._evaluate_live_anomaly("BTCUSDT", high, 1000.0).zscore > 0
+    # Same direction inside the cooldown is suppressed
+    assert monitor._evaluate_live_anomaly("BTCUSDT", high, 1060.0) is None
+    # Fully decayed EWMA flipping to the other side alerts straight away
+    assert monitor._evaluate_live_anomaly("BTCUSDT", low, 1060.0 + 86400).zscore < 0
+
+    # Back in range clears the tracking, so the next excursion alerts again
+    normal = Ticker("BTCUSDT", funding_rate=0.0001)
+    assert monitor._evaluate_live_anomaly("BTCUSDT", normal, 1060.0 + 2 * 86400) is None
+    assert "BTCUSDT" not in monitor.alerted_anomalies
+    assert monitor._evaluate_live_anomaly("BTCUSDT", low, 1060.0 + 3 * 86400) is not None
+
+
+def test_live_ewma_is_time_weighted(config):
+    monitor = seeded_monitor(config)
+    config.ANOMALY_LIVE_HALF_LIFE = 600
+    monitor._evaluate_live_anomaly("BTCUSDT", Ticker("BTCUSDT", funding_rate=0.0), 0.0)
+    monitor._evaluate_live_anomaly("BTCUSDT", Ticker("BTCUSDT", funding_rate=0.001), 600.0)
+    assert monitor.live_rate_ewma["BTCUSDT"] == (pytest.approx(0.0005), 600.0)
+
+
+def test_rate_stats_survive_journal_replay(config):
+    monitor = seeded_monitor(config, rates=(0.0001, 0.0002, 0.0003))
+    monitor._save_state()
+    expected = monitor.rate_stats["BTCUSDT"].to_list()
+
+    restored = FundingRateMonitor(config).rate_stats["BTCUSDT"]
+    assert restored.to_list() == expected
@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+from funding_store import DAY_MS
+from history_cache import HistoryDayCache
+from models import Settlement
+
+CLOSED_DAY = 1_700_006_400_000 - 1_700_006_400_000 % DAY_MS
+
+
+def today() -> int:
+    now_ms = int(time.time() * 1000)
+    return now_ms - now_ms % DAY_MS
+
+
+class FakeFetcher:
+    max_concurrency = 4
+
+    def __init__(self):
+        self.calls = []
+
+    async def get_funding_rate_history_day_async(self, symbol, day_start_ms):
+        self.calls.append((symbol, day_start_ms))
+        await asyncio.sleep(0.01)
+        return [Settlement(symbol, 0.0001, day_start_ms)], ""
+
+
+def test_closed_day_cached_until_evicted():
+    fetcher = FakeFetcher()
+    cache = HistoryDayCache(fetcher, max_entries=2)
+
+    async def main():
+        await cache.get_day("BTCUSDT", CLOSED_DAY)
+        await cache.get_day("BTCUSDT", CLOSED_DAY)
+        await cache.get_day("ETHUSDT", CLOSED_DAY)
+        # Touch BTC so ETH is least recently used
+        await cache.get_day("BTCUSDT", CLOSED_DAY)
+        await cache.get_day("SOLUSDT", CLOSED_DAY)
+        await cache.get_day("BTCUSDT", CLOSED_DAY)
+        await cache.get_day("ETHUSDT", CLOSED_DAY)
+
+    asyncio.run(main())
+    assert fetcher.calls.count(("BTCUSDT", CLOSED_DAY)) == 1
+    assert fetcher.calls.count(("ETHUSDT", CLOSED_DAY)) == 2
+    assert cache.evictions == 2
+    assert cache.hits == 3
+
+
+def test_open_day_expires_after_ttl():
+    fetcher = FakeFetcher()
+    cache = HistoryDayCache(fetcher, today_ttl=0.02)
+
+    async def main():
+        await cache.get_day("BTCUSDT", today())
+        await cache.get_day("BTCUSDT", today())
+        await asyncio.sleep(0.03)
+        await cache.get_day("BTCUSDT", today())
+
+    asyncio.run(main())
+    assert len(fetcher.calls) == 2
+    assert cache.expired == 1
+
+
+def test_concurrent_misses_share_one_fetch():
+    fetcher = FakeFetcher()
+    cache = HistoryDayCache(fetcher)
+
+    async def main():
+        return await asyncio.gather(*(cache.get_day("BTCUSDT", CLOSED_DAY) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(fetcher.calls) == 1
+    assert cache.coalesced == 4
+    assert all(records == results[0][0] for records, _ in results)
+
+
+def test_closed_days_survive_restart(tmp_path):
+    cache_file = str(tmp_path / "history_cache.json")
+    cache = HistoryDayCache(FakeFetcher(), cache_file=cache_file)
+
+    async def fill():
+        await cache.get_day("BTCUSDT", CLOSED_DAY)
+        await cache.get_day("BTCUSDT", today())
+
+    asyncio.run(fill())
+    cache.save()
+
+    fetcher = FakeFetcher()
+    warm = HistoryDayCache(fetcher, cache_file=cache_file)
+    records, _ = asyncio.run(warm.get_day("BTCUSDT", CLOSED_DAY))
+    assert records == [Settlement("BTCUSDT", 0.0001, CLOSED_DAY)]
+    assert fetcher.calls == []
+    assert warm.get_stats()["entries"] == 1
@@ -0,0 +1,78 @@
+import pytest
+
+from funding_store import DAY_MS
+from history_range import FundingSeries, HistoryPager, HistoryQuery, parse_ddmmyy
+from models import Settlement
+
+DAY = 1_700_006_400_000 - 1_700_006_400_000 % DAY_MS
+
+
+def series(symbol, rates):
+    return FundingSeries(symbol, [Settlement(symbol, rate, DAY + i * 28_800_000) for i, rate in enumerate(rates)])
+
+
+def test_series_cumulative_and_counts():
+    s = series("BTCUSDT", [0.001, -0.002, 0.003])
+    assert s.cumulative.tolist() == [0.001, -0.001, 0.002]
+    assert abs(s.total - 0.002) < 1e-12
+    assert s.positive_count() == 2
+    assert s.negative_count() == 1
+
+
+def test_single_symbol_pages():
+    query = HistoryQuery([series("BTCUSDT", [0.0001] * 45)], DAY, DAY + 14 * DAY_MS, page_size=20)
+    assert query.page_count == 3
+    assert "Showing 1-20 of 45" in query.render_page(0)
+    assert "Showing 41-45 of 45" in query.render_page(2)
+    # Out-of-range pages are clamped
+    assert query.render_page(99) == query.render_page(2)
+
+
+def test_multi_symbol_opens_on_ranked_comparison():
+    query = HistoryQuery(
+        [series("ETHUSDT", [0.0001] * 3), series("BTCUSDT", [0.0005] * 25), series("NEWUSDT", [])],
+        DAY, DAY, page_size=20,
+    )
+    # Comparison + 2 BTC pages + 1 ETH page + 1 empty NEW page
+    assert query.page_count == 5
+    comparison = query.render_page(0)
+    assert comparison.index("BTCUSDT") < comparison.index("ETHUSDT")
+    assert "NEWUSDT</b>: no data" in comparison
+    assert "No funding rate data found" in query.render_page(4)
+
+
+def test_pager_keyboard_and_callback_round_trip():
+    pager = HistoryPager()
+    token = pager.add(HistoryQuery([series("BTCUSDT", [0.0001] * 45)], DAY, DAY, page_size=20))
+
+    keyboard = HistoryPager.keyboard(token, 1, 3)
+    buttons = keyboard["inline_keyboard"][0]
+    assert [b["text"] for b in buttons] == ["« Prev", "2/3", "Next »"]
+    assert HistoryPager.parse_callback(buttons[2]["callback_data"]) == (token, 2)
+    assert pager.get(token) is not None
+
+    assert HistoryPager.keyboard(token, 0, 1) is None
+    assert [b["text"] for b in HistoryPager.keyboard(token, 0, 3)["inline_keyboard"][0]] == ["1/3", "Next »"]
+    assert HistoryPager.parse_callback("other:abc:1") is None
+    assert HistoryPager.parse_callback(f"hist:{token}:x") is None
+
+
+def test_pager_drops_least_recently_viewed():
+    pager = HistoryPager(max_queries=2)
+    query = HistoryQuery([series("BTCUSDT", [0.0001])], DAY, DAY)
+    first = pager.add(query)
+    second = pager.add(query)
+    pager.get(first)
+    pager.add(query)
+    assert pager.get(first) is query
+    assert pager.get(second) is None
+
+
+def test_parse_ddmmyy():
+    assert int(parse_ddmmyy("151124").timestamp() * 1000) % DAY_MS == 0
+
+
+@pytest.mark.parametrize("date_str", ["1511", "aa1124", "321124"])
+def test_parse_ddmmyy_rejects_invalid(date_str):
+    with pytest.raises(ValueError):
+        parse_ddmmyy(date_str)
@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+from instrument_cache import InstrumentCache, InstrumentDiff
+from models import Instrument
+
+
+class FakeFetcher:
+    """Returns the scripted instrument lists in turn"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    async def get_instruments_async(self):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+def instruments(**intervals):
+    return {symbol: Instrument(symbol, hours) for symbol, hours in intervals.items()}
+
+
+def many(n, hours=8):
+    return {f"SYM{i}USDT": Instrument(f"SYM{i}USDT", hours) for i in range(n)}
+
+
+def test_diff_reports_listings_delistings_and_interval_changes():
+    cache = InstrumentCache(FakeFetcher())
+    cache.instruments = instruments(BTCUSDT=8, ETHUSDT=8, OLDUSDT=8)
+
+    diff = cache.diff(instruments(BTCUSDT=8, ETHUSDT=4, NEWUSDT=1))
+
+    assert diff.added == instruments(NEWUSDT=1)
+    assert diff.removed == ["OLDUSDT"]
+    assert diff.interval_changes == {"ETHUSDT": (8, 4)}
+    assert not diff.empty
+    assert cache.diff(instruments(BTCUSDT=8, ETHUSDT=8, OLDUSDT=8)).empty
+
+
+def test_first_refresh_only_records_baseline():
+    fetcher = FakeFetcher(instruments(BTCUSDT=8, ETHUSDT=4))
+    cache = InstrumentCache(fetcher)
+    assert cache.is_due(300)
+
+    diff = asyncio.run(cache.refresh())
+
+    assert diff == InstrumentDiff({}, [], {})
+    assert cache.instruments == instruments(BTCUSDT=8, ETHUSDT=4)
+    assert cache.interval("ETHUSDT") == 4
+    assert cache.interval("MISSINGUSDT") == 8
+    assert not cache.is_due(300)
+
+
+def test_refresh_applies_diff():
+    fetcher = FakeFetcher(
+        many(10),
+        {**many(9), "SYM9USDT": Instrument("SYM9USDT", 4), "NEWUSDT": Instrument("NEWUSDT", 8)},
+    )
+    cache = InstrumentCache(fetcher)
+    asyncio.run(cache.refresh())
+
+    diff = asyncio.run(cache.refresh())
+
+    assert list(diff.added) == ["NEWUSDT"]
+    assert diff.removed == []
+    assert diff.interval_changes == {"SYM9USDT": (8, 4)}
+    assert cache.interval("SYM9USDT") == 4
+    assert "NEWUSDT" in cache.instruments
+
+
+def test_failed_fetch_keeps_cache():
+    cache = InstrumentCache(FakeFetcher(instruments(BTCUSDT=8), {}))
+    asyncio.run(cache.refresh())
+
+    assert asyncio.run(cache.refresh()) is None
+    assert cache.instruments == instruments(BTCUSDT=8)
+
+
+def test_refresh_refuses_implausible_mass_delisting(tmp_path):
+    cache_file = str(tmp_path / "instruments.json")
+    fetcher = FakeFetcher(many(100), many(50), many(85))
+    cache = InstrumentCache(fetcher, cache_file, max_removed_fraction=0.2)
+    asyncio.run(cache.refresh())
+
+    # Half the symbols missing looks like a truncated response
+    assert asyncio.run(cache.refresh()) is None
+    assert cache.instruments == many(100)
+    assert len(json.load(open(cache_file))) == 100
+
+    # Delistings within the limit are applied
+    diff = asyncio.run(cache.refresh())
+    assert len(diff.removed) == 15
+    assert cache.instruments == many(85)
+
+
+def test_cache_file_round_trip_detects_changes_made_while_down(tmp_path):
+    cache_file = str(tmp_path / "data" / "instruments.json")
+    first = InstrumentCache(FakeFetcher(instruments(BTCUSDT=8, ETHUSDT=8)), cache_file)
+    asyncio.run(first.refresh())
+
+    assert json.load(open(cache_file)) == {"BTCUSDT": [8, "Trading"], "ETHUSDT": [8, "Trading"]}
+    assert not (tmp_path / "data" / "instruments.json.tmp").exists()
+
+    # A restarted bot loads the saved copy, so its first refresh is a real diff
+    restarted = InstrumentCache(FakeFetcher(instruments(BTCUSDT=8, ETHUSDT=4)), cache_file)
+    assert restarted.instruments == instruments(BTCUSDT=8, ETHUSDT=8)
+
+    diff = asyncio.run(restarted.refresh())
+
+    assert diff.interval_changes == {"ETHUSDT": (8, 4)}
+    assert json.load(open(cache_file))["ETHUSDT"] == [4, "Trading"]
+
+
+def test_corrupt_cache_file_is_ignored(tmp_path):
+    cache_file = tmp_path / "instruments.json"
+    cache_file.write_text("{not json")
+
+    cache = InstrumentCache(FakeFetcher(), str(cache_file))
+
+    assert cache.instruments == {}
@@ -0,0 +1,51 @@
+import json
+import os
+
+import pytest
+
+import json_codec
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "bybit", "tickers.json")
+
+
+def load_fixture() -> dict:
+    with open(FIXTURE) as f:
+        return json.load(f)
+
+
+def with_extra_rows() -> bytes:
+    """The fixture plus the row shapes that trip a strictly typed decoder"""
+    payload = load_fixture()
+    rows = payload["result"]["list"]
+    base = dict(rows[0])
+    rows.append(dict(base, symbol="BTCUSDT-27DEC24", fundingRate="", nextFundingTime="", fundingIntervalHour=""))
+    rows.append(dict(base, symbol="NEWUSDT", fundingRate="", nextFundingTime="0", lastPrice="", volume24h="",
+                     openInterest="", price24hPcnt=""))
+    rows.append({"symbol": "BAREUSDT"})
+    return json.dumps(payload).encode()
+
+
+@pytest.mark.parametrize("body", [open(FIXTURE, "rb").read(), with_extra_rows()], ids=["fixture", "extra_rows"])
+def test_backends_decode_identically(body):
+    expected = json_codec.decode_tickers_generic(body, json.loads)
+    assert expected["result"]["list"]
+
+    assert json_codec.decode_tickers(body) == expected
+    if json_codec.orjson is not None:
+        assert json_codec.decode_tickers_generic(body, json_codec.orjson.loads) == expected
+    if json_codec.decode_tickers_msgspec is not None:
+        assert json_codec.decode_tickers_msgspec(body) == expected
+
+
+def test_empty_fields_use_parse_ticker_defaults():
+    tickers = {t.symbol: t for t in json_codec.decode_tickers(with_extra_rows())["result"]["list"]}
+    future = tickers["BTCUSDT-27DEC24"]
+    assert future.funding_rate == 0.0
+    assert future.next_funding_time == 0
+    assert future.funding_interval_hours == 8
+
+
+def test_error_envelope_without_result():
+    body = b'{"retCode":10006,"retMsg":"Too many visits!","result":{}}'
+    decoded = json_codec.decode_tickers(body)
+    assert decoded == {"retCode": 10006, "retMsg": "Too many visits!", "result": {"list": []}}
@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+from rate_limiter import RateLimiter, TokenBucket
+
+
+def test_token_bucket_burst_then_debt():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    # Third token is borrowed against the refill
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_weighted_reservation():
+    bucket = TokenBucket(rate=10, capacity=10)
+    assert bucket.reserve(10) == 0.0
+    assert bucket.reserve(5) == pytest.approx(0.5, abs=0.01)
+
+
+def reset_header(seconds):
+    return str(int((time.time() + seconds) * 1000))
+
+
+def test_headers_spread_remaining_quota():
+    limiter = RateLimiter(requests_per_second=100)
+    limiter.update_from_headers({
+        "X-Bapi-Limit-Status": "10",
+        "X-Bapi-Limit": "600",
+        "X-Bapi-Limit-Reset-Timestamp": reset_header(5),
+    })
+    assert limiter.bucket.rate == pytest.approx(2, rel=0.1)
+
+    # Plenty of headroom restores the base rate
+    limiter.update_from_headers({
+        "X-Bapi-Limit-Status": "500",
+        "X-Bapi-Limit": "600",
+        "X-Bapi-Limit-Reset-Timestamp": reset_header(5),
+    })
+    assert limiter.bucket.rate == 100
+
+
+def test_headers_exhausted_quota_blocks_until_reset():
+    limiter = RateLimiter()
+    limiter.update_from_headers({"X-Bapi-Limit-Status": "0", "X-Bapi-Limit-Reset-Timestamp": reset_header(3)})
+    assert limiter._blocked_until == pytest.approx(time.time() + 3, abs=0.1)
+
+
+@pytest.mark.parametrize("headers", [
+    {"X-Bapi-Limit-Status": "abc", "X-Bapi-Limit-Reset-Timestamp": "1"},
+    {"X-Bapi-Limit-Status": "10", "X-Bapi-Limit-Reset-Timestamp": "soon"},
+    {"X-Bapi-Limit-Status": "10"},
+    {},
+])
+def test_headers_ignore_malformed_or_missing(headers):
+    limiter = RateLimiter(requests_per_second=100)
+    limiter.update_from_headers(headers)
+    assert limiter.bucket.rate == 100
+    assert limiter._blocked_until == 0.0
+
+
+def test_rate_limited_uses_reset_timestamp():
+    limiter = RateLimiter()
+    limiter.on_rate_limited({"X-Bapi-Limit-Reset-Timestamp": reset_header(4)})
+    assert limiter._blocked_until == pytest.approx(time.time() + 4, abs=0.1)
+    assert limiter.throttled == 1
+
+
+def test_rate_limited_malformed_reset_falls_back_to_retry_after():
+    limiter = RateLimiter()
+    limiter.on_rate_limited({"X-Bapi-Limit-Reset-Timestamp": "not-a-number", "Retry-After": "7"})
+    assert limiter._blocked_until == pytest.approx(time.time() + 7, abs=0.1)
+
+
+def test_rate_limited_backoff_doubles_and_resets():
+    limiter = RateLimiter()
+    limiter.on_rate_limited()
+    first = limiter._blocked_until
+    assert first == pytest.approx(time.time() + 1, abs=0.1)
+    limiter.on_rate_limited()
+    assert limiter._blocked_until == pytest.approx(time.time() + 2, abs=0.1)
+    limiter.on_success()
+    assert limiter._backoff == 1.0
@@ -0,0 +1,38 @@
+from reply_cache import ReplyCache
+
+
+def test_hit_for_same_version():
+    cache = ReplyCache()
+    cache.put(1, "top", "reply")
+    assert cache.get(1, "top") == "reply"
+    assert cache.hits == 1
+
+
+def test_newer_version_invalidates_older_replies():
+    cache = ReplyCache()
+    cache.put(1, "top", "old")
+    cache.put(1, ("symbol", "BTCUSDT"), "old btc")
+
+    assert cache.get(2, "top") is None
+    cache.put(2, "top", "new")
+    assert cache.get(2, "top") == "new"
+    assert cache.get(2, ("symbol", "BTCUSDT")) is None
+    assert cache.invalidations == 1
+
+
+def test_reply_from_older_version_is_not_stored():
+    cache = ReplyCache()
+    cache.put(2, "top", "new")
+    cache.put(1, "top", "stale")
+    assert cache.version == 2
+    assert cache.get(2, "top") == "new"
+    assert cache.get(1, "top") is None
+
+
+def test_oldest_reply_dropped_past_max_entries():
+    cache = ReplyCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(1, key, key)
+    assert cache.get(1, "a") is None
+    assert cache.get(1, "c") == "c"
+    assert cache.get_stats()["entries"] == 2
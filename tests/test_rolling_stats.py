@@ -0,0 +1,65 @@
+import statistics
+
+import pytest
+
+from rolling_stats import RollingStats, decay_alpha, ewma_update
+
+
+def test_matches_exact_stats_within_window():
+    values = [0.0001, 0.0003, -0.0002, 0.0005, 0.0001, 0.0004]
+    stats = RollingStats()
+    for x in values:
+        stats.update(x, window=90, alpha=0.2)
+
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(statistics.fmean(values))
+    assert stats.var == pytest.approx(statistics.pvariance(values))
+
+
+def test_capped_count_decays_old_observations():
+    stats = RollingStats()
+    for _ in range(50):
+        stats.update(0.0, window=10, alpha=0.2)
+    for _ in range(10):
+        stats.update(1.0, window=10, alpha=0.2)
+
+    assert stats.count == 10
+    # Each new value weighs 1/window, so ten of them move the mean 1 - 0.9^10 of the way
+    assert stats.mean == pytest.approx(1 - 0.9 ** 10)
+
+
+def test_zscore_is_measured_from_the_ewma():
+    stats = RollingStats()
+    for x in [0.0, 0.0, 0.0, 0.0, 1.0, 1.0]:
+        stats.update(x, window=90, alpha=0.5)
+
+    assert stats.ewma == pytest.approx(0.75)
+    assert stats.baseline == stats.ewma
+    assert stats.zscore(0.75) == 0.0
+    assert stats.zscore(0.75 + stats.std) == pytest.approx(1.0)
+
+
+def test_zscore_std_floor():
+    stats = RollingStats(count=30, mean=0.0001, var=0.0, ewma=0.0001)
+    assert stats.zscore(0.0002) == 0.0
+    assert stats.zscore(0.0002, min_std=0.0001) == pytest.approx(1.0)
+
+
+def test_list_round_trip():
+    stats = RollingStats()
+    for x in [0.1, 0.2, 0.4]:
+        stats.update(x, window=90, alpha=0.2)
+
+    restored = RollingStats.from_list(stats.to_list())
+    assert restored.to_list() == stats.to_list()
+    assert RollingStats.from_list(RollingStats().to_list()).ewma is None
+
+
+def test_ewma_and_time_decay():
+    assert ewma_update(None, 3.0, 0.2) == 3.0
+    assert ewma_update(1.0, 3.0, 0.5) == 2.0
+
+    assert decay_alpha(600, 600) == pytest.approx(0.5)
+    assert decay_alpha(1200, 600) == pytest.approx(0.75)
+    assert decay_alpha(0, 600) == 0.0
+    assert decay_alpha(10, 0) == 1.0
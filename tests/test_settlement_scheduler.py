@@ -0,0 +1,64 @@
+from models import Ticker
+from settlement_scheduler import SettlementScheduler
+
+NOW = 1_000_000_000
+
+
+def ticker(symbol, next_funding_time, interval=8):
+    return Ticker(symbol, next_funding_time=next_funding_time, funding_interval_hours=interval)
+
+
+def test_pop_due_returns_only_reached_boundaries():
+    scheduler = SettlementScheduler(wake_delay=5, retry_delay=10)
+    scheduler.update({
+        "BTCUSDT": ticker("BTCUSDT", NOW + 60_000),
+        "ETHUSDT": ticker("ETHUSDT", NOW + 60_000),
+        "SOLUSDT": ticker("SOLUSDT", NOW + 120_000),
+    }, now_ms=NOW)
+
+    assert scheduler.next_wake_time() == NOW + 65_000
+    assert scheduler.pop_due(NOW + 64_999) == []
+    assert sorted(scheduler.pop_due(NOW + 65_000)) == ["BTCUSDT", "ETHUSDT"]
+    assert scheduler.next_wake_time() == NOW + 125_000
+    assert len(scheduler) == 1
+
+
+def test_passed_boundary_waits_retry_delay():
+    scheduler = SettlementScheduler(wake_delay=5, retry_delay=10)
+    scheduler.update({"BTCUSDT": ticker("BTCUSDT", NOW - 60_000)}, now_ms=NOW)
+    assert scheduler.next_wake_time() == NOW + 10_000
+
+
+def test_reschedule_discards_stale_entry():
+    scheduler = SettlementScheduler(wake_delay=0)
+    scheduler.update({"BTCUSDT": ticker("BTCUSDT", NOW + 60_000)}, now_ms=NOW)
+    scheduler.update({"BTCUSDT": ticker("BTCUSDT", NOW + 240_000, interval=4)}, now_ms=NOW)
+
+    assert scheduler.pop_due(NOW + 60_000) == []
+    assert scheduler.pop_due(NOW + 240_000) == ["BTCUSDT"]
+    assert scheduler.next_wake_time() is None
+
+
+def test_unchanged_ticker_is_not_pushed_again():
+    scheduler = SettlementScheduler()
+    tickers = {"BTCUSDT": ticker("BTCUSDT", NOW + 60_000)}
+    scheduler.update(tickers, now_ms=NOW)
+    scheduler.update(tickers, now_ms=NOW)
+    assert len(scheduler._heap) == 1
+
+
+def test_removed_symbol_is_never_due():
+    scheduler = SettlementScheduler(wake_delay=0)
+    scheduler.update({"BTCUSDT": ticker("BTCUSDT", NOW + 60_000)}, now_ms=NOW)
+    scheduler.remove(["BTCUSDT"])
+    assert scheduler.pop_due(NOW + 60_000) == []
+    assert scheduler.seconds_until_next_wake(NOW) is None
+
+
+def test_retry_keeps_earlier_wake():
+    scheduler = SettlementScheduler(wake_delay=0, retry_delay=10)
+    scheduler.update({"BTCUSDT": ticker("BTCUSDT", NOW + 5_000)}, now_ms=NOW)
+    scheduler.retry(["BTCUSDT", "ETHUSDT"], now_ms=NOW)
+
+    assert scheduler.pop_due(NOW + 5_000) == ["BTCUSDT"]
+    assert scheduler.pop_due(NOW + 10_000) == ["ETHUSDT"]
@@ -0,0 +1,99 @@
+import random
+
+import pytest
+
+from config import FundingRateConfig
+from models import Ticker
+from spread_engine import SpreadEngine
+
+
+def ticker(symbol, rate, interval=8):
+    return Ticker(symbol, funding_rate=rate, funding_interval_hours=interval)
+
+
+def assert_ranked(engine: SpreadEngine):
+    """The maintained ranking matches a full sort of the current spreads"""
+    spreads = [engine.get(symbol) for symbol in engine._spreads]
+    expected = sorted(spreads, key=lambda s: (-s.apr, s.symbol))
+    assert engine.widest(len(engine)) == expected
+
+
+def test_single_venue_has_no_spread():
+    engine = SpreadEngine()
+    assert engine.update("bybit", ticker("BTCUSDT", 0.0001)) is None
+    assert len(engine) == 0
+
+
+def test_spread_is_normalized_by_interval():
+    engine = SpreadEngine()
+    engine.update("bybit", ticker("BTCUSDT", 0.0001, interval=8))
+    spread = engine.update("binance", ticker("BTCUSDT", 0.0001, interval=4))
+
+    # 0.01% every 4h earns twice as much as every 8h
+    assert spread.short.venue == "binance"
+    assert spread.long.venue == "bybit"
+    assert spread.apr == pytest.approx(0.0001 * 8760 / 4 - 0.0001 * 8760 / 8)
+
+
+def test_insert_reposition_and_remove_keep_ranking():
+    engine = SpreadEngine()
+    for symbol, (a, b) in {"BTCUSDT": (0.0001, 0.0002), "ETHUSDT": (0.0001, 0.0010), "SOLUSDT": (0.0, 0.0005)}.items():
+        engine.update("bybit", ticker(symbol, a))
+        engine.update("okx", ticker(symbol, b))
+    assert [s.symbol for s in engine.widest()] == ["ETHUSDT", "SOLUSDT", "BTCUSDT"]
+
+    # BTC widens past everything
+    engine.update("okx", ticker("BTCUSDT", 0.005))
+    assert [s.symbol for s in engine.widest(2)] == ["BTCUSDT", "ETHUSDT"]
+    assert_ranked(engine)
+
+    # ETH loses a venue and drops out of the ranking
+    assert engine.remove("okx", "ETHUSDT") is None
+    assert [s.symbol for s in engine.widest()] == ["BTCUSDT", "SOLUSDT"]
+    # Removing an unknown quote changes nothing
+    assert engine.remove("binance", "SOLUSDT") == engine.get("SOLUSDT")
+    assert_ranked(engine)
+
+
+def test_random_updates_match_full_sort():
+    rng = random.Random(7)
+    engine = SpreadEngine()
+    symbols = [f"S{i}USDT" for i in range(40)]
+    venues = ["bybit", "binance", "okx"]
+    for _ in range(2000):
+        symbol, venue = rng.choice(symbols), rng.choice(venues)
+        if rng.random() < 0.2:
+            engine.remove(venue, symbol)
+        else:
+            engine.update(venue, ticker(symbol, rng.choice([0.0001, 0.0003, -0.0002, 0.001]), rng.choice([1, 4, 8])))
+    assert_ranked(engine)
+    assert len(engine._ranked) == len(engine)
+
+
+def test_sync_applies_only_changes_and_removes_missing_quotes():
+    engine = SpreadEngine()
+    snapshot = {
+        ("bybit", "BTCUSDT"): ticker("BTCUSDT", 0.0001),
+        ("okx", "BTCUSDT"): ticker("BTCUSDT", 0.0003),
+        ("bybit", "ETHUSDT"): ticker("ETHUSDT", 0.0001),
+        ("okx", "ETHUSDT"): ticker("ETHUSDT", 0.0001),
+    }
+    assert sorted(engine.sync(snapshot)) == ["BTCUSDT", "ETHUSDT"]
+    assert engine.sync(snapshot) == []
+
+    changed = dict(snapshot)
+    changed[("okx", "BTCUSDT")] = ticker("BTCUSDT", 0.0009)
+    assert engine.sync(changed) == ["BTCUSDT"]
+
+    # An interval change alone is a change
+    changed[("bybit", "ETHUSDT")] = ticker("ETHUSDT", 0.0001, interval=4)
+    assert engine.sync(changed) == ["ETHUSDT"]
+
+    del changed[("okx", "ETHUSDT")]
+    assert engine.sync(changed) == ["ETHUSDT"]
+    assert engine.get("ETHUSDT") is None
+    assert [s.symbol for s in engine.widest()] == ["BTCUSDT"]
+
+
+def test_spread_alerts_are_opt_in():
+    assert FundingRateConfig().ALERT_ON_SPREADS is False
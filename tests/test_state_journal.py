@@ -0,0 +1,52 @@
+import json
+
+from state_journal import StateJournal
+
+
+def test_replay_on_top_of_snapshot(tmp_path):
+    path = str(tmp_path / "state.json")
+    with open(path, "w") as f:
+        json.dump({"rates": {"BTCUSDT": 0.1, "ETHUSDT": 0.2}}, f)
+
+    journal = StateJournal(path, fsync=False)
+    journal.append([("rates", "BTCUSDT", 0.3), ("rates", "ETHUSDT", None), ("timestamps", "BTCUSDT", 5)])
+    journal.close()
+
+    state = StateJournal(path, fsync=False).load()
+    assert state == {"rates": {"BTCUSDT": 0.3}, "timestamps": {"BTCUSDT": 5}}
+
+
+def test_torn_tail_is_dropped_and_truncated(tmp_path):
+    path = str(tmp_path / "state.json")
+    journal = StateJournal(path, fsync=False)
+    journal.append([("rates", "BTCUSDT", 0.1), ("rates", "ETHUSDT", 0.2)])
+    journal.close()
+    with open(journal.journal_path, "a") as f:
+        f.write('["rates","SOLUSDT",0.')
+
+    reloaded = StateJournal(path, fsync=False)
+    assert reloaded.load() == {"rates": {"BTCUSDT": 0.1, "ETHUSDT": 0.2}}
+    assert reloaded.entries == 2
+
+    # The next append starts on a clean line
+    reloaded.append([("rates", "SOLUSDT", 0.3)])
+    reloaded.close()
+    assert StateJournal(path, fsync=False).load()["rates"]["SOLUSDT"] == 0.3
+
+
+def test_compaction_writes_snapshot_and_truncates_journal(tmp_path):
+    path = str(tmp_path / "state.json")
+    journal = StateJournal(path, compact_every=2, fsync=False)
+    journal.append([("rates", "BTCUSDT", 0.1)])
+    assert not journal.needs_compaction()
+    journal.append([("rates", "ETHUSDT", 0.2)])
+    assert journal.needs_compaction()
+
+    journal.compact({"rates": {"BTCUSDT": 0.1, "ETHUSDT": 0.2}})
+    assert journal.entries == 0
+    with open(journal.journal_path) as f:
+        assert f.read() == ""
+
+    state = StateJournal(path, fsync=False).load()
+    assert state["rates"] == {"BTCUSDT": 0.1, "ETHUSDT": 0.2}
+    assert "last_updated" in state
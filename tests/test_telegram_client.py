@@ -0,0 +1,94 @@
+import re
+
+from config import FundingRateConfig
+from models import Alert
+from telegram_client import TelegramClient
+
+
+def make_client() -> TelegramClient:
+    return TelegramClient("test-token", -1001)
+
+
+def alert(symbol, alert_type="predicted", rate=0.01, interval="8h", **fields) -> Alert:
+    return Alert(symbol=symbol, alert_type=alert_type, funding_rate=rate, funding_interval=interval,
+                 settlement_time="08:00 UTC", **fields)
+
+
+def included_symbols(messages):
+    return [a.symbol for _, alerts in messages for a in alerts]
+
+
+def test_single_alert_keeps_regular_format():
+    client = make_client()
+    single = alert("BTCUSDT", "extreme", rate=0.02, prev_funding_rate=0.001)
+
+    messages = client.build_alert_digest([single])
+
+    assert messages == [(client._format_funding_alert(single), [single])]
+    assert client.build_alert_digest([]) == []
+
+
+def test_sections_grouped_by_type_and_interval():
+    client = make_client()
+    alerts = [
+        alert("AUSDT", "predicted", interval="8h"),
+        alert("BUSDT", "predicted", interval="4h"),
+        alert("CUSDT", "sign_change", rate=-0.01, prev_funding_rate=0.01, interval="8h"),
+        alert("DUSDT", "predicted", interval="8h", rate=0.03),
+        alert("EUSDT", "predicted", interval="1h"),
+    ]
+
+    messages = client.build_alert_digest(alerts)
+
+    assert len(messages) == 1
+    text, included = messages[0]
+    headers = [line for line in text.split("\n") if "</b>" in line and "USDT" not in line]
+    assert headers == [
+        f"{client.DIGEST_SECTIONS['sign_change']} · 8h",
+        f"{client.DIGEST_SECTIONS['predicted']} · 1h",
+        f"{client.DIGEST_SECTIONS['predicted']} · 4h",
+        f"{client.DIGEST_SECTIONS['predicted']} · 8h",
+    ]
+    # Within a section the largest rate comes first
+    assert included_symbols(messages) == ["CUSDT", "EUSDT", "BUSDT", "DUSDT", "AUSDT"]
+
+
+def test_spread_alerts_share_one_section_across_intervals():
+    client = make_client()
+    alerts = [
+        alert("AUSDT", "spread", interval="8h", spread_apr=0.9, short_venue="bybit", long_venue="okx",
+              long_funding_rate=0.0, long_funding_interval="8h"),
+        alert("BUSDT", "spread", interval="4h", spread_apr=0.6, short_venue="binance", long_venue="bybit",
+              long_funding_rate=-0.001, long_funding_interval="8h"),
+    ]
+
+    text, included = client.build_alert_digest(alerts)[0]
+
+    assert text.count(client.DIGEST_SECTIONS["spread"]) == 1
+    assert [a.symbol for a in included] == ["AUSDT", "BUSDT"]
+
+
+def test_long_digest_split_under_message_limit():
+    client = make_client()
+    alerts = [alert(f"SYM{i:03d}USDT", "predicted", rate=0.01 + i / 1e5) for i in range(300)]
+    alerts += [alert(f"FLIP{i:03d}USDT", "sign_change", rate=-0.01, prev_funding_rate=0.01) for i in range(5)]
+
+    messages = client.build_alert_digest(alerts)
+
+    assert len(messages) > 1
+    assert all(len(text) <= client.MAX_MESSAGE_LENGTH for text, _ in messages)
+    # Every alert is delivered exactly once, and each message lists exactly the alerts it includes
+    assert sorted(included_symbols(messages)) == sorted(a.symbol for a in alerts)
+    for text, included in messages:
+        assert re.findall(r"<b>((?:SYM|FLIP)\d+USDT)</b>", text) == [a.symbol for a in included]
+
+    predicted = client.DIGEST_SECTIONS["predicted"]
+    assert messages[0][0].startswith(client.DIGEST_SECTIONS["sign_change"])
+    assert f"{predicted} · 8h\n" in messages[0][0]
+    # A section that spills over continues under a "(cont.)" header
+    for text, _ in messages[1:]:
+        assert text.startswith(f"{predicted} · 8h (cont.)\n")
+
+
+def test_digest_mode_is_opt_in():
+    assert FundingRateConfig().ALERT_DIGEST_MODE is False
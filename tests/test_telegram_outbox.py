@@ -0,0 +1,135 @@
+import asyncio
+import time
+
+from models import Alert
+from telegram_outbox import PRIORITY_FLIP, PRIORITY_PREDICTED, PRIORITY_SETTLEMENT, TelegramOutbox
+
+GROUP = -1001
+OTHER_GROUP = -1002
+
+
+class FakeTelegram:
+    """Records deliveries; responses can be scripted per chat"""
+
+    chat_id = GROUP
+
+    def __init__(self, responses=None):
+        # chat_id -> list of (sent, retry_after) returned in turn (then success)
+        self.responses = responses or {}
+        self.delivered = []
+        self.attempts = []
+
+    async def deliver_message(self, text, topic_id=None, chat_id=None):
+        self.attempts.append((chat_id, text, time.monotonic()))
+        scripted = self.responses.get(chat_id)
+        if scripted:
+            return scripted.pop(0)
+        self.delivered.append((chat_id, text, time.monotonic()))
+        return True, None
+
+    def _format_funding_alert(self, alert):
+        return f"{alert.symbol} {alert.alert_type}"
+
+    def build_alert_digest(self, alerts):
+        return [("digest", alerts)]
+
+
+async def run_outbox(outbox: TelegramOutbox, enqueue, timeout: float = 10):
+    enqueue(outbox)
+    started = time.monotonic()
+    outbox.start()
+    await outbox.stop(drain_timeout=timeout)
+    return started
+
+
+def fast_outbox(telegram, **kwargs) -> TelegramOutbox:
+    kwargs.setdefault("global_per_second", 1000)
+    kwargs.setdefault("group_per_minute", 60_000)
+    return TelegramOutbox(telegram, **kwargs)
+
+
+def test_priority_order():
+    telegram = FakeTelegram()
+
+    def enqueue(outbox):
+        outbox.enqueue("predicted", priority=PRIORITY_PREDICTED)
+        outbox.enqueue("settlement 1", priority=PRIORITY_SETTLEMENT)
+        outbox.enqueue("flip", priority=PRIORITY_FLIP)
+        outbox.enqueue("settlement 2", priority=PRIORITY_SETTLEMENT)
+
+    asyncio.run(run_outbox(fast_outbox(telegram), enqueue))
+    assert [text for _, text, _ in telegram.delivered] == ["flip", "settlement 1", "settlement 2", "predicted"]
+
+
+def test_digest_takes_the_most_urgent_priority():
+    telegram = FakeTelegram()
+
+    def enqueue(outbox):
+        outbox.enqueue("predicted", priority=PRIORITY_PREDICTED)
+        outbox.enqueue_alerts([Alert("BTCUSDT", "predicted", 0.01), Alert("ETHUSDT", "sign_change", 0.001)])
+
+    asyncio.run(run_outbox(fast_outbox(telegram), enqueue))
+    assert [text for _, text, _ in telegram.delivered] == ["digest", "predicted"]
+
+
+def test_retry_after_blocks_only_its_chat():
+    telegram = FakeTelegram({GROUP: [(False, 0.3)]})
+
+    def enqueue(outbox):
+        outbox.enqueue("blocked", chat_id=GROUP)
+        outbox.enqueue("second for blocked chat", chat_id=GROUP)
+        outbox.enqueue("other chat", chat_id=OTHER_GROUP, priority=PRIORITY_PREDICTED)
+
+    outbox = fast_outbox(telegram)
+    started = asyncio.run(run_outbox(outbox, enqueue))
+    delivered = {text: at - started for _, text, at in telegram.delivered}
+
+    # The other chat is not held behind the blocked one
+    assert delivered["other chat"] < 0.1
+    assert delivered["blocked"] >= 0.29
+    assert delivered["second for blocked chat"] >= 0.29
+    assert outbox.rate_limited == 1
+    assert outbox.retried == 1
+
+
+def test_gives_up_after_max_attempts():
+    telegram = FakeTelegram({GROUP: [(False, 0.01)] * 10})
+
+    outbox = fast_outbox(telegram, max_attempts=5)
+    asyncio.run(run_outbox(outbox, lambda o: o.enqueue("doomed")))
+
+    assert len(telegram.attempts) == 5
+    assert telegram.delivered == []
+    assert outbox.failed == 1
+    assert outbox.retried == 4
+
+
+def test_global_bucket_paces_all_chats():
+    telegram = FakeTelegram()
+
+    def enqueue(outbox):
+        for i in range(25):
+            outbox.enqueue(f"m{i}", chat_id=-(i + 1))
+
+    # A second's worth (20) goes at once, then 20/s: the last 5 take about 0.25s
+    started = asyncio.run(run_outbox(fast_outbox(telegram, global_per_second=20), enqueue))
+    assert len(telegram.delivered) == 25
+    assert telegram.delivered[19][2] - started < 0.1
+    assert telegram.delivered[-1][2] - started >= 0.2
+
+
+def test_private_chat_bucket_paces_without_holding_others():
+    telegram = FakeTelegram()
+
+    def enqueue(outbox):
+        outbox.enqueue("dm 1", chat_id=42)
+        outbox.enqueue("dm 2", chat_id=42)
+        outbox.enqueue("group", chat_id=GROUP, priority=PRIORITY_PREDICTED)
+
+    started = asyncio.run(run_outbox(fast_outbox(telegram), enqueue))
+    delivered = {text: at - started for _, text, at in telegram.delivered}
+
+    # Private chats get one message per second
+    assert delivered["dm 1"] < 0.1
+    assert delivered["group"] < 0.1
+    assert delivered["dm 2"] >= 0.9
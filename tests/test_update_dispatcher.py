@@ -0,0 +1,100 @@
+import asyncio
+
+from update_dispatcher import UpdateDispatcher
+
+
+def update(update_id, chat_id):
+    return {"update_id": update_id, "message": {"chat": {"id": chat_id}, "text": "/funding"}}
+
+
+def test_updates_run_in_order_per_chat():
+    handled = []
+
+    async def handle(u):
+        # Earlier updates sleep longer, so any reordering within a chat would show
+        await asyncio.sleep(0.01 * (5 - u["update_id"] % 5))
+        handled.append((u["message"]["chat"]["id"], u["update_id"]))
+
+    async def main():
+        dispatcher = UpdateDispatcher(handle, max_concurrency=4)
+        for i in range(10):
+            await dispatcher.submit(update(i, chat_id=i % 2))
+        await dispatcher.stop()
+        return dispatcher
+
+    dispatcher = asyncio.run(main())
+    assert [i for chat, i in handled if chat == 0] == [0, 2, 4, 6, 8]
+    assert [i for chat, i in handled if chat == 1] == [1, 3, 5, 7, 9]
+    assert dispatcher.completed == 10
+    assert dispatcher.pending == 0
+
+
+def test_chats_run_concurrently_up_to_limit():
+    running = 0
+    peak = 0
+
+    async def handle(u):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    async def main():
+        dispatcher = UpdateDispatcher(handle, max_concurrency=3)
+        for i in range(8):
+            await dispatcher.submit(update(i, chat_id=i))
+        await dispatcher.stop()
+
+    asyncio.run(main())
+    assert peak == 3
+
+
+def test_submit_blocks_when_backlog_full():
+    async def main():
+        gate = asyncio.Event()
+
+        async def handle(u):
+            await gate.wait()
+
+        dispatcher = UpdateDispatcher(handle, max_pending=2)
+        await dispatcher.submit(update(1, chat_id=1))
+        await dispatcher.submit(update(2, chat_id=2))
+
+        third = asyncio.create_task(dispatcher.submit(update(3, chat_id=3)))
+        await asyncio.sleep(0.01)
+        assert not third.done()
+        assert dispatcher.throttled == 1
+
+        gate.set()
+        await asyncio.wait_for(third, 1)
+        await dispatcher.stop()
+        return dispatcher
+
+    dispatcher = asyncio.run(main())
+    assert dispatcher.completed == 3
+
+
+def test_slow_handler_times_out_and_chat_continues():
+    timed_out = []
+    handled = []
+
+    async def handle(u):
+        if u["update_id"] == 1:
+            await asyncio.sleep(1)
+        handled.append(u["update_id"])
+
+    async def on_timeout(u):
+        timed_out.append(u["update_id"])
+
+    async def main():
+        dispatcher = UpdateDispatcher(handle, deadline=0.05, on_timeout=on_timeout)
+        await dispatcher.submit(update(1, chat_id=1))
+        await dispatcher.submit(update(2, chat_id=1))
+        await dispatcher.stop()
+        return dispatcher
+
+    dispatcher = asyncio.run(main())
+    assert timed_out == [1]
+    assert handled == [2]
+    assert dispatcher.timed_out == 1
@@ -0,0 +1,88 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from config import FundingRateConfig
+from mock_exchanges import FixtureServer
+from venue_orchestrator import VenueOrchestrator, build_adapters
+
+NEXT_FUNDING = 1792080000000
+
+
+def venue_config(bybit_url: str, binance_url: str, okx_url: str) -> FundingRateConfig:
+    config = FundingRateConfig()
+    config.ENABLED_VENUES = ["bybit", "binance", "okx", "kraken"]
+    config.BYBIT_BASE_URL = bybit_url
+    config.BINANCE_BASE_URL = binance_url
+    config.OKX_BASE_URL = okx_url
+    return config
+
+
+async def fetch_with(config: FundingRateConfig, timeout: float = 5):
+    orchestrator = VenueOrchestrator(build_adapters(config), timeout=timeout)
+    try:
+        await orchestrator.fetch_all()
+    finally:
+        await orchestrator.close()
+    return orchestrator
+
+
+def base_url(server: TestServer) -> str:
+    return str(server.make_url("")).rstrip("/")
+
+
+def test_build_adapters_skips_unknown_venues():
+    adapters = build_adapters(venue_config("http://bybit", "http://binance", "http://okx"))
+    assert [adapter.venue for adapter in adapters] == ["bybit", "binance", "okx"]
+
+
+def test_fetch_all_normalizes_every_venue():
+    async def main():
+        async with TestServer(FixtureServer().app()) as server:
+            url = base_url(server)
+            return await fetch_with(venue_config(url, url, url))
+
+    orchestrator = asyncio.run(main())
+    snapshot = orchestrator.snapshot
+
+    # Keys are (venue, normalized symbol) and the same symbol lines up across venues
+    assert {venue for venue, _ in snapshot} == {"bybit", "binance", "okx"}
+    assert set(orchestrator.by_symbol()["BTCUSDT"]) == {"bybit", "binance", "okx"}
+
+    # Binance: quarterly contracts dropped, fundingInfo intervals applied, percent -> fraction
+    assert ("binance", "BTCUSDT_261225") not in snapshot
+    assert snapshot[("binance", "1000PEPEUSDT")].funding_interval_hours == 4
+    assert snapshot[("binance", "BTCUSDT")].funding_interval_hours == 8
+    assert snapshot[("binance", "BTCUSDT")].funding_rate == 0.000082
+    assert snapshot[("binance", "BTCUSDT")].next_funding_time == NEXT_FUNDING
+    assert abs(snapshot[("binance", "BTCUSDT")].price_24h_pcnt - 0.02041) < 1e-9
+
+    # OKX: instId mapped to symbols, coin-margined swaps dropped, interval from the next two settlements
+    assert ("okx", "BTC-USDT-SWAP") not in snapshot
+    assert not any(symbol.startswith("BTC-USD") for _, symbol in snapshot)
+    assert snapshot[("okx", "BTCUSDT")].next_funding_time == NEXT_FUNDING
+    assert snapshot[("okx", "BTCUSDT")].funding_interval_hours == 8
+    assert snapshot[("okx", "WIFUSDT")].funding_interval_hours == 4
+    assert snapshot[("okx", "BTCUSDT")].funding_rate == 0.000113
+
+    # Bybit: interval from fundingIntervalHour
+    assert snapshot[("bybit", "WIFUSDT")].funding_interval_hours == 4
+    assert snapshot[("bybit", "BTCUSDT")].next_funding_time == NEXT_FUNDING
+
+    assert all(failures == 0 for failures in orchestrator.failures.values())
+
+
+def test_fetch_all_drops_a_slow_venue_and_a_failing_one():
+    async def main():
+        broken = web.Application()
+        async with TestServer(FixtureServer().app()) as server, \
+                TestServer(FixtureServer(delay=1).app()) as slow, \
+                TestServer(broken) as failing:
+            return await fetch_with(venue_config(base_url(server), base_url(failing), base_url(slow)), timeout=0.3)
+
+    orchestrator = asyncio.run(main())
+
+    assert {venue for venue, _ in orchestrator.snapshot} == {"bybit"}
+    assert orchestrator.counts == {"bybit": 8, "binance": 0, "okx": 0}
+    assert orchestrator.failures == {"bybit": 0, "binance": 1, "okx": 1}
@@ -0,0 +1,106 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from models import HOURS_PER_YEAR, Ticker
+
+
+class TickerColumns:
+    """
+    Columnar view of a ticker universe
+
+    Built once per tickers response: a symbol list (with a symbol -> row index)
+    plus one NumPy array per field, so threshold checks, counts and top-N
+    rankings run as vectorized operations instead of loops over per-symbol dicts.
+
+    Rates are also normalized once per build: rate_8h (the per-8h equivalent)
+    and apr, so symbols on 1h/2h/4h/8h intervals compare on equal terms.
+    Thresholds and rankings use rate_8h.
+    """
+
+    __slots__ = ("symbols", "index", "rate", "next_funding_time", "price", "volume", "open_interest",
+                 "interval_hours", "rate_8h", "apr")
+
+    def __init__(self, symbols: List[str], rate: np.ndarray, next_funding_time: np.ndarray,
+                 price: np.ndarray, volume: np.ndarray, open_interest: np.ndarray,
+                 interval_hours: np.ndarray):
+        self.symbols = symbols
+        self.index = {symbol: i for i, symbol in enumerate(symbols)}
+        self.rate = rate
+        self.next_funding_time = next_funding_time
+        self.price = price
+        self.volume = volume
+        self.open_interest = open_interest
+        self.interval_hours = interval_hours
+
+        hours = np.where(interval_hours > 0, interval_hours, 8)
+        self.rate_8h = rate * (8 / hours)
+        self.apr = rate * (HOURS_PER_YEAR / hours)
+
+    @classmethod
+    def from_tickers(cls, tickers: Dict[str, Ticker]) -> "TickerColumns":
+        """
+        Build columns from parsed tickers
+
+        Args:
+            tickers: Output of BybitDataFetcher.get_tickers / get_tickers_async
+        """
+        symbols = list(tickers)
+        values = list(tickers.values())
+        n = len(values)
+
+        def column(attr: str, dtype) -> np.ndarray:
+            return np.fromiter((getattr(t, attr) for t in values), dtype=dtype, count=n)
+
+        return cls(
+            symbols,
+            rate=column("funding_rate", np.float64),
+            next_funding_time=column("next_funding_time", np.int64),
+            price=column("last_price", np.float64),
+            volume=column("volume_24h", np.float64),
+            open_interest=column("open_interest", np.float64),
+            interval_hours=column("funding_interval_hours", np.float64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def extreme_mask(self, threshold: float) -> np.ndarray:
+        """Rows whose absolute per-8h equivalent rate is at or above threshold"""
+        return np.abs(self.rate_8h) >= threshold
+
+    def symbols_where(self, mask: np.ndarray) -> List[str]:
+        """Symbols of the rows selected by a boolean mask"""
+        return [self.symbols[i] for i in np.flatnonzero(mask)]
+
+    def top_n(self, values: np.ndarray, n: int) -> np.ndarray:
+        """
+        Row indices of the n largest values, largest first
+
+        Uses argpartition so only the selected rows are sorted.
+        """
+        if n <= 0 or not len(values):
+            return np.empty(0, dtype=np.intp)
+        if n < len(values):
+            candidates = np.argpartition(values, -n)[-n:]
+        else:
+            candidates = np.arange(len(values))
+        return candidates[np.argsort(values[candidates])[::-1]]
+
+    def top_abs_rate(self, n: int = 10) -> List[str]:
+        """Symbols with the most extreme per-8h equivalent rates, most extreme first"""
+        return [self.symbols[i] for i in self.top_n(np.abs(self.rate_8h), n)]
+
+    def positive_count(self) -> int:
+        return int(np.count_nonzero(self.rate > 0))
+
+    def negative_count(self) -> int:
+        return int(np.count_nonzero(self.rate < 0))
+
+    def most_positive(self) -> Optional[str]:
+        """Symbol with the highest per-8h equivalent rate"""
+        return self.symbols[int(np.argmax(self.rate_8h))] if len(self) else None
+
+    def most_negative(self) -> Optional[str]:
+        """Symbol with the lowest per-8h equivalent rate"""
+        return self.symbols[int(np.argmin(self.rate_8h))] if len(self) else None
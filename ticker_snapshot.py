@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from bybit_fetcher import BybitDataFetcher
+from models import Ticker
+from ticker_columns import TickerColumns
+
+logger = logging.getLogger(__name__)
+
+
+class TickerSnapshotService:
+    """
+    One in-process ticker snapshot shared by the alert monitor and command handler
+
+    The full linear tickers list is fetched at most once per TTL window, and
+    concurrent refreshes are coalesced (single-flight), so a burst of /funding
+    commands costs a single upstream call.
+    """
+
+    def __init__(self, fetcher: BybitDataFetcher, ttl: float = 15):
+        """
+        Initialize the snapshot service
+
+        Args:
+            fetcher: Bybit fetcher used for the upstream call
+            ttl: Seconds a snapshot is served before it is refreshed
+        """
+        self.fetcher = fetcher
+        self.ttl = ttl
+
+        self.tickers: Dict[str, Ticker] = {}
+        # Same snapshot as NumPy columns, built once per refresh for vectorized ranking
+        self.columns: TickerColumns = TickerColumns.from_tickers({})
+        self.version = 0
+        self.updated_at: Optional[datetime] = None
+        self._updated_monotonic: Optional[float] = None
+
+        self._inflight: Optional[asyncio.Task] = None
+
+        # Counters
+        self.hits = 0
+        self.refreshes = 0
+        self.coalesced = 0
+
+    def age(self) -> Optional[float]:
+        """Seconds since the last successful refresh (None if never refreshed)"""
+        if self._updated_monotonic is None:
+            return None
+        return time.monotonic() - self._updated_monotonic
+
+    def is_fresh(self, max_age: Optional[float] = None) -> bool:
+        """Check whether the snapshot is younger than max_age (defaults to the TTL)"""
+        age = self.age()
+        return age is not None and age < (self.ttl if max_age is None else max_age)
+
+    async def get(self, max_age: Optional[float] = None) -> Dict[str, Ticker]:
+        """
+        Get the current snapshot, refreshing it if it is older than max_age
+
+        Args:
+            max_age: Override the TTL for this read (e.g. right after a settlement)
+
+        Returns:
+            Dict mapping symbol to Ticker (shared; do not mutate)
+        """
+        if self.is_fresh(max_age):
+            self.hits += 1
+            return self.tickers
+        return await self.refresh()
+
+    async def refresh(self) -> Dict[str, Ticker]:
+        """Refresh from upstream, joining a refresh already in flight"""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._fetch())
+        else:
+            self.coalesced += 1
+
+        task = self._inflight
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if task.done() and self._inflight is task:
+                self._inflight = None
+
+    async def _fetch(self) -> Dict[str, Ticker]:
+        """Fetch tickers and swap in the new snapshot (keeps the old one on failure)"""
+        tickers = await self.fetcher.get_tickers_async()
+        if not tickers:
+            logger.warning("Ticker snapshot refresh failed, serving previous snapshot")
+            return self.tickers
+
+        self.tickers = tickers
+        self.columns = TickerColumns.from_tickers(tickers)
+        self.version += 1
+        self.refreshes += 1
+        self.updated_at = datetime.now(timezone.utc)
+        self._updated_monotonic = time.monotonic()
+        logger.debug(f"Ticker snapshot v{self.version}: {len(tickers)} symbols")
+        return tickers
+
+    def get_stats(self) -> Dict:
+        """Get snapshot counters"""
+        return {
+            "version": self.version,
+            "symbols": len(self.tickers),
+            "hits": self.hits,
+            "refreshes": self.refreshes,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+UpdateHandler = Callable[[Dict], Awaitable[None]]
+
+
+def update_chat_id(update: Dict):
+    """Chat an update belongs to (None if it has none)"""
+    message = update.get("message") or update.get("callback_query", {}).get("message") or {}
+    return message.get("chat", {}).get("id")
+
+
+class UpdateDispatcher:
+    """
+    Runs Telegram updates as bounded concurrent tasks, in order per chat
+
+    Each chat has a FIFO drained by one task at a time, so a chat's commands
+    are answered in the order sent while other chats proceed in parallel (at
+    most max_concurrency handlers overall). A handler running past deadline
+    seconds is cancelled. submit() blocks once max_pending updates are queued
+    or running, which stops the poll loop / webhook from taking more until
+    the backlog drains.
+    """
+
+    def __init__(self, handle_update: UpdateHandler, max_concurrency: int = 8, max_pending: int = 100,
+                 deadline: float = 30, on_timeout: Optional[UpdateHandler] = None):
+        """
+        Args:
+            handle_update: Coroutine called with each update dict
+            max_concurrency: Max handlers running at once
+            max_pending: Max updates queued or running before submit() blocks
+            deadline: Seconds a handler may run before it is cancelled
+            on_timeout: Optional coroutine called with an update whose handler timed out
+        """
+        self.handle_update = handle_update
+        self.deadline = deadline
+        self.on_timeout = on_timeout
+
+        self._running = asyncio.Semaphore(max_concurrency)
+        self._pending = asyncio.Semaphore(max_pending)
+        self._chats: Dict[object, Deque[Tuple[Dict, float]]] = {}
+        self._workers: Dict[object, asyncio.Task] = {}
+
+        # Metrics
+        self.queue_wait = LatencyHistogram()
+        self.handler_time = LatencyHistogram()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.throttled = 0
+
+    @property
+    def pending(self) -> int:
+        return sum(len(queue) for queue in self._chats.values())
+
+    async def submit(self, update: Dict):
+        """Queue an update behind earlier ones from the same chat (waits while the dispatcher is full)"""
+        if self._pending.locked():
+            self.throttled += 1
+            logger.warning("Command backlog full, pausing update intake")
+        await self._pending.acquire()
+
+        chat_id = update_chat_id(update)
+        self._chats.setdefault(chat_id, deque()).append((update, time.monotonic()))
+        self.submitted += 1
+
+        if chat_id not in self._workers:
+            self._workers[chat_id] = asyncio.create_task(self._drain(chat_id))
+
+    async def _drain(self, chat_id):
+        """Handle one chat's updates in order until its queue is empty"""
+        queue = self._chats[chat_id]
+        try:
+            while queue:
+                update, enqueued_at = queue[0]
+                async with self._running:
+                    started = time.monotonic()
+                    self.queue_wait.observe(started - enqueued_at)
+                    await self._handle(update)
+                    self.handler_time.observe(time.monotonic() - started)
+                queue.popleft()
+                self._pending.release()
+        finally:
+            del self._chats[chat_id]
+            del self._workers[chat_id]
+
+    async def _handle(self, update: Dict):
+        try:
+            await asyncio.wait_for(self.handle_update(update), self.deadline)
+            self.completed += 1
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            logger.warning(f"Update {update.get('update_id')} timed out after {self.deadline}s")
+            if self.on_timeout:
+                try:
+                    await self.on_timeout(update)
+                except Exception as e:
+                    logger.error(f"Error reporting timeout for update {update.get('update_id')}: {e}")
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Error handling update {update.get('update_id')}: {e}", exc_info=True)
+
+    async def stop(self, drain_timeout: float = 10):
+        """Wait for queued updates to finish, cancelling whatever is left after drain_timeout"""
+        workers = list(self._workers.values())
+        if not workers:
+            return
+        _, unfinished = await asyncio.wait(workers, timeout=drain_timeout)
+        if unfinished:
+            logger.warning(f"Dispatcher stopped with {self.pending} unhandled updates")
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
+
+    def get_stats(self) -> Dict:
+        """Get backlog, counters and queue wait / handler latency summaries"""
+        return {
+            "pending": self.pending,
+            "active_chats": len(self._workers),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "throttled": self.throttled,
+            "queue_wait": self.queue_wait.summary(),
+            "handler_time": self.handler_time.summary(),
+        }
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from binance_fetcher import BinanceFetcher
+from bybit_fetcher import BybitDataFetcher
+from config import FundingRateConfig
+from exchange_adapter import ExchangeAdapter
+from metrics import LatencyHistogram
+from models import Ticker
+from okx_fetcher import OKXFetcher
+from rate_limiter import get_shared_limiter
+
+logger = logging.getLogger(__name__)
+
+# Snapshot key: (venue, normalized symbol)
+VenueKey = Tuple[str, str]
+
+
+def build_adapters(config: FundingRateConfig, bybit: Optional[BybitDataFetcher] = None) -> List[ExchangeAdapter]:
+    """
+    Create an adapter for each venue in config.ENABLED_VENUES
+
+    Args:
+        config: Bot configuration (base URLs, per-venue pacing)
+        bybit: Existing Bybit fetcher to reuse instead of creating one
+
+    Returns:
+        Adapters in ENABLED_VENUES order (unknown venue names are skipped)
+    """
+    adapters: List[ExchangeAdapter] = []
+    for venue in config.ENABLED_VENUES:
+        if venue == BybitDataFetcher.VENUE:
+            adapters.append(bybit or BybitDataFetcher(
+                config.BYBIT_BASE_URL,
+                config.SETTLEMENT_FETCH_CONCURRENCY,
+                rate_limiter=get_shared_limiter("bybit", config.BYBIT_MAX_REQUESTS_PER_SECOND)
+            ))
+        elif venue == BinanceFetcher.VENUE:
+            adapters.append(BinanceFetcher(
+                config.BINANCE_BASE_URL,
+                weight_per_second=config.BINANCE_MAX_WEIGHT_PER_SECOND
+            ))
+        elif venue == OKXFetcher.VENUE:
+            adapters.append(OKXFetcher(
+                config.OKX_BASE_URL,
+                requests_per_second=config.OKX_MAX_REQUESTS_PER_SECOND
+            ))
+        else:
+            logger.warning(f"Unknown venue in ENABLED_VENUES: {venue}")
+    return adapters
+
+
+class VenueOrchestrator:
+    """
+    Fetches tickers from every venue concurrently into one snapshot
+
+    Each venue is fetched under its own rate limiter, so a slow or throttled
+    venue only delays its own part. A venue that fails (or times out) is left
+    out of that round's snapshot rather than served stale.
+    """
+
+    def __init__(self, adapters: List[ExchangeAdapter], timeout: float = 20):
+        """
+        Args:
+            adapters: One adapter per venue
+            timeout: Seconds to wait for a venue before dropping it from the round
+        """
+        self.adapters = adapters
+        self.timeout = timeout
+
+        self.snapshot: Dict[VenueKey, Ticker] = {}
+        self.fetched_at: Optional[float] = None
+
+        # Per-venue counters
+        self.latency = {adapter.venue: LatencyHistogram() for adapter in adapters}
+        self.failures = {adapter.venue: 0 for adapter in adapters}
+        self.counts = {adapter.venue: 0 for adapter in adapters}
+
+    @property
+    def venues(self) -> List[str]:
+        return [adapter.venue for adapter in self.adapters]
+
+    async def _fetch_venue(self, adapter: ExchangeAdapter) -> Dict[str, Ticker]:
+        """Fetch one venue's tickers, recording latency and failures"""
+        started = time.monotonic()
+        try:
+            tickers = await asyncio.wait_for(adapter.get_tickers_async(), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{adapter.venue}: tickers timed out after {self.timeout}s")
+            tickers = {}
+        except Exception as e:
+            logger.error(f"{adapter.venue}: error fetching tickers: {e}")
+            tickers = {}
+
+        self.latency[adapter.venue].observe(time.monotonic() - started)
+        if not tickers:
+            self.failures[adapter.venue] += 1
+        self.counts[adapter.venue] = len(tickers)
+        return tickers
+
+    async def fetch_all(self) -> Dict[VenueKey, Ticker]:
+        """
+        Fetch all venues concurrently
+
+        Returns:
+            Dict mapping (venue, symbol) to Ticker
+        """
+        results = await asyncio.gather(*(self._fetch_venue(adapter) for adapter in self.adapters))
+
+        snapshot: Dict[VenueKey, Ticker] = {}
+        for adapter, tickers in zip(self.adapters, results):
+            for symbol, ticker in tickers.items():
+                snapshot[(adapter.venue, symbol)] = ticker
+
+        self.snapshot = snapshot
+        self.fetched_at = time.monotonic()
+        logger.debug(f"Venue snapshot: {self.counts}")
+        return snapshot
+
+    def by_symbol(self) -> Dict[str, Dict[str, Ticker]]:
+        """Group the latest snapshot by symbol: symbol -> venue -> Ticker"""
+        grouped: Dict[str, Dict[str, Ticker]] = {}
+        for (venue, symbol), ticker in self.snapshot.items():
+            grouped.setdefault(symbol, {})[venue] = ticker
+        return grouped
+
+    async def close(self):
+        """Close every adapter's HTTP session"""
+        for adapter in self.adapters:
+            await adapter.close()
+
+    def get_stats(self) -> Dict:
+        """Get per-venue ticker counts, failures, fetch latency and limiter counters"""
+        return {
+            adapter.venue: {
+                "tickers": self.counts[adapter.venue],
+                "failures": self.failures[adapter.venue],
+                "latency": self.latency[adapter.venue].summary(),
+                "rate_limiter": adapter.rate_limiter.get_stats(),
+            }
+            for adapter in self.adapters
+        }
@@ -0,0 +1,190 @@
+import asyncio
+import hmac
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from aiohttp import web
+
+import json_codec
+from telegram_client import TelegramClient
+
+logger = logging.getLogger(__name__)
+
+UpdateHandler = Callable[[Dict], Awaitable[None]]
+
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+# Commands, plus inline keyboard presses (history paging)
+ALLOWED_UPDATES = ["message", "callback_query"]
+
+
+class WebhookServer:
+    """
+    Receives Telegram updates pushed to a webhook
+
+    Requests without the secret token registered with setWebhook are rejected.
+    Updates are passed to handle_update (UpdateDispatcher.submit, which only
+    queues them) and acknowledged, since Telegram re-sends anything slow or
+    non-2xx; update_ids already seen are dropped so a re-sent update is not
+    handled twice.
+    """
+
+    RECENT_UPDATE_IDS = 1000
+
+    def __init__(self, telegram: TelegramClient, handle_update: UpdateHandler, url: str,
+                 secret_token: str = "", host: str = "0.0.0.0", port: int = 8080):
+        """
+        Args:
+            telegram: Client used to register the webhook
+            handle_update: Coroutine called with each update dict (should return quickly)
+            url: Public HTTPS URL Telegram posts to (its path is served)
+            secret_token: Shared secret (a random one is generated if empty)
+            host: Interface to listen on
+            port: Port to listen on
+        """
+        self.telegram = telegram
+        self.handle_update = handle_update
+        self.url = url
+        self.path = urlparse(url).path or "/"
+        # Telegram accepts 1-256 characters of A-Z, a-z, 0-9, _ and -
+        self.secret_token = secret_token or secrets.token_urlsafe(32)
+        self.host = host
+        self.port = port
+
+        self._runner: Optional[web.AppRunner] = None
+        self._recent: "OrderedDict[int, None]" = OrderedDict()
+
+        self.received = 0
+        self.rejected = 0
+        self.duplicates = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        token = request.headers.get(SECRET_TOKEN_HEADER, "")
+        if not hmac.compare_digest(token.encode(), self.secret_token.encode()):
+            self.rejected += 1
+            logger.warning(f"Rejected webhook request from {request.remote}: bad secret token")
+            return web.Response(status=401)
+
+        try:
+            update = json_codec.loads(await request.read())
+        except ValueError:
+            return web.Response(status=400)
+
+        update_id = update.get("update_id")
+        if update_id in self._recent:
+            self.duplicates += 1
+            return web.Response()
+        self._recent[update_id] = None
+        if len(self._recent) > self.RECENT_UPDATE_IDS:
+            self._recent.popitem(last=False)
+
+        self.received += 1
+        await self.handle_update(update)
+        return web.Response()
+
+    async def start(self) -> bool:
+        """
+        Start listening and register the webhook with Telegram
+
+        Returns:
+            True if the server is up and the webhook is set
+        """
+        app = web.Application()
+        app.router.add_post(self.path, self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Webhook server listening on {self.host}:{self.port}{self.path}")
+
+        if not await self.telegram.set_webhook(self.url, self.secret_token, ALLOWED_UPDATES):
+            await self.stop()
+            return False
+        return True
+
+    async def stop(self):
+        """Stop listening (the webhook stays set, so Telegram holds updates until restart)"""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def get_stats(self) -> Dict:
+        return {"received": self.received, "rejected": self.rejected, "duplicates": self.duplicates}
+
+
+async def poll_updates(telegram: TelegramClient, handle_update: UpdateHandler,
+                       is_running: Callable[[], bool], timeout: int = 50):
+    """
+    Long-poll getUpdates and pass updates on in order
+
+    Telegram holds each request open until an update arrives or timeout
+    seconds pass, so commands are answered immediately and an idle bot makes
+    one request per timeout. is_running is checked every second, so shutdown
+    does not wait for an open poll.
+
+    Args:
+        telegram: Client to poll with
+        handle_update: Coroutine called with each update dict (e.g. UpdateDispatcher.submit)
+        is_running: Returns False to stop polling
+        timeout: Long polling timeout in seconds
+    """
+    # getUpdates is refused while a webhook is set
+    await telegram.delete_webhook()
+
+    offset = 0
+    while is_running():
+        started = time.monotonic()
+        poll = asyncio.ensure_future(telegram.get_updates(offset, timeout=timeout, allowed_updates=ALLOWED_UPDATES))
+        while not poll.done() and is_running():
+            await asyncio.wait({poll}, timeout=1)
+        if not poll.done():
+            poll.cancel()
+            break
+
+        try:
+            updates = poll.result()
+        except asyncio.TimeoutError:
+            continue
+        except Exception as e:
+            logger.error(f"Error polling updates: {e}")
+            await asyncio.sleep(1)
+            continue
+
+        # An empty answer that came back at once is an API error; don't spin on it
+        if not updates and time.monotonic() - started < 1:
+            await asyncio.sleep(1)
+
+        for update in updates:
+            offset = update.get("update_id", offset - 1) + 1
+            try:
+                await handle_update(update)
+            except Exception as e:
+                logger.error(f"Error handling update {update.get('update_id')}: {e}", exc_info=True)
+
+
+async def receive_updates(telegram: TelegramClient, handle_update: UpdateHandler,
+                          is_running: Callable[[], bool], webhook_url: str = "", secret_token: str = "",
+                          host: str = "0.0.0.0", port: int = 8080, poll_timeout: int = 50):
+    """
+    Feed Telegram updates to handle_update until is_running returns False
+
+    Uses a webhook when webhook_url is set (falling back to long polling if
+    it cannot be registered), long polling otherwise.
+    """
+    if webhook_url:
+        server = WebhookServer(telegram, handle_update, webhook_url, secret_token, host, port)
+        if await server.start():
+            logger.info("Receiving updates via webhook")
+            try:
+                while is_running():
+                    await asyncio.sleep(1)
+            finally:
+                await server.stop()
+            return
+        logger.warning("Could not set webhook, falling back to long polling")
+
+    logger.info(f"Receiving updates via long polling (timeout {poll_timeout}s)")
+    await poll_updates(telegram, handle_update, is_running, poll_timeout)